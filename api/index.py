@@ -3,48 +3,52 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import hashlib
 import sys
 import os
+import threading
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import Future
+from pathlib import Path
 
 # Ensure the project root is on the path so warmonitor package can be imported
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from datetime import datetime, timezone
 
-from flask import Flask, render_template
-
-from warmonitor.fetcher import fetch_all
-from warmonitor.models import Event
+import base64
+import json
+
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
+
+from warmonitor.analytics import EventStats
+from warmonitor.archive import open_archive
+from warmonitor.breaker import SourceBreakers
+from warmonitor.cluster import StoryCluster, StoryClusters
+from warmonitor.collector import attach, socket_path
+from warmonitor.config import load_settings
+from warmonitor.fetcher import (
+    HostLimiter,
+    SourceBatch,
+    create_client,
+    create_executor,
+    fetch_iter,
+)
+from warmonitor.metrics import FetchMetrics
+from warmonitor.records import EventRecord
+from warmonitor.retention import RetainedEvents
+from warmonitor.search import Query, QueryError, SearchIndex, SearchResult, parse_query
+from warmonitor.seen import SeenIndex
 from warmonitor.sources import SOURCES
 
-SEVERITY_LABEL = {5: "CRITICAL", 4: "HIGH", 3: "MEDIUM", 2: "LOW", 1: "INFO"}
-
-
-def _calculate_defcon(events: list[Event]) -> int:
-    now = datetime.now(timezone.utc)
-
-    def recent(minutes: int) -> list[Event]:
-        cutoff = now.timestamp() - minutes * 60
-        return [e for e in events if e.published.timestamp() >= cutoff]
+SETTINGS = load_settings()
+_archive = open_archive(SETTINGS.archive_dir)
+_breakers = SourceBreakers.from_settings(SETTINGS)
 
-    last_30 = recent(30)
-    last_120 = recent(120)
-
-    sev5_30 = any(e.severity == 5 for e in last_30)
-    sev5_120 = any(e.severity == 5 for e in last_120)
-    sev4_30_count = sum(1 for e in last_30 if e.severity == 4)
-    has_sev4 = any(e.severity == 4 for e in events)
-    has_sev3 = any(e.severity == 3 for e in events)
+SEVERITY_LABEL = {5: "CRITICAL", 4: "HIGH", 3: "MEDIUM", 2: "LOW", 1: "INFO"}
 
-    if sev5_30:
-        return 1
-    if sev5_120 or sev4_30_count >= 2:
-        return 2
-    if has_sev4:
-        return 3
-    if has_sev3:
-        return 4
-    return 5
 
 _TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
 app = Flask(__name__, template_folder=_TEMPLATES_DIR)
@@ -71,25 +75,287 @@ def _time_ago(dt: datetime) -> str:
         return f"{total_seconds // 86400}d ago"
 
 
+# Each worker process keeps one event loop thread and one pooled client, so
+# requests reuse upstream connections instead of paying fresh handshakes.
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+_loop_lock = threading.Lock()
+_client = None
+_limiter: HostLimiter | None = None
+_executor = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_pid, _client, _limiter, _executor
+    with _loop_lock:
+        # A forked worker inherits the globals but not the loop thread.
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            _client = None
+            _limiter = None
+            _executor = None
+            threading.Thread(target=_loop.run_forever, name="warmonitor-loop", daemon=True).start()
+        return _loop
+
+
+def _fetch(
+    source_status: dict[str, str],
+    validators: dict[str, dict[str, str]],
+    seen: SeenIndex | None = None,
+    metrics: FetchMetrics | None = None,
+) -> AsyncIterator[SourceBatch]:
+    global _client, _limiter, _executor
+    if _client is None:
+        _client = create_client(SETTINGS)
+        _limiter = HostLimiter(SETTINGS.per_host_limit)
+        _executor = create_executor(SETTINGS)
+    return fetch_iter(
+        SOURCES,
+        source_status,
+        validators=validators,
+        client=_client,
+        limiter=_limiter,
+        executor=_executor,
+        settings=SETTINGS,
+        seen=seen,
+        metrics=metrics,
+        archive=_archive,
+        breakers=_breakers,
+    )
+
+
+_ATTACH_RETRY = 30.0  # seconds between checks for a collector to attach to
+_ATTACH_TIMEOUT = 2.0  # seconds to wait for a collector's first snapshot
+
+
+class _FeedCache:
+    """The worker's latest fetched events, shared by all requests.
+
+    When a ``warmonitor collect`` daemon is running on this host the cache
+    mirrors its pushed feed and never fetches itself. Otherwise, within
+    ``web_cache_ttl`` seconds of a refresh the snapshot is served as is.
+    For a further ``web_stale_ttl`` seconds it is still served immediately
+    while one background refresh runs; past that, requests wait for the
+    refresh. Concurrent requests always share a single in-flight refresh.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retained = RetainedEvents(SETTINGS.max_events)
+        self.events: list[EventRecord] = []  # newest first
+        self.stats = EventStats()
+        self.clusters = StoryClusters()
+        self.index = SearchIndex()
+        self.source_status: dict[str, str] = {}
+        self.metrics = FetchMetrics()  # this worker's polls, or the collector's
+        self.etag = ""
+        self.fetched_at: float | None = None  # time.monotonic() of last refresh
+        self._validators: dict[str, dict[str, str]] = {}
+        self._seen = SeenIndex()
+        self._inflight: Future | None = None
+        self._follower: Future | None = None  # mirrors a collector while running
+        self._attached = False
+        self._next_attach = 0.0  # time.monotonic() of the next collector check
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+
+    def get(self) -> tuple[list[EventRecord], dict[str, str], str, float]:
+        """Return ``(events, source_status, etag, age_seconds)``."""
+        self._ensure_collector()
+        with self._lock:
+            if self._attached:
+                return self._snapshot(0.0)
+            age = self._age()
+            if age < self.ttl:
+                return self._snapshot(age)
+            future = self._inflight or self._start_refresh()
+            if age < self.ttl + self.stale_ttl:
+                return self._snapshot(age)
+        try:
+            future.result()
+        except Exception as exc:
+            # Serve whatever we have (possibly nothing) rather than failing the page.
+            print(f"warmonitor: warning: feed refresh failed: {exc}", file=sys.stderr)
+        with self._lock:
+            return self._snapshot(self._age())
+
+    def summary(self) -> tuple[int, int, dict[int, int]]:
+        """``(defcon, events_per_hour, severity_counts)`` for the current snapshot."""
+        with self._lock:
+            return (
+                self.stats.defcon(),
+                self.stats.events_per_hour(),
+                dict(self.stats.severity_counts),
+            )
+
+    def stories(self, events: list[EventRecord]) -> list[StoryCluster]:
+        """*events* collapsed into one entry per near-duplicate story."""
+        with self._lock:
+            return self.clusters.collapse(events)
+
+    def search(self, query: Query, limit: int | None = None) -> SearchResult:
+        """The newest events matching *query*, with facet counts."""
+        with self._lock:
+            return self.index.search(query, limit=limit)
+
+    def metrics_text(self) -> str:
+        """Fetch metrics in the Prometheus text format."""
+        self._ensure_collector()
+        with self._lock:
+            return self.metrics.render_prometheus()
+
+    def wait_for_change(self, etag: str, timeout: float) -> None:
+        """Block until the snapshot's etag differs from *etag*, or *timeout*."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.etag != etag, timeout)
+
+    def _age(self) -> float:
+        if self.fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self.fetched_at
+
+    def _snapshot(self, age: float) -> tuple[list[EventRecord], dict[str, str], str, float]:
+        return self.events, dict(self.source_status), self.etag, age
+
+    def _start_refresh(self) -> Future:
+        future = asyncio.run_coroutine_threadsafe(self._refresh(), _get_loop())
+        self._inflight = future
+        future.add_done_callback(self._refresh_done)
+        return future
+
+    def _ensure_collector(self) -> None:
+        """Attach to a running collector, checking at most every ``_ATTACH_RETRY`` s."""
+        with self._lock:
+            if self._follower is not None or time.monotonic() < self._next_attach:
+                return
+            self._next_attach = time.monotonic() + _ATTACH_RETRY
+            path = socket_path(SETTINGS)
+            if not path.exists():
+                return
+            ready = threading.Event()
+            self._follower = asyncio.run_coroutine_threadsafe(
+                self._follow(path, ready), _get_loop()
+            )
+        ready.wait(_ATTACH_TIMEOUT)
+
+    async def _follow(self, path: Path, ready: threading.Event) -> None:
+        try:
+            connection = await attach(path)
+            if connection is None:
+                return
+            async for message in connection.messages():
+                with self._lock:
+                    if "status" in message:
+                        self.source_status = dict(message["status"])
+                    if "metrics" in message:
+                        self.metrics.update(message["metrics"])
+                    if message["type"] == "snapshot":
+                        self._apply(message["events"], [e.id for e in self.events])
+                        self._attached = True
+                    elif message["type"] == "delta":
+                        self._apply(message["added"], message["removed"])
+                    self._publish()
+                ready.set()
+        finally:
+            with self._lock:
+                self._attached = False
+                self._follower = None
+            ready.set()
+
+    def _apply(self, added: list[EventRecord], removed: list[str]) -> None:
+        self.retained.apply(added, removed)
+        self._apply_merged(added, removed)
+
+    def _apply_merged(self, added: list[EventRecord], removed: list[str]) -> None:
+        """Bring the indexes in line with a change already made to :attr:`retained`."""
+        self.events = self.retained.newest()
+        self.stats.apply(added, removed)
+        self.clusters.apply(added, removed)
+        self.index.apply(added, removed)
+
+    def _publish(self) -> None:
+        self.etag = self._make_etag()
+        self.fetched_at = time.monotonic()
+        self._changed.notify_all()
+
+    def _refresh_done(self, future: Future) -> None:
+        with self._lock:
+            self._inflight = None
+
+    async def _refresh(self) -> None:
+        source_status: dict[str, str] = {}
+        batches = _fetch(source_status, self._validators, self._seen, self.metrics)
+        async with contextlib.aclosing(batches):
+            async for batch in batches:
+                with self._lock:
+                    # Unchanged feeds answer 304 and known entries are skipped,
+                    # so keep previously fetched events alongside the new ones.
+                    added, removed = self.retained.merge(batch.events)
+                    self._apply_merged(added, removed)
+                    self.source_status = dict(source_status)  # the rest still "fetching"
+                    # Long-polling clients see each source as it answers; the
+                    # snapshot's age only resets once the round is complete.
+                    self.etag = self._make_etag()
+                    self._changed.notify_all()
+        with self._lock:
+            self.source_status = source_status
+            self._publish()
+
+    def _make_etag(self) -> str:
+        digest = hashlib.sha256()
+        for e in self.events:
+            digest.update(f"{e.id}:{e.severity}\n".encode())
+        for source_id, status in sorted(self.source_status.items()):
+            digest.update(f"{source_id}={status}\n".encode())
+        return digest.hexdigest()[:20]
+
+
+_feed_cache = _FeedCache(SETTINGS.web_cache_ttl, SETTINGS.web_stale_ttl)
+
+
 @app.route("/")
 def index():
-    source_status: dict[str, str] = {}
-    events = asyncio.run(fetch_all(SOURCES, source_status))
+    events, source_status, etag, age = _feed_cache.get()
 
-    defcon = _calculate_defcon(events)
+    defcon, _, _ = _feed_cache.summary()
     now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
+    q = request.args.get("q", "").strip()
+    search_error = facets = None
+    if q:
+        try:
+            result = _feed_cache.search(parse_query(q))
+        except QueryError as exc:
+            search_error = str(exc)
+        else:
+            events = result.events
+            names = {s.id: s.name for s in SOURCES}
+            facets = {
+                "matches": result.total,
+                "Sources": {names.get(k, k): n for k, n in result.facets.source.items()},
+                "Severity": {SEVERITY_LABEL[k]: n for k, n in result.facets.severity.items()},
+                "Keywords": result.facets.keyword,
+            }
+
+    # Clustering is opt-in, as in the TUI: ?cluster=1 collapses near-duplicates.
+    cluster = request.args.get("cluster") == "1"
+    if cluster:
+        stories = sorted(_feed_cache.stories(events), key=lambda s: -s.record.ts)
+    else:
+        stories = [StoryCluster(e, 1, 1) for e in events]
     enriched_events = [
         {
             "title": e.title,
             "url": e.url,
-            "source_name": e.source_name,
+            "source_name": e.source_name + (f" +{n - 1} more" if n > 1 else ""),
             "severity": e.severity,
             "severity_label": SEVERITY_LABEL[e.severity],
             "severity_color": SEVERITY_COLOR[e.severity],
             "age": _time_ago(e.published),
         }
-        for e in events
+        for e, n, _ in stories
     ]
 
     sources_info = [
@@ -100,73 +366,302 @@ def index():
         for s in SOURCES
     ]
 
-    return render_template(
+    html = render_template(
         "index.html",
         defcon=defcon,
         events=enriched_events,
         sources=sources_info,
         now=now_str,
+        q=q,
+        cluster=cluster,
+        facets=facets,
+        search_error=search_error,
+    )
+    response = app.make_response(html)
+    # Weak: relative ages and the clock in the page change between renders.
+    response.set_etag(etag, weak=True)
+    # age is infinite when nothing has been fetched yet (e.g. the refresh failed).
+    max_age = int(_feed_cache.ttl - age) if age < _feed_cache.ttl else 0
+    response.headers["Cache-Control"] = (
+        f"public, max-age={max_age}, "
+        f"stale-while-revalidate={int(_feed_cache.stale_ttl)}"
     )
+    return response.make_conditional(request)
+
+
+# --- JSON / SSE API ---
+
+_API_PAGE_SIZE = 50
+_API_MAX_PAGE_SIZE = 200
+_STREAM_KEEPALIVE = 15.0  # seconds between SSE keep-alive comments
+
+
+class _BadRequest(ValueError):
+    pass
+
+
+def _event_json(e: EventRecord) -> dict:
+    data = e.to_dict()
+    data["severity_label"] = SEVERITY_LABEL[e.severity]
+    return data
+
+
+def _parse_since(value: str) -> datetime:
+    """Parse ``since=`` as epoch seconds or an ISO 8601 timestamp."""
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):  # not a number, or out of range
+        pass
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise _BadRequest(f"invalid since: {value!r}") from None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _int_arg(name: str, default: int) -> int:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise _BadRequest(f"invalid {name}: {value!r}") from None
+
+
+def _encode_cursor(e: EventRecord) -> str:
+    raw = f"{e.ts}:{e.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, event_id = raw.split(":", 1)
+        return float(ts), event_id
+    except ValueError:
+        raise _BadRequest("invalid cursor") from None
 
 
-# --- Tests for the Flask index route (used by pytest) ---
+def _search_query() -> Query:
+    """The ``q``, ``since``, ``min_severity`` and ``source`` filters as one query."""
+    try:
+        query = parse_query(request.args.get("q", ""))
+    except QueryError as exc:
+        raise _BadRequest(str(exc)) from None
+    if since := request.args.get("since"):
+        query = query._replace(since=int(_parse_since(since).timestamp()))
+    min_severity = max(query.min_severity, _int_arg("min_severity", 1))
+    sources = {s for value in request.args.getlist("source") for s in value.split(",") if s}
+    return query._replace(min_severity=min_severity, sources=query.sources | sources)
 
-def test_index_route(monkeypatch):
+
+def _filter_events(events: list[EventRecord]) -> list[EventRecord]:
+    """The *events* (a small batch) matching the request's search filters.
+
+    Only the words in ``q`` need the search index; the rest is checked directly.
     """
-    Exercise the index() route using Flask's test client while patching
-    warmonitor.fetcher.fetch_all to return deterministic events.
+    query = _search_query()
+    if query.since:
+        events = [e for e in events if e.ts > query.since]
+    if query.min_severity > 1:
+        events = [e for e in events if e.severity >= query.min_severity]
+    if query.sources:
+        events = [e for e in events if e.source_id in query.sources]
+    if query.keywords:
+        events = [
+            e for e in events if query.keywords <= {k.casefold() for k in e.keywords}
+        ]
+    if query.terms or query.prefixes or query.excluded:
+        text = Query(query.terms, query.prefixes, query.excluded)
+        matched = {e.id for e in _feed_cache.search(text).events}
+        events = [e for e in events if e.id in matched]
+    return events
+
+
+def _facets_json(result: SearchResult) -> dict:
+    return {
+        "source": result.facets.source,
+        "severity": {str(level): n for level, n in result.facets.severity.items()},
+        "keyword": result.facets.keyword,
+    }
+
+
+@app.errorhandler(_BadRequest)
+def _bad_request(exc: _BadRequest):
+    return jsonify(error=str(exc)), 400
+
+
+@app.route("/api/events")
+def api_events():
+    """Events newest first, searched, filtered and paginated with an opaque cursor.
+
+    The response also carries the total match count and facet counts (by
+    source, severity and matched keyword) over every match.
     """
+    _feed_cache.get()
+    result = _feed_cache.search(_search_query())
+    events = result.events
+    limit = min(max(_int_arg("limit", _API_PAGE_SIZE), 1), _API_MAX_PAGE_SIZE)
+    # Order by (published, id) descending so the cursor position is unambiguous.
+    events = sorted(events, key=lambda e: (e.ts, e.id), reverse=True)
+    if cursor := request.args.get("cursor"):
+        position = _decode_cursor(cursor)
+        events = [e for e in events if (e.ts, e.id) < position]
+    page = events[:limit]
+    next_cursor = _encode_cursor(page[-1]) if len(events) > limit else None
+    return jsonify(
+        events=[_event_json(e) for e in page],
+        next_cursor=next_cursor,
+        total=result.total,
+        facets=_facets_json(result),
+    )
 
-    class _FakeEvent:
-        def __init__(self, title, url, source_name, severity, published):
-            self.title = title
-            self.url = url
-            self.source_name = source_name
-            self.severity = severity
-            self.published = published
-
-    class _FakeSource:
-        def __init__(self, _id, name):
-            self.id = _id
-            self.name = name
-
-    async def _fake_fetch_all(sources, source_status):
-        # Set deterministic source status values for the provided sources.
-        for s in sources:
-            source_status[s.id] = "ok"
-        # Single critical event very recent -> DEFCON 1 expected.
-        published = datetime.now(timezone.utc)
-        return [
-            _FakeEvent(
-                title="Test Event",
-                url="https://example.com/event",
-                source_name="Test Source",
-                severity=5,
-                published=published,
-            )
-        ]
 
-    # Patch warmonitor.fetcher.fetch_all as requested by the rule.
-    import warmonitor.fetcher as _fetcher_mod
+@app.route("/api/status")
+def api_status():
+    """DEFCON, per-source status and event counts."""
+    events, source_status, _, age = _feed_cache.get()
+    defcon, last_hour, severity_counts = _feed_cache.summary()
+    return jsonify(
+        defcon=defcon,
+        generated_at=datetime.now(timezone.utc).isoformat(),
+        data_age_seconds=None if age == float("inf") else round(age, 1),
+        sources=[
+            {"id": s.id, "name": s.name, "status": source_status.get(s.id, "unknown")}
+            for s in SOURCES
+        ],
+        counts={
+            "total": len(events),
+            "last_hour": last_hour,
+            "by_severity": {str(level): n for level, n in severity_counts.items()},
+        },
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    """Per-source fetch metrics for Prometheus to scrape.
+
+    Reports this worker's own polls, or the collector's when one is attached.
+    """
+    return Response(_feed_cache.metrics_text(), mimetype="text/plain; version=0.0.4")
 
-    monkeypatch.setattr(_fetcher_mod, "fetch_all", _fake_fetch_all, raising=False)
-    # Also patch the local fetch_all symbol used by index().
-    monkeypatch.setattr(__name__, "fetch_all", _fake_fetch_all, raising=False)
 
-    # Provide deterministic SOURCES with a single fake source.
-    fake_sources = [_FakeSource("fake-source", "Fake Source")]
-    monkeypatch.setattr(__name__, "SOURCES", fake_sources, raising=False)
+_ARCHIVE_SPAN = 7 * 86400  # default archive query range, seconds
+_ARCHIVE_STEPS = {"hour": 3600, "day": 86400}
 
-    # Use Flask's test client to hit the index route.
-    with app.test_client() as client:
-        resp = client.get("/")
 
-    assert resp.status_code == 200
-    html = resp.data.decode("utf-8")
+def _archive_range() -> tuple[int, int]:
+    """``[start, end)`` from the ``start`` / ``end`` parameters (default: the last week)."""
+    end = request.args.get("end")
+    end_ts = int(_parse_since(end).timestamp()) if end else int(time.time()) + 1
+    start = request.args.get("start")
+    start_ts = int(_parse_since(start).timestamp()) if start else end_ts - _ARCHIVE_SPAN
+    if start_ts >= end_ts:
+        raise _BadRequest("start must be before end")
+    return start_ts, end_ts
 
-    # Ensure DEFCON information and enriched event fields are present.
-    assert "DEFCON" in html
-    assert "Test Event" in html
-    assert "Test Source" in html
-    # Severity 5 should map to the CRITICAL label in the rendered page.
-    assert "CRITICAL" in html
+
+class _NotFound(LookupError):
+    pass
+
+
+@app.errorhandler(_NotFound)
+def _not_found(exc: _NotFound):
+    return jsonify(error=str(exc)), 404
+
+
+def _require_archive():
+    if _archive is None:
+        raise _NotFound("the event archive is disabled (archive_dir is not set)")
+    return _archive
+
+
+@app.route("/api/archive/events")
+def api_archive_events():
+    """Archived events in a time range, newest first, paginated like ``/api/events``.
+
+    Reads only the archive days between ``start`` and ``end``; filters by
+    ``min_severity`` and ``source``.
+    """
+    archive = _require_archive()
+    start, end = _archive_range()
+    limit = min(max(_int_arg("limit", _API_PAGE_SIZE), 1), _API_MAX_PAGE_SIZE)
+    cursor = request.args.get("cursor")
+    before = None
+    if cursor:
+        ts, event_id = _decode_cursor(cursor)
+        before = (int(ts), event_id)
+    sources = {s for value in request.args.getlist("source") for s in value.split(",") if s}
+    events = archive.events(
+        start,
+        end,
+        sources=sources,
+        min_severity=_int_arg("min_severity", 1),
+        limit=limit + 1,
+        before=before,
+    )
+    page = events[:limit]
+    return jsonify(
+        events=[_event_json(e) for e in page],
+        next_cursor=_encode_cursor(page[-1]) if len(events) > limit else None,
+    )
+
+
+@app.route("/api/archive/trend")
+def api_archive_trend():
+    """Event counts per ``step`` (``hour`` or ``day``) from the archive rollups."""
+    archive = _require_archive()
+    start, end = _archive_range()
+    step = request.args.get("step", "hour")
+    if step not in _ARCHIVE_STEPS:
+        raise _BadRequest(f"invalid step: {step!r} (hour or day)")
+    buckets = archive.trend(start, end, _ARCHIVE_STEPS[step])
+    return jsonify(
+        step=step,
+        buckets=[
+            {
+                "start": datetime.fromtimestamp(b.start, tz=timezone.utc).isoformat(),
+                "total": b.total,
+                "by_severity": {str(level): n for level, n in b.severity.items()},
+                "by_source": b.source,
+            }
+            for b in buckets
+        ],
+    )
+
+
+def _event_stream(events: list[EventRecord], etag: str):
+    """Yield SSE messages for events that appear after the initial snapshot."""
+    seen = {e.id for e in events}  # ids in the last snapshot, so it stays bounded
+    for e in reversed(_filter_events(events) if request.args.get("since") else []):
+        yield f"id: {e.id}\nevent: event\ndata: {json.dumps(_event_json(e))}\n\n"
+    while True:
+        _feed_cache.wait_for_change(etag, _STREAM_KEEPALIVE)
+        events, _, new_etag, _ = _feed_cache.get()
+        if new_etag == etag:
+            yield ": keepalive\n\n"
+            continue
+        etag = new_etag
+        fresh = [e for e in events if e.id not in seen]
+        seen = {e.id for e in events}
+        for e in reversed(_filter_events(fresh)):
+            yield f"id: {e.id}\nevent: event\ndata: {json.dumps(_event_json(e))}\n\n"
+
+
+@app.route("/api/stream")
+def api_stream():
+    """Server-Sent Events stream of new events as they are fetched.
+
+    Accepts the same ``min_severity`` and ``source`` filters as
+    ``/api/events``; with ``since``, matching events already known are sent
+    first.
+    """
+    events, _, etag, _ = _feed_cache.get()
+    _filter_events(events)  # validate query parameters before streaming starts
+    return Response(
+        stream_with_context(_event_stream(events, etag)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
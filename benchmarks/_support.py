@@ -0,0 +1,165 @@
+"""Shared helpers for the warmonitor benchmarks: feeds, stub server, stats."""
+
+from __future__ import annotations
+
+import http.server
+import statistics
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import feedparser
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def fixture_items() -> list[tuple[str, str]]:
+    """``(title, description)`` pairs from the feed fixtures."""
+    items: list[tuple[str, str]] = []
+    for path in sorted(FIXTURES.glob("*.xml")):
+        feed = feedparser.parse(path.read_bytes())
+        items.extend((entry.title, entry.summary) for entry in feed.entries)
+    return items
+
+
+def synthetic_feed(entries: int, prefix: str = "item") -> bytes:
+    """An RSS document with *entries* items cycled from the fixtures.
+
+    Links are unique per *prefix* and index, so feeds built with different
+    prefixes do not deduplicate against each other.
+    """
+    items = fixture_items()
+    start = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        "<title>Synthetic</title><link>https://bench.example/</link><ttl>5</ttl>"
+    ]
+    for i in range(entries):
+        title, summary = items[i % len(items)]
+        published = format_datetime(start - timedelta(minutes=i), usegmt=True)
+        parts.append(
+            f"<item><title>{escape(title)}</title>"
+            f"<link>https://bench.example/{prefix}/{i}</link>"
+            f"<description>{escape(summary)}</description>"
+            f"<pubDate>{published}</pubDate></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode()
+
+
+class StubServer:
+    """Threaded local HTTP server serving fixed bodies by path.
+
+    Paths in *delays* wait that many seconds before answering.
+    """
+
+    def __init__(self, routes: dict[str, bytes], delays: dict[str, float] | None = None) -> None:
+        self.routes = routes
+        routes_ref = routes
+        delays_ref = delays or {}
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                body = routes_ref.get(self.path)
+                time.sleep(delays_ref.get(self.path, 0))
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (e.g. a cancelled fetch)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self) -> StubServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn: Callable[[], object], repeat: int) -> list[float]:
+    """Wall-clock seconds for each of *repeat* calls to *fn*."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    """Peak bytes allocated by Python while running *fn* once."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Result:
+    """One benchmark row: throughput, latency percentiles and peak memory."""
+
+    def __init__(
+        self, name: str, params: str, samples: list[float], items: int, peak: int
+    ) -> None:
+        self.name = name
+        self.params = params
+        self.samples = samples
+        self.items = items  # units processed per sample (entries, events, ...)
+        self.peak = peak
+
+    def as_dict(self) -> dict:
+        mean = statistics.fmean(self.samples)
+        return {
+            "name": self.name,
+            "params": self.params,
+            "items_per_sec": self.items / mean if mean else 0.0,
+            "p50_ms": percentile(self.samples, 50) * 1000,
+            "p95_ms": percentile(self.samples, 95) * 1000,
+            "p99_ms": percentile(self.samples, 99) * 1000,
+            "peak_mib": self.peak / 2**20,
+        }
+
+
+def print_table(results: list[Result]) -> None:
+    header = f"{'benchmark':<14} {'params':<26} {'items/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak MiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        row = result.as_dict()
+        print(
+            f"{row['name']:<14} {row['params']:<26} {row['items_per_sec']:>12,.0f} "
+            f"{row['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} {row['p99_ms']:>10.2f} "
+            f"{row['peak_mib']:>9.1f}"
+        )
@@ -0,0 +1,430 @@
+"""Benchmarks for the fetch → parse → score → merge pipeline.
+
+Runs fully offline: feeds are synthesised from ``benchmarks/fixtures`` and
+served by a local stub HTTP server.
+
+    python -m benchmarks.bench_pipeline            # quick sizes
+    python -m benchmarks.bench_pipeline --full     # adds 100k entries / 1000 sources
+    python -m benchmarks.bench_pipeline --only parse,score --json out.json
+
+Each row reports throughput (items per second), per-run latency percentiles
+and peak Python memory (tracemalloc, measured in one extra run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import string
+import sys
+import tempfile
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks._support import (  # noqa: E402
+    Result,
+    StubServer,
+    fixture_items,
+    peak_memory,
+    print_table,
+    synthetic_feed,
+    timed,
+)
+from warmonitor import cache  # noqa: E402
+from warmonitor.analytics import EventStats, calculate_defcon  # noqa: E402
+from warmonitor.cluster import StoryClusters  # noqa: E402
+from warmonitor.fetcher import (  # noqa: E402
+    SEVERITY_KEYWORDS,
+    HostLimiter,
+    _make_event_id,
+    _parse_feed,
+    create_client,
+    fetch_all,
+    fetch_iter,
+)
+from warmonitor.keywords import KeywordMatcher  # noqa: E402
+from warmonitor.models import Event, Source  # noqa: E402
+from warmonitor.records import (  # noqa: E402
+    EventRecord,
+    compact_summary,
+    intern_keywords,
+    source_ref,
+)
+from warmonitor.retention import RetainedEvents  # noqa: E402
+from warmonitor.search import SearchIndex  # noqa: E402
+from warmonitor.seen import SeenIndex  # noqa: E402
+
+BASE_KEYWORDS = ["Iran", "Israel", "US military", "Middle East", "strike"]
+
+
+def keyword_list(size: int) -> list[str]:
+    """*size* keywords: the realistic base list padded with pseudo-words."""
+    rng = random.Random(size)
+    extra = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(max(0, size - len(BASE_KEYWORDS)))
+    ]
+    return (BASE_KEYWORDS + extra)[:size]
+
+
+def make_source(source_id: str, url: str, keywords: list[str]) -> Source:
+    return Source(
+        id=source_id,
+        name=f"Bench {source_id}",
+        url=url,
+        type="rss",
+        keywords=keywords,
+        credibility="HIGH",
+        color="green",
+    )
+
+
+def make_pydantic_events(count: int) -> list[Event]:
+    now = datetime.now(timezone.utc)
+    items = fixture_items()
+    return [
+        Event(
+            id=_make_event_id(f"https://bench.example/e/{i}"),
+            title=items[i % len(items)][0],
+            summary=items[i % len(items)][1],
+            url=f"https://bench.example/e/{i}",
+            published=now - timedelta(seconds=37 * i),
+            source_id=f"s{i % 6}",
+            source_name=f"Bench s{i % 6}",
+            credibility="HIGH",
+            keywords_matched=["Iran"],
+            severity=1 + i % 5,
+        )
+        for i in range(count)
+    ]
+
+
+def make_events(count: int) -> list[EventRecord]:
+    """*count* records built the way the parser builds them (no Pydantic)."""
+    now = int(datetime.now(timezone.utc).timestamp())
+    items = fixture_items()
+    sources = [source_ref(f"s{i}", f"Bench s{i}", "HIGH") for i in range(6)]
+    keywords = intern_keywords(["Iran"])
+    return [
+        EventRecord(
+            id=_make_event_id(f"https://bench.example/e/{i}"),
+            title=items[i % len(items)][0],
+            summary=compact_summary(items[i % len(items)][1]),
+            url=f"https://bench.example/e/{i}",
+            ts=now - 37 * i,
+            source=sources[i % 6],
+            keywords=keywords,
+            severity=1 + i % 5,
+        )
+        for i in range(count)
+    ]
+
+
+def _run(name: str, params: str, fn: Callable[[], object], items: int, repeat: int) -> Result:
+    fn()  # warm caches (compiled matchers, imports, connections)
+    samples = timed(fn, repeat)
+    return Result(name, params, samples, items, peak_memory(fn))
+
+
+def bench_parse(sizes: list[int], repeat: int) -> list[Result]:
+    source = make_source("parse", "https://bench.example/feed", BASE_KEYWORDS)
+    results = []
+    for entries in sizes:
+        body = synthetic_feed(entries)
+        runs = repeat if entries <= 1000 else 1
+        results.append(
+            _run("parse", f"entries={entries}", lambda: _parse_feed(body, source), entries, runs)
+        )
+        # Steady state: every entry was ingested on an earlier poll.
+        index = SeenIndex(recent_limit=entries)
+        index.add(source.id, _parse_feed(body, source).keys)
+        seen = index.view(source.id)
+        results.append(
+            _run(
+                "parse_seen",
+                f"entries={entries}",
+                lambda: _parse_feed(body, source, seen),
+                entries,
+                runs,
+            )
+        )
+    return results
+
+
+def bench_score(sizes: list[int], keyword_sizes: list[int], repeat: int) -> list[Result]:
+    items = fixture_items()
+    results = []
+    for keywords in keyword_sizes:
+        matcher = KeywordMatcher(keyword_list(keywords), SEVERITY_KEYWORDS)
+        for entries in sizes:
+            texts = [f"{t} {s}" for t, s in (items[i % len(items)] for i in range(entries))]
+
+            def score() -> None:
+                for text in texts:
+                    matcher.scan(text)
+
+            runs = repeat if entries <= 1000 else 1
+            results.append(
+                _run("score", f"keywords={keywords} entries={entries}", score, entries, runs)
+            )
+    return results
+
+
+def bench_fetch_all(source_counts: list[int], repeat: int, entries: int = 20) -> list[Result]:
+    results = []
+    for count in source_counts:
+        routes = {f"/feed/{i}": synthetic_feed(entries, prefix=f"s{i}") for i in range(count)}
+        with StubServer(routes) as server:
+            sources = [
+                make_source(f"s{i}", server.url(f"/feed/{i}"), BASE_KEYWORDS) for i in range(count)
+            ]
+
+            async def cycles(n: int) -> list[float]:
+                client = create_client()
+                limiter = HostLimiter(64)
+                loop = asyncio.get_running_loop()
+                samples = []
+                try:
+                    for _ in range(n):
+                        start = loop.time()
+                        await fetch_all(sources, {}, client=client, limiter=limiter)
+                        samples.append(loop.time() - start)
+                finally:
+                    await client.aclose()
+                return samples
+
+            asyncio.run(cycles(1))
+            runs = repeat if count <= 100 else 2
+            samples = asyncio.run(cycles(runs))
+            peak = peak_memory(lambda: asyncio.run(cycles(1)))
+        results.append(Result("fetch_all", f"sources={count}", samples, count * entries, peak))
+    return results
+
+
+def bench_stream(repeat: int, count: int = 6, slow: float = 0.5) -> list[Result]:
+    """Time to the first events with one slow feed: fetch_all vs fetch_iter."""
+    routes = {f"/feed/{i}": synthetic_feed(20, prefix=f"s{i}") for i in range(count)}
+    with StubServer(routes, delays={"/feed/0": slow}) as server:
+        sources = [
+            make_source(f"s{i}", server.url(f"/feed/{i}"), BASE_KEYWORDS) for i in range(count)
+        ]
+
+        async def first_events(streaming: bool) -> float:
+            client = create_client()
+            start = asyncio.get_running_loop().time()
+            try:
+                if not streaming:
+                    await fetch_all(sources, {}, client=client)
+                    return asyncio.get_running_loop().time() - start
+                batches = fetch_iter(sources, {}, client=client)
+                async with contextlib.aclosing(batches):
+                    async for batch in batches:
+                        if batch.events:
+                            return asyncio.get_running_loop().time() - start
+                raise AssertionError("no events fetched")
+            finally:
+                await client.aclose()
+
+        results = []
+        for name, streaming in (("first_gather", False), ("first_stream", True)):
+            samples = [asyncio.run(first_events(streaming)) for _ in range(repeat)]
+            peak = peak_memory(lambda: asyncio.run(first_events(streaming)))
+            results.append(Result(name, f"sources={count} slow={slow}s", samples, 20, peak))
+    return results
+
+
+def bench_defcon(sizes: list[int], repeat: int) -> list[Result]:
+    results = []
+    for count in sizes:
+        events = make_events(count)
+        results.append(
+            _run("defcon", f"events={count}", lambda: calculate_defcon(events), count, repeat)
+        )
+        stats = EventStats(events)
+        results.append(
+            _run("defcon_incr", f"events={count}", stats.defcon, count, repeat)
+        )
+    return results
+
+
+def bench_cluster(sizes: list[int], repeat: int) -> list[Result]:
+    results = []
+    for count in sizes:
+        events = make_events(count)
+        runs = repeat if count <= 10_000 else 1
+        results.append(
+            _run("cluster_build", f"events={count}", lambda: StoryClusters(events), count, runs)
+        )
+        clusters = StoryClusters(events)
+        fresh = make_events(count + 100)[count:]
+
+        def add_batch() -> None:
+            clusters.apply(fresh, [e.id for e in fresh])
+
+        results.append(_run("cluster_add", f"events={count} +100", add_batch, 100, repeat))
+        results.append(
+            _run("cluster_view", f"events={count}", lambda: clusters.collapse(events), count, repeat)
+        )
+    return results
+
+
+def bench_search(sizes: list[int], repeat: int) -> list[Result]:
+    """Index build, then queries returning the newest 100 matches plus facets."""
+    results = []
+    queries = {
+        "term": "iran",
+        "terms": "iran strike",
+        "prefix": "milit*",
+        "facet": "severity:4 source:s1",
+        "none": "zzzz",
+    }
+    for count in sizes:
+        events = make_events(count)
+        runs = repeat if count <= 10_000 else 1
+        results.append(
+            _run("search_build", f"events={count}", lambda: SearchIndex(events), count, runs)
+        )
+        index = SearchIndex(events)
+        for name, query in queries.items():
+
+            def search(query: str = query) -> None:
+                index.search(query, limit=100)
+
+            results.append(_run("search_query", f"events={count} {name}", search, count, repeat))
+    return results
+
+
+def _sort_merge(
+    current: list[EventRecord], new: list[EventRecord], limit: int
+) -> tuple[list[EventRecord], list[EventRecord], list[str]]:
+    """The merge RetainedEvents replaced: concatenate, re-sort, truncate, diff."""
+    new_ids = {e.id for e in new}
+    merged = sorted(new + [e for e in current if e.id not in new_ids], key=lambda e: -e.ts)
+    merged = merged[:limit]
+    previous = {e.id: e for e in current}
+    kept = {e.id for e in merged}
+    added = [e for e in merged if previous.get(e.id) != e]
+    return merged, added, [i for i in previous if i not in kept]
+
+
+def bench_merge(sizes: list[int], repeat: int) -> list[Result]:
+    """Merging 100 newer events into a full window of K, and the severity sort toggle."""
+    results = []
+    for count in sizes:
+        pool = make_events(count + 100 * (repeat + 2))
+        runs = iter(range(repeat + 2, 0, -1))  # _run calls each function repeat + 2 times
+        current = pool[-count:]
+
+        def sort_merge() -> None:
+            nonlocal current
+            n = next(runs)
+            current = _sort_merge(current, pool[100 * (n - 1) : 100 * n], count)[0]
+
+        results.append(_run("merge_sort", f"events={count} +100", sort_merge, 100, repeat))
+        runs = iter(range(repeat + 2, 0, -1))
+        retained = RetainedEvents(count, pool[-count:])
+
+        def topk_merge() -> None:
+            n = next(runs)
+            retained.merge(pool[100 * (n - 1) : 100 * n])
+
+        results.append(_run("merge_topk", f"events={count} +100", topk_merge, 100, repeat))
+        events = retained.newest()
+        results.append(
+            _run(
+                "severity_sort",
+                f"events={count}",
+                lambda: sorted(events, key=lambda e: (-e.severity, -e.ts)),
+                count,
+                repeat,
+            )
+        )
+        results.append(
+            _run("severity_view", f"events={count}", retained.by_severity, count, repeat)
+        )
+    return results
+
+
+def bench_retain(sizes: list[int]) -> list[Result]:
+    """Memory to hold *size* events as Pydantic models vs compact records."""
+    results = []
+    for count in sizes:
+        for name, build in (("retain_model", make_pydantic_events), ("retain_record", make_events)):
+            samples = timed(lambda: build(count), 1)
+            peak = peak_memory(lambda: build(count))
+            results.append(Result(name, f"events={count}", samples, count, peak))
+    return results
+
+
+def bench_cache(sizes: list[int], repeat: int) -> list[Result]:
+    results = []
+    for count in sizes:
+        events = make_events(count)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {
+                "_CACHE_PATH": Path(tmp) / "cache.db",
+                "_LEGACY_CACHE_PATH": Path(tmp) / "cache.json",
+            }
+            with mock.patch.multiple(cache, **paths):
+
+                def save_cold() -> None:
+                    paths["_CACHE_PATH"].unlink(missing_ok=True)
+                    cache._written_path = None
+                    cache.save_cache(events, count)
+
+                results.append(_run("cache_save", f"events={count}", save_cold, count, repeat))
+                results.append(
+                    _run(
+                        "cache_load",
+                        f"events={count}",
+                        lambda: cache.load_cache(count),
+                        count,
+                        repeat,
+                    )
+                )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="include the largest sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    entries = [10, 1_000] + ([100_000] if args.full else [])
+    sources = [6, 100] + ([1_000] if args.full else [])
+    keywords = [5, 500]
+    events = [200, 10_000] + ([100_000] if args.full else [])
+
+    benches: dict[str, Callable[[], list[Result]]] = {
+        "parse": lambda: bench_parse(entries, args.repeat),
+        "score": lambda: bench_score(entries, keywords, args.repeat),
+        "fetch_all": lambda: bench_fetch_all(sources, args.repeat),
+        "stream": lambda: bench_stream(args.repeat),
+        "defcon": lambda: bench_defcon(events, args.repeat),
+        "cache": lambda: bench_cache([500, 10_000], args.repeat),
+        "cluster": lambda: bench_cluster(events, args.repeat),
+        "search": lambda: bench_search(events, args.repeat),
+        "retain": lambda: bench_retain(events),
+        "merge": lambda: bench_merge(events, args.repeat),
+    }
+    selected = [name for name in args.only.split(",") if name] or list(benches)
+    results: list[Result] = []
+    for name in selected:
+        results.extend(benches[name]())
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps([r.as_dict() for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
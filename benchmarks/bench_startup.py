@@ -0,0 +1,134 @@
+"""Cold-start benchmark for the TUI: time until the cached feed is on screen.
+
+Each run starts a fresh interpreter with a temporary ``HOME`` holding a
+pre-populated event cache and a config whose feeds never answer (a socket
+that accepts connections but never replies), so the network cannot make the
+first paint look fast or slow.
+
+    python -m benchmarks.bench_startup                # 0 and 500 cached events
+    python -m benchmarks.bench_startup --repeat 10 --json startup.json
+
+Rows: ``import`` (process start → ``warmonitor.main`` imported) and
+``first_paint`` (process start → cached events mounted and rendered). The
+first run of each size also rebuilds the config cache; it is reported
+separately as ``first_paint_cold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._support import Result, print_table  # noqa: E402
+from benchmarks.bench_pipeline import make_events  # noqa: E402
+from warmonitor import cache  # noqa: E402
+
+# Runs in the child interpreter; keep imports to the bare minimum before the
+# app module so they do not count towards its import time.
+_PROBE = """
+import asyncio, json, sys, time
+sys.path.insert(0, sys.argv[1])
+expected = int(sys.argv[2])
+import warmonitor.main as main
+imported = time.time()
+app = main.WarmonitorApp(standalone=True)
+
+async def probe(pilot):
+    while len(app.events_data) < expected:
+        await asyncio.sleep(0.001)
+    await pilot.pause()
+    print(json.dumps({"imported": imported, "painted": time.time()}))
+    app.exit()
+
+app.run(headless=True, size=(160, 50), auto_pilot=probe)
+"""
+
+
+def _silent_feed() -> socket.socket:
+    """A listening socket that is never accepted from: requests just hang."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(128)
+    return sock
+
+
+def _write_home(home: Path, port: int, events: int) -> None:
+    limit = max(events, 1)
+    sources = "\n".join(
+        f'[[sources]]\nid = "s{i}"\nname = "Bench s{i}"\n'
+        f'url = "http://127.0.0.1:{port}/feed/{i}"\ntype = "rss"\n'
+        f'keywords = ["Iran"]\ncredibility = "HIGH"\ncolor = "green"\n'
+        for i in range(6)
+    )
+    (home / ".warmonitor.toml").write_text(
+        f"replace_defaults = true\nmax_events = {limit}\n\n{sources}"
+    )
+    paths = {
+        "_CACHE_PATH": home / ".warmonitor_cache.db",
+        "_LEGACY_CACHE_PATH": home / ".warmonitor_cache.json",
+        "_written_path": None,
+    }
+    with mock.patch.multiple(cache, **paths):
+        cache.save_cache(make_events(events), limit)
+
+
+def _run_once(home: Path, events: int, timeout: float) -> tuple[float, float]:
+    env = dict(os.environ, HOME=str(home))
+    start = time.time()
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, str(ROOT), str(events)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=True,
+    )
+    times = json.loads(out.stdout.strip().splitlines()[-1])
+    return times["imported"] - start, times["painted"] - start
+
+
+def bench_startup(sizes: list[int], repeat: int, timeout: float) -> list[Result]:
+    results = []
+    feed = _silent_feed()
+    try:
+        for events in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                home = Path(tmp)
+                _write_home(home, feed.getsockname()[1], events)
+                _, cold = _run_once(home, events, timeout)
+                runs = [_run_once(home, events, timeout) for _ in range(repeat)]
+            params = f"cached={events}"
+            results.append(Result("import", params, [r[0] for r in runs], 1, 0))
+            results.append(Result("first_paint", params, [r[1] for r in runs], 1, 0))
+            results.append(Result("first_paint_cold", params, [cold], 1, 0))
+    finally:
+        feed.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per run")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    results = bench_startup([0, 500], args.repeat, args.timeout)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps([r.as_dict() for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
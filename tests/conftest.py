@@ -0,0 +1,45 @@
+"""Shared fixtures: keep every test away from the real home directory."""
+
+from __future__ import annotations
+
+import pytest
+
+from warmonitor import cache, config
+from warmonitor.records import EventRecord, intern_keywords, source_ref
+
+T0 = 1_750_000_000
+
+
+def make_record(
+    n: int = 0,
+    *,
+    event_id: str | None = None,
+    title: str = "Test event",
+    summary: str = "Summary",
+    url: str | None = None,
+    ts: int | None = None,
+    source_id: str = "test",
+    source_name: str = "Test Source",
+    keywords: tuple[str, ...] = ("Iran",),
+    severity: int = 3,
+) -> EventRecord:
+    """An ``EventRecord`` numbered *n*: id ``ev-<n>``, published at ``T0 + n``."""
+    return EventRecord(
+        id=event_id or f"ev-{n}",
+        title=title,
+        summary=summary,
+        url=url or f"https://example.com/{event_id or n}",
+        ts=T0 + n if ts is None else ts,
+        source=source_ref(source_id, source_name, "HIGH"),
+        keywords=intern_keywords(keywords),
+        severity=severity,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_CONFIG_PATH", tmp_path / "warmonitor.toml")
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", tmp_path / "config.cache")
+    monkeypatch.setattr(config, "_pending_cache", None)
+    monkeypatch.setattr(cache, "_CACHE_PATH", tmp_path / "cache.db")
+    monkeypatch.setattr(cache, "_LEGACY_CACHE_PATH", tmp_path / "cache.json")
@@ -0,0 +1,92 @@
+"""Tests for warmonitor.analytics module."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from tests.conftest import make_record
+from warmonitor.analytics import EventStats, calculate_defcon
+
+
+def _ago(minutes: float) -> int:
+    return int(time.time() - minutes * 60)
+
+
+# ── calculate_defcon ─────────────────────────────────────────────────────────
+
+def test_calculate_defcon_no_events():
+    assert calculate_defcon([]) == 5
+
+
+def test_calculate_defcon_sev3_only():
+    events = [make_record(severity=3, ts=_ago(0))]
+    assert calculate_defcon(events) == 4
+
+
+def test_calculate_defcon_single_sev4():
+    events = [make_record(severity=4, ts=_ago(60))]
+    assert calculate_defcon(events) == 3
+
+
+def test_calculate_defcon_two_sev4_recent():
+    events = [
+        make_record(1, severity=4, ts=_ago(10)),
+        make_record(2, severity=4, ts=_ago(20)),
+    ]
+    assert calculate_defcon(events) == 2
+
+
+def test_calculate_defcon_sev5_recent():
+    events = [make_record(severity=5, ts=_ago(5))]
+    assert calculate_defcon(events) == 1
+
+
+def test_calculate_defcon_sev5_old():
+    events = [make_record(severity=5, ts=_ago(90))]
+    assert calculate_defcon(events) == 2
+
+
+# ── EventStats ───────────────────────────────────────────────────────────────
+
+def test_stats_counts_and_breakdown():
+    stats = EventStats(
+        [
+            make_record(1, severity=5, ts=_ago(10), source_id="a"),
+            make_record(2, severity=3, ts=_ago(90), source_id="a"),
+            make_record(3, severity=3, ts=_ago(200), source_id="b"),
+        ]
+    )
+    assert len(stats) == 3
+    assert stats.events_per_hour() == 1
+    assert stats.severity_counts == {1: 0, 2: 0, 3: 2, 4: 0, 5: 1}
+    assert stats.source_counts == {"a": 2, "b": 1}
+
+
+def test_stats_window_boundary_is_exact():
+    now = datetime(2025, 1, 1, 12, 0, 30, tzinfo=timezone.utc)
+    inside = make_record(
+        1, severity=5, ts=int((now - timedelta(minutes=29, seconds=59)).timestamp())
+    )
+    outside = make_record(
+        2, severity=5, ts=int((now - timedelta(minutes=30, seconds=1)).timestamp())
+    )
+    assert EventStats([inside]).defcon(now) == 1
+    assert EventStats([outside]).defcon(now) == 2
+
+
+def test_stats_discard_and_replace():
+    sev5 = make_record(severity=5, ts=_ago(5))
+    stats = EventStats([sev5])
+    assert stats.defcon() == 1
+    stats.apply(added=[], removed=[sev5.id])
+    assert stats.defcon() == 5
+    assert len(stats) == 0
+    assert stats.source_counts == {}
+
+    stats.add(sev5)
+    downgraded = sev5._replace(severity=3)
+    stats.add(downgraded)
+    assert len(stats) == 1
+    assert stats.severity_counts[5] == 0
+    assert stats.defcon() == 4
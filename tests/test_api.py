@@ -0,0 +1,270 @@
+"""Tests for the Flask backend in api/index.py."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("flask")
+
+from api import index as api  # noqa: E402
+from tests.conftest import make_record  # noqa: E402
+from warmonitor.analytics import EventStats  # noqa: E402
+from warmonitor.archive import Archive  # noqa: E402
+from warmonitor.fetcher import SourceBatch  # noqa: E402
+from warmonitor.search import SearchIndex  # noqa: E402
+
+
+@pytest.fixture
+def fetch_calls(monkeypatch):
+    calls: list[int] = []
+
+    async def fake_fetch_iter(sources, source_status, **kwargs):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        for s in sources:
+            source_status[s.id] = "ok"
+        yield SourceBatch(sources[0], [make_record(len(calls), severity=5)])
+
+    monkeypatch.setattr(api, "fetch_iter", fake_fetch_iter)
+    monkeypatch.setattr(api, "_feed_cache", api._FeedCache(ttl=60, stale_ttl=300))
+    return calls
+
+
+def test_index_renders_cached_events(fetch_calls):
+    client = api.app.test_client()
+    first = client.get("/")
+    second = client.get("/")
+    assert first.status_code == second.status_code == 200
+    html = first.get_data(as_text=True)
+    assert "DEFCON" in html
+    assert "Test event" in html
+    assert "Test Source" in html
+    assert "CRITICAL" in html
+    assert len(fetch_calls) == 1
+    assert "stale-while-revalidate=300" in first.headers["Cache-Control"]
+
+
+def test_index_conditional_request(fetch_calls):
+    client = api.app.test_client()
+    etag = client.get("/").headers["ETag"]
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_index_survives_failed_first_refresh(monkeypatch):
+    async def failing_fetch_iter(sources, source_status, **kwargs):
+        raise RuntimeError("network down")
+        yield
+
+    monkeypatch.setattr(api, "fetch_iter", failing_fetch_iter)
+    monkeypatch.setattr(api, "_feed_cache", api._FeedCache(ttl=60, stale_ttl=300))
+    response = api.app.test_client().get("/")
+    assert response.status_code == 200
+    assert "max-age=0," in response.headers["Cache-Control"]
+
+
+def test_metrics_exposes_fetch_metrics(monkeypatch):
+    async def fake_fetch_iter(sources, source_status, metrics=None, **kwargs):
+        for s in sources:
+            source_status[s.id] = "ok"
+        metrics.record("reuters", "ok", {"ttfb": 0.2}, size=2048, new=4, matched=1)
+        metrics.record("reuters", "error", {"connect": 3.0}, error="ConnectTimeout")
+        yield SourceBatch(sources[0], [])
+
+    monkeypatch.setattr(api, "fetch_iter", fake_fetch_iter)
+    monkeypatch.setattr(api, "_feed_cache", api._FeedCache(ttl=60, stale_ttl=300))
+    client = api.app.test_client()
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'warmonitor_fetch_phase_seconds_count{source="reuters",phase="ttfb"} 1' in text
+    assert 'warmonitor_fetch_bytes_total{source="reuters"} 2048' in text
+    assert 'warmonitor_fetch_errors_total{source="reuters",error="ConnectTimeout"} 1' in text
+
+
+def test_concurrent_requests_share_one_fetch(fetch_calls):
+    statuses: list[int] = []
+    threads = [
+        threading.Thread(target=lambda: statuses.append(api.app.test_client().get("/").status_code))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert statuses == [200] * 5
+    assert len(fetch_calls) == 1
+
+
+def test_stale_snapshot_served_while_refreshing(fetch_calls):
+    cache = api._feed_cache
+    events, _, _, _ = cache.get()
+    cache.fetched_at -= cache.ttl + 1
+    stale, _, _, _ = cache.get()
+    assert stale is events
+    cache._inflight.result()
+    fresh, _, _, _ = cache.get()
+    assert [e.id for e in fresh] == ["ev-2", "ev-1"]
+
+
+@pytest.fixture
+def loaded_cache(monkeypatch):
+    cache = api._FeedCache(ttl=60, stale_ttl=300)
+    events = [
+        make_record(n, title=f"Event {n}", severity=1 + n % 5)._replace(
+            ts=int(datetime(2025, 1, 1, n, tzinfo=timezone.utc).timestamp())
+        )
+        for n in range(7)
+    ]
+    cache.events = sorted(events, key=lambda e: e.ts, reverse=True)
+    cache.stats = EventStats(cache.events)
+    cache.index = SearchIndex(cache.events)
+    cache.source_status = {"test": "ok"}
+    cache.fetched_at = api.time.monotonic()
+    monkeypatch.setattr(api, "_feed_cache", cache)
+    return cache
+
+
+def test_api_events_paginates_with_cursor(loaded_cache):
+    client = api.app.test_client()
+    first = client.get("/api/events?limit=3").get_json()
+    assert [e["id"] for e in first["events"]] == ["ev-6", "ev-5", "ev-4"]
+    second = client.get(f"/api/events?limit=3&cursor={first['next_cursor']}").get_json()
+    assert [e["id"] for e in second["events"]] == ["ev-3", "ev-2", "ev-1"]
+    third = client.get(f"/api/events?limit=3&cursor={second['next_cursor']}").get_json()
+    assert [e["id"] for e in third["events"]] == ["ev-0"]
+    assert third["next_cursor"] is None
+
+
+def test_api_events_filters(loaded_cache):
+    client = api.app.test_client()
+    data = client.get("/api/events?min_severity=4&since=2025-01-01T01:30:00Z").get_json()
+    assert [e["id"] for e in data["events"]] == ["ev-4", "ev-3"]
+    assert data["events"][0]["severity_label"] == "CRITICAL"
+    assert client.get("/api/events?source=other").get_json()["events"] == []
+
+
+def test_index_shows_circuit_state(monkeypatch):
+    async def fake_fetch_iter(sources, source_status, **kwargs):
+        source_status.update({s.id: "ok" for s in sources})
+        source_status[sources[0].id] = "open"
+        source_status[sources[1].id] = "half_open"
+        yield SourceBatch(sources[0], [])
+
+    monkeypatch.setattr(api, "fetch_iter", fake_fetch_iter)
+    monkeypatch.setattr(api, "_feed_cache", api._FeedCache(ttl=60, stale_ttl=300))
+    html = api.app.test_client().get("/").get_data(as_text=True)
+    assert '<span class="source-status-open"' in html
+    assert '<span class="source-status-half_open"' in html
+
+
+def test_api_events_search_and_facets(loaded_cache):
+    client = api.app.test_client()
+    data = client.get("/api/events?q=event severity:5").get_json()
+    assert [e["id"] for e in data["events"]] == ["ev-4"]
+    assert client.get("/api/events?q=absent").get_json()["events"] == []
+    data = client.get("/api/events?q=summary severity:4&limit=1").get_json()
+    assert [e["id"] for e in data["events"]] == ["ev-4"]
+    assert data["total"] == 2
+    assert data["facets"] == {
+        "source": {"test": 2},
+        "severity": {"5": 1, "4": 1},
+        "keyword": {"Iran": 2},
+    }
+    assert client.get("/api/events?q=severity:high").status_code == 400
+
+
+def test_index_search(loaded_cache):
+    client = api.app.test_client()
+    html = client.get("/?q=event+severity:5").get_data(as_text=True)
+    assert "Event 4" in html and "Event 3" not in html
+    assert "1 matches" in html
+    assert "invalid severity" in client.get("/?q=severity:x").get_data(as_text=True)
+
+
+def test_api_events_rejects_bad_params(loaded_cache):
+    client = api.app.test_client()
+    assert client.get("/api/events?since=yesterday").status_code == 400
+    assert client.get("/api/events?since=1e20").status_code == 400
+    assert client.get("/api/events?since=inf").status_code == 400
+    assert client.get("/api/events?cursor=!!").status_code == 400
+
+
+def test_api_archive_events_and_trend(tmp_path, monkeypatch):
+    archive = Archive(tmp_path)
+    base = 1_750_032_000  # 2025-06-16 00:00 UTC
+    events = [make_record(n, severity=5 if n == 3 else 3) for n in range(4)]
+    archive.append([e._replace(ts=base + n * 3600) for n, e in enumerate(events)])
+    monkeypatch.setattr(api, "_archive", archive)
+    client = api.app.test_client()
+
+    query = f"start={base}&end={base + 86400}"
+    page = client.get(f"/api/archive/events?{query}&limit=3").get_json()
+    assert [e["id"] for e in page["events"]] == ["ev-3", "ev-2", "ev-1"]
+    rest = client.get(f"/api/archive/events?{query}&cursor={page['next_cursor']}").get_json()
+    assert [e["id"] for e in rest["events"]] == ["ev-0"]
+    assert rest["next_cursor"] is None
+    severe = client.get(f"/api/archive/events?{query}&min_severity=5").get_json()
+    assert [e["id"] for e in severe["events"]] == ["ev-3"]
+
+    trend = client.get(f"/api/archive/trend?{query}&step=day").get_json()
+    assert trend["buckets"] == [
+        {
+            "start": "2025-06-16T00:00:00+00:00",
+            "total": 4,
+            "by_severity": {"3": 3, "5": 1},
+            "by_source": {"test": 4},
+        }
+    ]
+    assert len(client.get(f"/api/archive/trend?{query}").get_json()["buckets"]) == 4
+    assert client.get(f"/api/archive/trend?{query}&step=week").status_code == 400
+    assert client.get(f"/api/archive/events?start={base}&end={base}").status_code == 400
+    assert client.get("/api/archive/events?start=1e20").status_code == 400
+    monkeypatch.setattr(api, "_archive", None)
+    assert client.get("/api/archive/trend").status_code == 404
+
+
+def test_api_status(loaded_cache):
+    data = api.app.test_client().get("/api/status").get_json()
+    assert data["counts"]["total"] == 7
+    assert data["counts"]["by_severity"]["5"] == 1
+    assert [s["id"] for s in data["sources"]] == [s.id for s in api.SOURCES]
+    assert data["defcon"] == 3  # old events only; one severity 4 retained
+
+
+def test_api_stream_pushes_new_events(loaded_cache):
+    with api.app.test_request_context("/api/stream?min_severity=2"):
+        stream = api._event_stream(loaded_cache.events, loaded_cache.etag)
+        with loaded_cache._lock:
+            loaded_cache.events = [make_record(10, severity=4), make_record(11, severity=1)]
+            loaded_cache.etag = "changed"
+        message = next(stream)
+        assert message.startswith("id: ev-10\nevent: event\ndata: ")
+        with loaded_cache._lock:
+            loaded_cache.events = [make_record(12, severity=4), make_record(10, severity=4)]
+            loaded_cache.etag = "changed again"
+        message = next(stream)
+    assert message.startswith("id: ev-12\n")  # ev-10 is not sent twice
+
+
+def test_index_collapses_near_duplicate_stories_on_request(monkeypatch):
+    wire = "Explosions were reported near the Natanz enrichment facility in central Iran."
+    events = [
+        make_record(n)._replace(title="Explosions at Natanz site", summary=wire)
+        for n in range(3)
+    ]
+
+    async def fake_fetch_iter(sources, source_status, **kwargs):
+        yield SourceBatch(sources[0], events)
+
+    monkeypatch.setattr(api, "fetch_iter", fake_fetch_iter)
+    monkeypatch.setattr(api, "_feed_cache", api._FeedCache(ttl=60, stale_ttl=300))
+    client = api.app.test_client()
+    assert client.get("/").get_data(as_text=True).count("Explosions at Natanz site") == 3
+    html = client.get("/?cluster=1").get_data(as_text=True)
+    assert html.count("Explosions at Natanz site") == 1
@@ -0,0 +1,113 @@
+"""Tests for warmonitor.archive module."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from tests.conftest import make_record
+from warmonitor.archive import Archive, TrendBucket, open_archive
+from warmonitor.models import Settings
+
+_DAY0 = 1_750_032_000  # 2025-06-16 00:00 UTC
+
+
+@pytest.fixture
+def archive(tmp_path) -> Archive:
+    archive = Archive(tmp_path / "archive")
+    archive.append(
+        [
+            make_record(1, ts=_DAY0 + 600, severity=5),
+            make_record(2, ts=_DAY0 + 1200, source_id="ap"),
+            make_record(3, ts=_DAY0 + 7200),
+            make_record(4, ts=_DAY0 + 86400 + 60, severity=4),
+        ]
+    )
+    return archive
+
+
+def _lines(path) -> int:
+    return len(path.read_bytes().splitlines())
+
+
+def test_append_partitions_by_day_and_skips_unchanged(archive):
+    assert archive.days() == ["2025-06-16", "2025-06-17"]
+    assert _lines(archive.path / "2025-06-16.jsonl") == 3
+    archive.append([make_record(1, ts=_DAY0 + 600, severity=5)])  # refetched, unchanged
+    assert _lines(archive.path / "2025-06-16.jsonl") == 3
+
+    archive.append([make_record(1, ts=_DAY0 + 600, severity=2, title="Downgraded")])
+    assert _lines(archive.path / "2025-06-16.jsonl") == 4
+    events = archive.events(_DAY0, _DAY0 + 86400)
+    assert [(e.id, e.severity) for e in events] == [("ev-3", 3), ("ev-2", 3), ("ev-1", 2)]
+    assert archive.trend(_DAY0, _DAY0 + 3600)[0].severity == {2: 1, 3: 1}
+
+
+def test_events_filters_and_pages(archive):
+    everything = archive.events(0, _DAY0 + 2 * 86400)
+    assert [e.id for e in everything] == ["ev-4", "ev-3", "ev-2", "ev-1"]
+    assert [e.id for e in archive.events(0, 2**40, sources={"ap"})] == ["ev-2"]
+    assert [e.id for e in archive.events(0, 2**40, min_severity=4)] == ["ev-4", "ev-1"]
+    page = archive.events(0, 2**40, limit=2)
+    assert [e.id for e in page] == ["ev-4", "ev-3"]
+    rest = archive.events(0, 2**40, before=(page[-1].ts, page[-1].id))
+    assert [e.id for e in rest] == ["ev-2", "ev-1"]
+
+
+def test_queries_read_only_days_in_range(archive, monkeypatch):
+    read = []
+    read_day = archive._read_day
+    monkeypatch.setattr(archive, "_read_day", lambda day: read.append(day) or read_day(day))
+    assert [e.id for e in archive.events(_DAY0 + 86400, _DAY0 + 2 * 86400)] == ["ev-4"]
+    assert read == ["2025-06-17"]
+    read.clear()
+    assert [e.id for e in archive.events(0, 2**40, limit=1)] == ["ev-4"]
+    assert read == ["2025-06-17"]  # the newest day already filled the page
+
+
+def test_trend_from_rollups(archive):
+    hourly = archive.trend(_DAY0, _DAY0 + 2 * 86400)
+    assert hourly == [
+        TrendBucket(_DAY0, 2, {3: 1, 5: 1}, {"ap": 1, "test": 1}),
+        TrendBucket(_DAY0 + 7200, 1, {3: 1}, {"test": 1}),
+        TrendBucket(_DAY0 + 86400, 1, {4: 1}, {"test": 1}),
+    ]
+    daily = archive.trend(_DAY0, _DAY0 + 2 * 86400, step=86400)
+    assert [(b.start, b.total) for b in daily] == [(_DAY0, 3), (_DAY0 + 86400, 1)]
+    with pytest.raises(ValueError):
+        archive.trend(_DAY0, _DAY0 + 86400, step=60)
+
+
+def test_compact_dedupes_gzips_and_keeps_rollups(archive):
+    archive.append([make_record(2, ts=_DAY0 + 1200, source_id="ap", title="Updated")])
+    assert archive.compact(_DAY0 + 86400) == ["2025-06-16"]
+    assert not (archive.path / "2025-06-16.jsonl").exists()
+    assert (archive.path / "2025-06-16.jsonl.gz").exists()
+    assert (archive.path / "2025-06-17.jsonl").exists()  # not old enough
+    titles = {e.id: e.title for e in archive.events(_DAY0, _DAY0 + 86400)}
+    assert titles == {"ev-1": "Test event", "ev-2": "Updated", "ev-3": "Test event"}
+
+    # Late arrivals for a compacted day are appended next to it.
+    archive.append([make_record(5, ts=_DAY0 + 300), make_record(1, ts=_DAY0 + 600, severity=5)])
+    assert _lines(archive.path / "2025-06-16.jsonl") == 1
+    assert archive.trend(_DAY0, _DAY0 + 86400, step=86400)[0].total == 4
+
+    assert archive.compact(_DAY0 + 86400, drop_events=True) == ["2025-06-16"]
+    assert archive.events(_DAY0, _DAY0 + 86400) == []
+    assert archive.trend(_DAY0, _DAY0 + 86400, step=86400)[0].total == 4
+
+
+def test_independent_writers_keep_rollups_consistent(tmp_path):
+    first, second = Archive(tmp_path), Archive(tmp_path)
+    first.append([make_record(1, ts=_DAY0)])
+    second.append([make_record(2, ts=_DAY0), make_record(1, ts=_DAY0)])
+    first.append([make_record(3, ts=_DAY0)])
+    rollup = json.loads((tmp_path / "2025-06-16.rollup.json").read_text())
+    assert rollup["hours"][str(_DAY0)]["severity"] == {"3": 3}
+    assert _lines(tmp_path / "2025-06-16.jsonl") == 3
+
+
+def test_archive_is_off_unless_configured(tmp_path):
+    assert open_archive(Settings().archive_dir) is None
+    assert open_archive(str(tmp_path)).path == tmp_path
@@ -0,0 +1,112 @@
+"""Tests for warmonitor.breaker module."""
+
+from __future__ import annotations
+
+import pytest
+
+from warmonitor.breaker import CLOSED, HALF_OPEN, OPEN, SourceBreakers
+from warmonitor.models import Settings
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+def test_circuit_opens_after_threshold_and_trials_after_cooldown(clock):
+    breakers = SourceBreakers(threshold=3, cooldown=60, max_cooldown=200, clock=clock)
+    for _ in range(2):
+        breakers.record_failure("s")
+    assert breakers.state("s") == CLOSED and breakers.allow("s")
+    breakers.record_failure("s")
+    assert breakers.state("s") == OPEN
+    assert not breakers.allow("s")
+    assert breakers.retry_in("s") == 60
+
+    clock.now += 60
+    assert breakers.allow("s")  # the one trial poll
+    assert breakers.state("s") == HALF_OPEN
+    assert not breakers.allow("s")
+    breakers.record_failure("s")  # trial failed: reopen for twice as long
+    assert breakers.state("s") == OPEN
+    assert breakers.retry_in("s") == 120
+    clock.now += 120
+    assert breakers.allow("s")
+    breakers.record_failure("s")
+    assert breakers.retry_in("s") == 200  # capped
+
+    clock.now += 200
+    assert breakers.allow("s")
+    breakers.record_success("s", 0.5)
+    assert breakers.state("s") == CLOSED
+    breakers.record_failure("s")
+    assert breakers.state("s") == CLOSED  # failures counted afresh
+
+
+def test_cancelled_trial_is_replaced_after_another_cooldown(clock):
+    breakers = SourceBreakers(threshold=1, cooldown=60, clock=clock)
+    breakers.record_failure("s")
+    clock.now += 60
+    assert breakers.allow("s")  # trial that never reports back
+    clock.now += 59
+    assert not breakers.allow("s")
+    clock.now += 1
+    assert breakers.allow("s")
+
+
+def test_threshold_zero_never_opens(clock):
+    breakers = SourceBreakers(threshold=0, clock=clock)
+    for _ in range(10):
+        breakers.record_failure("s")
+    assert breakers.allow("s")
+
+
+def test_timeout_follows_recent_fetch_times(clock):
+    breakers = SourceBreakers(timeout_factor=4, min_timeout=2, clock=clock)
+    assert breakers.timeout("s", 30) == 30  # no history yet
+    for elapsed in (0.2, 0.3, 0.4, 0.5, 1.0):
+        breakers.record_success("s", elapsed)
+    assert breakers.timeout("s", 30) == 4.0  # 4 × p95
+    assert breakers.timeout("s", 3) == 3  # never above the default
+    assert SourceBreakers(timeout_factor=0).timeout("s", 30) == 30
+
+    for _ in range(5):
+        breakers.record_success("fast", 0.1)
+    assert breakers.timeout("fast", 30) == 2  # min_timeout floor
+    breakers.forget("fast")
+    assert breakers.timeout("fast", 30) == 30
+
+
+def test_half_open_trial_gets_the_full_timeout(clock):
+    breakers = SourceBreakers(threshold=1, cooldown=10, clock=clock)
+    for _ in range(5):
+        breakers.record_success("s", 0.1)
+    breakers.record_failure("s")
+    clock.now += 10
+    assert breakers.allow("s")
+    assert breakers.timeout("s", 30) == 30
+
+
+def test_hedge_delay_only_for_usually_fast_sources(clock):
+    breakers = SourceBreakers(hedge_threshold=1.0, clock=clock)
+    for elapsed in (0.1, 0.2, 0.2, 0.3, 0.4):
+        breakers.record_success("fast", elapsed)
+        breakers.record_success("slow", elapsed * 10)
+    assert breakers.hedge_delay("fast") == 0.4
+    assert breakers.hedge_delay("slow") is None
+    assert SourceBreakers().hedge_delay("fast") is None
+
+
+def test_from_settings():
+    settings = Settings(breaker_threshold=5, breaker_cooldown=30, hedge_threshold=0.5)
+    breakers = SourceBreakers.from_settings(settings)
+    assert (breakers.threshold, breakers.cooldown, breakers.hedge_threshold) == (5, 30, 0.5)
+    assert breakers.max_cooldown == settings.max_interval
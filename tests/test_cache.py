@@ -0,0 +1,100 @@
+"""Tests for warmonitor.cache module."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import pytest
+
+from tests.conftest import make_record
+from warmonitor import cache
+from warmonitor.records import EventRecord
+
+
+@pytest.fixture(autouse=True)
+def cache_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_CACHE_PATH", tmp_path / "cache.db")
+    monkeypatch.setattr(cache, "_LEGACY_CACHE_PATH", tmp_path / "cache.json")
+    monkeypatch.setattr(cache, "_written_path", None)
+    return tmp_path
+
+
+def _row_count() -> int:
+    with sqlite3.connect(cache._CACHE_PATH) as conn:
+        return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def test_load_cache_missing_file():
+    assert cache.load_cache() == []
+
+
+def test_save_and_load_round_trip_newest_first():
+    events = [make_record(1), make_record(3), make_record(2)]
+    cache.save_cache(events)
+    loaded = cache.load_cache()
+    assert [e.id for e in loaded] == ["ev-3", "ev-2", "ev-1"]
+    assert loaded[0] == events[1]
+
+
+def test_save_cache_writes_only_changed_events(monkeypatch):
+    events = [make_record(1), make_record(2)]
+    cache.save_cache(events)
+
+    written: list[list[EventRecord]] = []
+    upsert = cache._upsert
+    monkeypatch.setattr(cache, "_upsert", lambda conn, evs: (written.append(evs), upsert(conn, evs)))
+    updated = make_record(2, title="Updated")
+    cache.save_cache([make_record(3), updated, events[0]])
+
+    assert [e.id for e in written[0]] == ["ev-3", "ev-2"]
+    assert cache.load_cache()[1].title == "Updated"
+
+
+def test_save_cache_trims_to_limit():
+    cache.save_cache([make_record(n) for n in range(3)], limit=3)
+    cache.save_cache([make_record(n) for n in range(3, 5)], limit=3)
+    assert _row_count() == 3
+    assert [e.id for e in cache.load_cache(limit=3)] == ["ev-4", "ev-3", "ev-2"]
+    assert [e.id for e in cache.load_cache(limit=2)] == ["ev-4", "ev-3"]
+
+
+def test_load_cache_imports_legacy_json(cache_paths):
+    legacy = [make_record(1).to_event().model_dump(mode="json")]
+    (cache_paths / "cache.json").write_text(json.dumps(legacy), encoding="utf-8")
+    assert [e.id for e in cache.load_cache()] == ["ev-1"]
+    assert _row_count() == 1
+
+
+def test_load_cache_corrupt_file(cache_paths):
+    (cache_paths / "cache.db").write_bytes(b"not a database")
+    assert cache.load_cache() == []
+
+
+def test_validators_round_trip():
+    validators = {
+        "https://a.example/rss": {"etag": '"v1"'},
+        "https://b.example/rss": {"etag": '"v2"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    }
+    cache.save_validators(validators)
+    assert cache.load_validators() == validators
+    cache.save_validators({})
+    assert cache.load_validators() == {}
+
+
+def test_seen_index_round_trip():
+    index = cache.SeenIndex()
+    index.add("src_a", ["https://example.com/1", "https://example.com/2"])
+    index.add("src_b", ["https://example.com/3"], digest="abc", ttl=30)
+    cache.save_seen(index)
+    assert not index.dirty
+
+    loaded = cache.load_seen()
+    assert "https://example.com/1" in loaded.view("src_a")
+    assert "https://example.com/3" in loaded.view("src_b")
+    assert loaded.view("src_a").bloom.count == 2
+    assert (loaded.view("src_b").digest, loaded.view("src_b").ttl) == ("abc", 30)
+
+    index.forget("src_b")
+    cache.save_seen(index)
+    assert len(cache.load_seen()) == 1
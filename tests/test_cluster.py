@@ -0,0 +1,140 @@
+"""Tests for warmonitor.cluster module."""
+
+from __future__ import annotations
+
+from tests.conftest import T0, make_record
+from warmonitor.cluster import StoryClusters, signature, similarity
+
+
+_WIRE = (
+    "Explosions were reported near the Natanz enrichment facility in central Iran "
+    "early on Tuesday, state media said, citing local officials."
+)
+
+
+def test_signature_similarity_tracks_word_overlap():
+    a = signature("Iran reports explosions near Natanz enrichment facility")
+    b = signature("Explosions reported near Iran's Natanz enrichment facility")
+    c = signature("Oil prices fall as OPEC meeting is postponed")
+    assert similarity(a, a) == 1.0
+    assert similarity(a, b) > 0.5
+    assert similarity(a, c) < 0.2
+    assert signature("the of and") == ()
+
+
+def test_near_duplicates_from_different_sources_cluster():
+    clusters = StoryClusters(
+        [
+            make_record(
+                event_id="a",
+                title="Explosions reported at Iran's Natanz site",
+                summary=_WIRE,
+                source_id="reuters",
+            ),
+            make_record(
+                event_id="b",
+                title="Explosions near Natanz facility in Iran",
+                summary=_WIRE,
+                source_id="bbc",
+                ts=T0 + 600,
+            ),
+            make_record(
+                event_id="c", title="Oil prices fall as OPEC meeting is postponed", source_id="ap"
+            ),
+        ]
+    )
+    assert clusters.cluster_of("a") == clusters.cluster_of("b")
+    assert clusters.cluster_of("c") != clusters.cluster_of("a")
+    assert len(clusters) == 2
+
+
+def test_distinct_short_headlines_stay_separate():
+    clusters = StoryClusters(
+        make_record(
+            event_id=f"e{n}", title=f"Iran strike number {n} unique{n}", source_id=f"s{n % 3}"
+        )
+        for n in range(20)
+    )
+    assert len(clusters) == 20
+
+
+def test_time_window_separates_repeat_stories():
+    clusters = StoryClusters(window=3600)
+    clusters.add(make_record(event_id="a", title="Explosions at Natanz", summary=_WIRE))
+    clusters.add(
+        make_record(
+            event_id="b",
+            title="Explosions at Natanz",
+            summary=_WIRE,
+            source_id="bbc",
+            ts=T0 + 2 * 86400,
+        )
+    )
+    assert clusters.cluster_of("a") != clusters.cluster_of("b")
+
+
+def test_collapse_keeps_max_severity_earliest_time_and_source_count():
+    events = [
+        make_record(
+            event_id="late",
+            title="Explosions at Natanz site",
+            summary=_WIRE,
+            source_id="bbc",
+            severity=5,
+            ts=T0 + 900,
+        ),
+        make_record(
+            event_id="early",
+            title="Explosions at Natanz site",
+            summary=_WIRE,
+            source_id="reuters",
+            severity=3,
+        ),
+        make_record(
+            event_id="dup",
+            title="Explosions at Natanz site",
+            summary=_WIRE,
+            source_id="reuters",
+            ts=T0 + 60,
+        ),
+        make_record(
+            event_id="other", title="Oil prices fall as OPEC meeting is postponed", source_id="ap"
+        ),
+    ]
+    stories = StoryClusters(events).collapse(events)
+    assert len(stories) == 2
+    lead, sources, size = stories[0]
+    assert lead.id == "late"
+    assert (lead.severity, lead.ts) == (5, T0)
+    assert (sources, size) == (2, 3)
+    assert stories[1].record.id == "other"
+    assert stories[1].sources == 1
+
+
+def test_discard_and_apply_update_clusters():
+    a = make_record(event_id="a", title="Explosions at Natanz site", summary=_WIRE)
+    b = make_record(event_id="b", title="Explosions at Natanz site", summary=_WIRE, source_id="bbc")
+    clusters = StoryClusters([a, b])
+    clusters.apply(added=[], removed=["a"])
+    assert [s.size for s in clusters.collapse([b])] == [1]
+    clusters.apply(added=[a], removed=["b"])
+    assert len(clusters) == 1
+    assert clusters._buckets and all(bucket == {"a"} for bucket in clusters._buckets.values())
+
+
+def test_cluster_stays_findable_after_indexed_member_leaves():
+    copies = [
+        make_record(
+            event_id=f"e{n}", title="Explosions at Natanz site", summary=_WIRE, source_id=f"s{n}"
+        )
+        for n in range(3)
+    ]
+    clusters = StoryClusters(copies)
+    assert len(clusters._indexed) == 1  # exact copies are not indexed
+    clusters.discard(next(iter(clusters._indexed)))
+    clusters.add(
+        make_record(
+            event_id="late", title="Explosions at Natanz site", summary=_WIRE, source_id="ap"
+        )
+    )
+    assert len(clusters) == 1
@@ -0,0 +1,209 @@
+"""Tests for warmonitor.collector module."""
+
+from __future__ import annotations
+
+import asyncio
+import grp
+import os
+import stat
+
+import pytest
+
+from tests.conftest import make_record
+from warmonitor import cache, config, fetcher
+from warmonitor.collector import Collector, attach
+from warmonitor.models import Settings, Source
+
+
+def _make_source() -> Source:
+    return Source(
+        id="test",
+        name="Test Source",
+        url="https://example.com/rss",
+        type="rss",
+        keywords=["Iran"],
+        credibility="HIGH",
+        color="green",
+    )
+
+
+@pytest.fixture
+def collector_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_CACHE_PATH", tmp_path / "cache.db")
+    monkeypatch.setattr(cache, "_LEGACY_CACHE_PATH", tmp_path / "cache.json")
+    monkeypatch.setattr(cache, "_written_path", None)
+    calls: list[int] = []
+
+    async def fake_fetch_iter(sources, source_status, *args, **kwargs):
+        calls.append(1)
+        for source in sources:
+            source_status[source.id] = "ok"
+            kwargs["metrics"].record(source.id, "ok", {"ttfb": 0.02})
+            yield fetcher.SourceBatch(source, [make_record(len(calls))])
+
+    monkeypatch.setattr(fetcher, "fetch_iter", fake_fetch_iter)
+    return tmp_path / "c.sock", calls
+
+
+async def _next(messages, kind: str) -> dict:
+    async def find() -> dict:
+        async for message in messages:
+            if message["type"] == kind:
+                return message
+        raise AssertionError("collector closed the connection")
+
+    return await asyncio.wait_for(find(), 5)
+
+
+@pytest.mark.asyncio
+async def test_collector_pushes_snapshot_and_deltas(collector_env):
+    path, calls = collector_env
+    daemon = asyncio.create_task(Collector([_make_source()], Settings(), path).run())
+    try:
+        while not path.is_socket():
+            await asyncio.sleep(0.01)
+        connection = await attach(path)
+        assert connection is not None
+        messages = connection.messages()
+        snapshot = await _next(messages, "snapshot")
+        assert [e.id for e in snapshot["events"]] == [f"ev-{n}" for n in range(len(calls), 0, -1)]
+
+        for _ in range(2):
+            await connection.request_refresh()
+            delta = await _next(messages, "delta")
+            assert [e.id for e in delta["added"]] == [f"ev-{len(calls)}"]
+            assert delta["status"] == {"test": "ok"}
+            assert delta["metrics"]["test"]["outcomes"] == {"ok": len(calls)}
+        assert len(calls) >= 2
+        await connection.close()
+    finally:
+        daemon.cancel()
+        await asyncio.gather(daemon, return_exceptions=True)
+    assert not path.exists()
+    assert [e.id for e in cache.load_cache()][0] == f"ev-{len(calls)}"
+
+
+@pytest.mark.asyncio
+async def test_collector_reloads_sources_from_config(collector_env, tmp_path, monkeypatch):
+    path, calls = collector_env
+    config_path = tmp_path / "warmonitor.toml"
+    monkeypatch.setattr(config, "_CONFIG_PATH", config_path)
+    collector = Collector([_make_source()], Settings(), path)
+    daemon = asyncio.create_task(collector.run())
+    try:
+        while not path.is_socket():
+            await asyncio.sleep(0.01)
+        connection = await attach(path)
+        messages = connection.messages()
+        snapshot = await _next(messages, "snapshot")
+        assert snapshot["events"]
+
+        config_path.write_text(
+            'replace_defaults = true\n[[sources]]\nid = "other"\nname = "Other"\n'
+            'url = "https://other.example/rss"\ntype = "rss"\nkeywords = ["Iran"]\n'
+            'credibility = "HIGH"\ncolor = "green"\n',
+            encoding="utf-8",
+        )
+        delta = await _next(messages, "delta")
+        # The removed source's events go; the new source is polled right away.
+        assert delta["removed"] == [e.id for e in snapshot["events"]]
+        assert delta["added"] == []
+        assert "test" not in delta["status"]
+        delta = await _next(messages, "delta")
+        assert delta["status"] == {"other": "ok"}
+        assert [s.id for s in collector.sources] == ["other"]
+        await connection.close()
+    finally:
+        daemon.cancel()
+        await asyncio.gather(daemon, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_collector_replaces_stale_socket_but_not_live_one(collector_env):
+    path, _ = collector_env
+    path.write_text("")  # left behind by a crashed collector
+    daemon = asyncio.create_task(Collector([_make_source()], Settings(), path).run())
+    try:
+        while not path.is_socket():
+            await asyncio.sleep(0.01)
+        with pytest.raises(RuntimeError, match="already serving"):
+            await Collector([_make_source()], Settings(), path).run()
+    finally:
+        daemon.cancel()
+        await asyncio.gather(daemon, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_attach_without_collector(tmp_path):
+    assert await attach(tmp_path / "missing.sock") is None
+
+
+@pytest.mark.asyncio
+async def test_collector_socket_is_private_unless_shared(collector_env):
+    path, _ = collector_env
+    group = grp.getgrgid(os.getgid()).gr_name
+    for settings, mode in ((Settings(), 0o600), (Settings(collector_group=group), 0o660)):
+        daemon = asyncio.create_task(Collector([_make_source()], settings, path).run())
+        try:
+            while not path.is_socket():
+                await asyncio.sleep(0.01)
+            assert stat.S_IMODE(path.stat().st_mode) == mode
+        finally:
+            daemon.cancel()
+            await asyncio.gather(daemon, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("line", [b"not json\n", b"x" * 100 + b"\n"])
+async def test_unreadable_message_ends_the_stream(tmp_path, monkeypatch, line):
+    monkeypatch.setattr("warmonitor.collector._LINE_LIMIT", 64)
+    path = tmp_path / "c.sock"
+
+    async def serve(stream, writer):
+        writer.write(b'{"type": "status", "status": {}}\n' + line)
+        await writer.drain()
+        await stream.read()  # until the reader hangs up
+
+    server = await asyncio.start_unix_server(serve, path)
+    async with server:
+        connection = await attach(path)
+        messages = [m async for m in connection.messages()]
+        await connection.close()
+    assert [m["type"] for m in messages] == ["status"]
+
+
+@pytest.mark.asyncio
+async def test_collector_polls_others_while_a_source_is_slow(collector_env, monkeypatch):
+    path, _ = collector_env
+    release = asyncio.Event()
+    polled: list[str] = []
+
+    async def fake_fetch_iter(sources, source_status, *args, **kwargs):
+        for source in sources:
+            polled.append(source.id)
+            if source.id == "slow":
+                await release.wait()
+            source_status[source.id] = "ok"
+            yield fetcher.SourceBatch(source, [])
+
+    monkeypatch.setattr(fetcher, "fetch_iter", fake_fetch_iter)
+    slow = _make_source().model_copy(update={"id": "slow"})
+    daemon = asyncio.create_task(Collector([_make_source(), slow], Settings(), path).run())
+    try:
+        while not path.is_socket():
+            await asyncio.sleep(0.01)
+        connection = await attach(path)
+        messages = connection.messages()
+        await _next(messages, "snapshot")
+        while "slow" not in polled:
+            await asyncio.sleep(0.01)
+        await connection.request_refresh()
+        # "test" answered in the first round; a new round polls it past "slow".
+        while polled.count("test") < 2:
+            await _next(messages, "delta")
+        assert polled == ["test", "slow", "test"]
+        release.set()
+        await connection.close()
+    finally:
+        daemon.cancel()
+        await asyncio.gather(daemon, return_exceptions=True)
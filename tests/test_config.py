@@ -0,0 +1,153 @@
+"""Tests for warmonitor.config module."""
+
+from __future__ import annotations
+
+import pytest
+
+from warmonitor import config
+from warmonitor.models import Settings
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "warmonitor.toml"
+    monkeypatch.setattr(config, "_CONFIG_PATH", path)
+    return path
+
+
+def test_load_settings_defaults_without_file(config_file):
+    assert config.load_settings() == Settings()
+
+
+def test_load_settings_reads_top_level_keys(config_file):
+    config_file.write_text(
+        'http2 = true\nper_host_limit = 2\n\n[[sources]]\nid = "x"\n', encoding="utf-8"
+    )
+    settings = config.load_settings()
+    assert settings.http2 is True
+    assert settings.per_host_limit == 2
+    assert settings.max_connections == Settings().max_connections
+
+
+def test_load_settings_invalid_value_falls_back(config_file):
+    config_file.write_text('max_connections = "lots"\n', encoding="utf-8")
+    assert config.load_settings() == Settings()
+
+
+def test_load_config_reuses_cache_until_config_changes(config_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", tmp_path / "config.cache")
+    calls = []
+    load_sources = config.load_sources
+    monkeypatch.setattr(config, "load_sources", lambda: calls.append(1) or load_sources())
+    config_file.write_text(
+        'replace_defaults = true\nper_host_limit = 2\n\n[[sources]]\nid = "x"\nname = "X"\n'
+        'url = "https://x.example/rss"\ntype = "rss"\nkeywords = ["Iran"]\n'
+        'credibility = "HIGH"\ncolor = "green"\n',
+        encoding="utf-8",
+    )
+    sources, settings = config.load_config()
+    assert [s.id for s in sources] == ["x"]
+    assert settings.per_host_limit == 2
+    config.save_config_cache()
+    assert config.load_config() == (sources, settings)
+    assert len(calls) == 1  # second call was served from the cache
+
+    config_file.write_text("per_host_limit = 3\n", encoding="utf-8")
+    sources, settings = config.load_config()
+    assert len(calls) == 2
+    assert settings.per_host_limit == 3
+    assert len(sources) > 1  # defaults again
+
+
+def test_load_config_does_not_cache_a_config_with_warnings(config_file, tmp_path, monkeypatch):
+    cache_path = tmp_path / "config.cache"
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", cache_path)
+    config_file.write_text('max_connections = "lots"\n', encoding="utf-8")
+    assert config.load_config()[1] == Settings()
+    config.save_config_cache()
+    assert not cache_path.exists()
+
+
+def test_load_config_writes_nothing_until_saved(config_file, tmp_path, monkeypatch):
+    cache_path = tmp_path / "config.cache"
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", cache_path)
+    config.load_config()
+    assert not cache_path.exists()
+    config.save_config_cache()
+    assert cache_path.exists()
+
+
+def _source_toml(source_id: str, keywords: str = '"Iran"') -> str:
+    return (
+        f'[[sources]]\nid = "{source_id}"\nname = "{source_id.upper()}"\n'
+        f'url = "https://{source_id}.example/rss"\ntype = "rss"\nkeywords = [{keywords}]\n'
+        'credibility = "HIGH"\ncolor = "green"\n'
+    )
+
+
+def test_diff_sources_by_id(config_file):
+    config_file.write_text(
+        "replace_defaults = true\n" + _source_toml("a") + _source_toml("b"), encoding="utf-8"
+    )
+    old = config.load_sources()
+    config_file.write_text(
+        "replace_defaults = true\n" + _source_toml("c") + _source_toml("b", '"Israel"')
+        + _source_toml("a"),
+        encoding="utf-8",
+    )
+    new = config.load_sources()
+    diff = config.diff_sources(old, new)
+    assert [s.id for s in diff.added] == ["c"]
+    assert diff.removed == []
+    assert [(s.id, s.keywords) for s in diff.changed] == [("b", ["Israel"])]
+    assert not any(config.diff_sources(new, list(reversed(new))))
+
+
+def test_config_watcher_reloads_on_change(config_file):
+    config_file.write_text("replace_defaults = true\n" + _source_toml("a"), encoding="utf-8")
+    watcher = config.ConfigWatcher(config.load_sources())
+    assert watcher.poll() is None
+
+    config_file.write_text(
+        "replace_defaults = true\n" + _source_toml("b") + "\n# edited\n", encoding="utf-8"
+    )
+    diff = watcher.poll()
+    assert [s.id for s in diff.added] == ["b"]
+    assert [s.id for s in diff.removed] == ["a"]
+    assert [s.id for s in watcher.sources] == ["b"]
+    assert watcher.poll() is None
+
+
+def test_config_watcher_keeps_sources_while_file_is_broken(config_file):
+    config_file.write_text("replace_defaults = true\n" + _source_toml("a"), encoding="utf-8")
+    watcher = config.ConfigWatcher(config.load_sources())
+    config_file.write_text("replace_defaults = true\n[[sources]\n", encoding="utf-8")
+    assert watcher.poll() is None
+    assert [s.id for s in watcher.sources] == ["a"]
+
+    config_file.unlink()  # no file: back to the defaults
+    diff = watcher.poll()
+    assert [s.id for s in diff.removed] == ["a"]
+    assert len(watcher.sources) > 1
+
+
+def test_config_watcher_holds_back_busy_sources(config_file):
+    config_file.write_text(
+        "replace_defaults = true\n" + _source_toml("a") + _source_toml("b"), encoding="utf-8"
+    )
+    watcher = config.ConfigWatcher(config.load_sources())
+    config_file.write_text(
+        "replace_defaults = true\n" + _source_toml("b", '"Israel"') + _source_toml("c"),
+        encoding="utf-8",
+    )
+    diff = watcher.poll(busy={"a", "b"})
+    assert [s.id for s in diff.added] == ["c"]
+    assert diff.removed == diff.changed == []
+    assert watcher.poll(busy={"a", "b"}) is None
+
+    diff = watcher.poll(busy={"a"})
+    assert [(s.id, s.keywords) for s in diff.changed] == [("b", ["Israel"])]
+    diff = watcher.poll()
+    assert [s.id for s in diff.removed] == ["a"]
+    assert [s.id for s in watcher.sources] == ["b", "c"]
+    assert watcher.poll() is None
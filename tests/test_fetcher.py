@@ -2,19 +2,37 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import threading
+import time
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from tests.conftest import make_record
 from warmonitor.fetcher import (
+    ACCEPT_ENCODING,
+    HostLimiter,
     _calculate_severity,
     _make_event_id,
     _match_keywords,
     _parse_published,
+    create_client,
+    create_executor,
     fetch_all,
+    fetch_iter,
+    fetch_source,
 )
-from warmonitor.models import Event, Source
+from warmonitor.archive import Archive
+from warmonitor.breaker import SourceBreakers
+from warmonitor.metrics import FetchMetrics
+from warmonitor.models import Settings, Source
+from warmonitor.records import intern_keywords, source_ref
+from warmonitor.scheduler import PollScheduler
+from warmonitor.seen import SeenIndex
 
 
 def test_calculate_severity_level5():
@@ -109,38 +127,18 @@ def _make_source(source_id: str = "test") -> Source:
     )
 
 
-def _make_event(url: str, source_id: str = "test") -> Event:
-    source = _make_source(source_id)
-    return Event(
-        id=_make_event_id(url),
-        title="Test event",
-        summary="Test summary",
-        url=url,
-        published=datetime(2025, 1, 1, tzinfo=timezone.utc),
-        source_id=source.id,
-        source_name=source.name,
-        credibility=source.credibility,
-        keywords_matched=["Iran"],
-        severity=3,
-    )
-
-
 @pytest.mark.asyncio
 async def test_fetch_all_deduplication():
     """fetch_all should deduplicate events with the same ID across sources."""
-    url_shared = "https://example.com/shared"
-    url_unique_a = "https://example.com/unique-a"
-    url_unique_b = "https://example.com/unique-b"
-
-    event_shared = _make_event(url_shared, "src_a")
-    event_a = _make_event(url_unique_a, "src_a")
-    event_b = _make_event(url_shared, "src_b")  # same URL → same ID
-    event_c = _make_event(url_unique_b, "src_b")
+    event_shared = make_record(event_id="shared", source_id="src_a")
+    event_a = make_record(event_id="unique-a", source_id="src_a")
+    event_b = make_record(event_id="shared", source_id="src_b")  # same ID as event_shared
+    event_c = make_record(event_id="unique-b", source_id="src_b")
 
     source_a = _make_source("src_a")
     source_b = _make_source("src_b")
 
-    async def fake_fetch_source(client, source, source_status):
+    async def fake_fetch_source(client, source, source_status, *args, **kwargs):
         if source.id == "src_a":
             return [event_shared, event_a]
         return [event_b, event_c]
@@ -152,3 +150,415 @@ async def test_fetch_all_deduplication():
     ids = [e.id for e in result]
     assert len(ids) == len(set(ids)), "Duplicate event IDs found in fetch_all result"
     assert len(result) == 3  # shared (once), unique_a, unique_b
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_archives_events_beyond_the_cap(tmp_path):
+    events = [make_record(n) for n in range(3)]
+
+    async def fake_fetch_source(client, source, source_status, *args, **kwargs):
+        return events
+
+    archive = Archive(tmp_path)
+    writers = []
+    append = archive.append
+    archive.append = lambda evs: (writers.append(threading.current_thread()), append(evs))
+    with patch("warmonitor.fetcher.fetch_source", side_effect=fake_fetch_source):
+        result = await fetch_all(
+            [_make_source()], {}, settings=Settings(max_events=2), archive=archive
+        )
+
+    assert len(result) == 2
+    assert {e.id for e in archive.events(0, 2**32)} == {e.id for e in events}
+    assert writers and threading.main_thread() not in writers  # off the event loop
+
+
+@pytest.mark.asyncio
+async def test_fetch_iter_yields_fastest_source_first():
+    delays = {"slow": 0.2, "fast": 0.0}
+
+    async def fake_fetch_source(client, source, source_status, *args, **kwargs):
+        await asyncio.sleep(delays[source.id])
+        source_status[source.id] = "ok"
+        return [
+            make_record(event_id="shared", source_id=source.id),
+            make_record(event_id=source.id),
+        ]
+
+    status: dict[str, str] = {}
+    batches = []
+    with patch("warmonitor.fetcher.fetch_source", side_effect=fake_fetch_source):
+        async for batch in fetch_iter([_make_source("slow"), _make_source("fast")], status):
+            batches.append((batch.source.id, dict(status), len(batch.events)))
+
+    # The shared URL is only reported by the source that answered first.
+    assert batches == [("fast", {"fast": "ok"}, 2), ("slow", {"fast": "ok", "slow": "ok"}, 1)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_iter_closed_early_cancels_pending_fetches():
+    cancelled = []
+
+    async def fake_fetch_source(client, source, source_status, *args, **kwargs):
+        try:
+            await asyncio.sleep(0 if source.id == "fast" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(source.id)
+            raise
+        return []
+
+    with patch("warmonitor.fetcher.fetch_source", side_effect=fake_fetch_source):
+        batches = fetch_iter([_make_source("slow"), _make_source("fast")], {})
+        async with contextlib.aclosing(batches):
+            async for batch in batches:
+                assert batch.source.id == "fast"
+                break
+
+    assert cancelled == ["slow"]
+
+
+_RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>Iran missile test</title><link>https://example.com/a</link>
+<description>Details</description></item>
+</channel></rss>"""
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_stores_validators():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=_RSS,
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+
+    validators: dict[str, dict[str, str]] = {}
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(client, _make_source(), status, validators)
+
+    assert len(events) == 1
+    assert status["test"] == "ok"
+    assert validators["https://example.com/rss"] == {
+        "etag": '"v1"',
+        "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_not_modified_skips_parse():
+    seen_headers: list[httpx.Headers] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers)
+        return httpx.Response(304)
+
+    validators = {"https://example.com/rss": {"etag": '"v1"'}}
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with patch("warmonitor.fetcher.feedparser.parse") as parse:
+            events = await fetch_source(client, _make_source(), status, validators)
+
+    assert events == []
+    assert status["test"] == "ok"
+    assert seen_headers[0]["If-None-Match"] == '"v1"'
+    parse.assert_not_called()
+    assert validators["https://example.com/rss"] == {"etag": '"v1"'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_fetch_source_parses_in_executor(kind):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_RSS)
+
+    source = _make_source()
+    shared = source_ref(source.id, source.name, source.credibility)
+    executor = create_executor(Settings(parse_executor=kind, parse_workers=1))
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            events = await fetch_source(client, source, {}, executor=executor)
+    finally:
+        executor.shutdown()
+
+    assert [e.title for e in events] == ["Iran missile test"]
+    assert events[0].severity == 4
+    assert events[0].source is shared
+    assert events[0].keywords is intern_keywords(events[0].keywords)
+
+
+def test_create_executor_inline():
+    assert create_executor(Settings(parse_executor="inline")) is None
+
+
+def test_calculate_severity_whole_words():
+    assert _calculate_severity("Film wins award in Warsaw") == 5
+    assert _calculate_severity("Film wins award in Warsaw", whole_words=True) == 1
+    assert _calculate_severity("Overnight strikes on depot", whole_words=True) == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_reports_to_scheduler():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, headers={"Retry-After": "900"})
+
+    source = _make_source()
+    scheduler = PollScheduler([source], jitter=0.0)
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(client, source, status, scheduler=scheduler)
+
+    assert events == []
+    assert status["test"] == "error"
+    assert scheduler.interval("test") == 120
+    assert scheduler.next_due("test") >= time.monotonic() + 890
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_refuses_declared_oversize_body():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_RSS)  # sets Content-Length
+
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with patch("warmonitor.fetcher.feedparser.parse") as parse:
+            events = await fetch_source(
+                client, _make_source(), status, settings=Settings(max_feed_bytes=64)
+            )
+
+    assert events == []
+    assert status["test"] == "error"
+    parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_aborts_stream_past_source_cap():
+    chunks_sent = 0
+
+    async def endless():
+        nonlocal chunks_sent
+        while True:
+            chunks_sent += 1
+            yield b"x" * 1024
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=endless())  # no Content-Length
+
+    source = _make_source().model_copy(update={"max_bytes": 4096})
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(client, source, status)
+
+    assert events == []
+    assert status["test"] == "error"
+    assert chunks_sent == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_total_timeout():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, content=_RSS)
+
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(
+            client, _make_source(), status, settings=Settings(total_timeout=0.05)
+        )
+
+    assert events == []
+    assert status["test"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_open_circuit_skips_the_network():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503)
+
+    breakers = SourceBreakers(threshold=2, cooldown=60)
+    scheduler = PollScheduler([_make_source()], jitter=0.0)
+    metrics = FetchMetrics()
+    status: dict[str, str] = {}
+    reported = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(3):
+            scheduler.due()
+            await fetch_source(
+                client,
+                _make_source(),
+                status,
+                scheduler=scheduler,
+                metrics=metrics,
+                breakers=breakers,
+            )
+            reported.append(status["test"])
+
+    assert len(calls) == 2
+    assert reported == ["error", "open", "open"]
+    assert metrics.sources["test"].outcomes == {"error": 2, "open": 1}
+    assert scheduler.next_due("test") == pytest.approx(time.monotonic() + 60, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_reports_half_open_trial():
+    status: dict[str, str] = {}
+    during: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        during.append(status["test"])
+        return httpx.Response(503)
+
+    breakers = SourceBreakers(threshold=1, cooldown=0)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(2):
+            await fetch_source(client, _make_source(), status, breakers=breakers)
+
+    assert during == ["fetching", "half_open"]
+    assert status["test"] == "open"  # the failed trial reopened the circuit
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_uses_adaptive_timeout():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, content=_RSS)
+
+    breakers = SourceBreakers(timeout_factor=2, min_timeout=0.05)
+    for _ in range(5):
+        breakers.record_success("test", 0.01)
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await fetch_source(client, _make_source(), status, breakers=breakers)
+
+    assert status["test"] == "error"  # 0.05 s instead of the 30 s total_timeout
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_hedges_a_usually_fast_source():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)  # the first request stalls
+        return httpx.Response(200, content=_RSS)
+
+    breakers = SourceBreakers(hedge_threshold=1.0)
+    for _ in range(5):
+        breakers.record_success("test", 0.02)
+    start = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(client, _make_source(), {}, breakers=breakers)
+
+    assert len(calls) == 2
+    assert [e.title for e in events] == ["Iran missile test"]
+    assert time.perf_counter() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_hedge_needs_a_free_host_slot():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, content=_RSS)
+
+    breakers = SourceBreakers(hedge_threshold=1.0)
+    for _ in range(5):
+        breakers.record_success("test", 0.02)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await fetch_source(
+            client, _make_source(), {}, limiter=HostLimiter(1), breakers=breakers
+        )
+
+    assert len(calls) == 1  # the only slot is held by the first request
+    assert [e.title for e in events] == ["Iran missile test"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_parse_error_does_not_open_the_circuit():
+    breakers = SourceBreakers(threshold=1)
+    status: dict[str, str] = {}
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=_RSS))
+    ) as client:
+        with patch("warmonitor.fetcher._parse_feed", side_effect=ValueError("bad feed")):
+            await fetch_source(client, _make_source(), status, breakers=breakers)
+
+    assert status["test"] == "error"
+    assert breakers.state("test") == "closed"
+
+
+def test_create_client_sends_accept_encoding_and_timeouts():
+    client = create_client(Settings(connect_timeout=2.0, read_timeout=7.0))
+    assert client.headers["Accept-Encoding"] == ACCEPT_ENCODING
+    assert ACCEPT_ENCODING.startswith("gzip, deflate")
+    assert client.timeout.connect == 2.0
+    assert client.timeout.read == 7.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_skips_seen_entries():
+    bodies = [_RSS, _RSS.replace(b"</channel>", b"""<item><title>Iran missile launch</title>
+<link>https://www.example.com/b?utm_source=rss</link></item></channel>""")]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=bodies.pop(0))
+
+    seen = SeenIndex()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await fetch_source(client, _make_source(), {}, seen=seen)
+        second = await fetch_source(client, _make_source(), {}, seen=seen)
+
+    assert [e.url for e in first] == ["https://example.com/a"]
+    assert [e.url for e in second] == ["https://www.example.com/b?utm_source=rss"]
+    assert "https://example.com/b" in seen.view("test")
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_skips_parsing_identical_body():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_RSS)
+
+    source = _make_source()
+    seen = SeenIndex()
+    scheduler = PollScheduler([source], jitter=0.0)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await fetch_source(client, source, {}, seen=seen)
+        with patch("warmonitor.fetcher.feedparser.parse") as parse:
+            events = await fetch_source(client, source, {}, seen=seen, scheduler=scheduler)
+
+    assert events == []
+    parse.assert_not_called()
+    assert scheduler.interval("test") == 60
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_records_metrics():
+    responses = [
+        httpx.Response(200, content=_RSS),
+        httpx.Response(304),
+        httpx.Response(503),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    metrics = FetchMetrics()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(3):
+            await fetch_source(client, _make_source(), {}, metrics=metrics)
+
+    recorded = metrics.sources["test"]
+    assert recorded.outcomes == {"ok": 1, "not_modified": 1, "error": 1}
+    assert recorded.errors == {"http_503": 1}
+    assert recorded.bytes == len(_RSS)
+    assert (recorded.entries, recorded.new, recorded.matched) == (1, 1, 1)
+    assert recorded.phases["ttfb"].count == 3
+    assert recorded.phases["download"].count == 1
+    assert recorded.phases["parse"].count == recorded.phases["match"].count == 1
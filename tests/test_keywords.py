@@ -0,0 +1,52 @@
+"""Tests for warmonitor.keywords module."""
+
+from __future__ import annotations
+
+from warmonitor.keywords import KeywordMatcher
+
+
+def test_scan_returns_tags_in_definition_order():
+    matcher = KeywordMatcher(["missile", "Iran", "UK"])
+    matched, weight = matcher.scan("IRAN fires missile")
+    assert matched == ["missile", "Iran"]
+    assert weight == 0
+
+
+def test_scan_reports_overlapping_keywords():
+    matcher = KeywordMatcher(["US", "US military", "military"])
+    matched, _ = matcher.scan("US military deployed")
+    assert matched == ["US", "US military", "military"]
+
+
+def test_scan_returns_max_weight():
+    matcher = KeywordMatcher(["Iran"], [(5, ["strike"]), (3, ["sanctions"])])
+    matched, weight = matcher.scan("Iran sanctions follow strike")
+    assert matched == ["Iran"]
+    assert weight == 5
+
+
+def test_substring_mode_matches_inside_words():
+    matcher = KeywordMatcher(["war"])
+    assert matcher.scan("Film wins award")[0] == ["war"]
+
+
+def test_whole_words_rejects_partial_words():
+    matcher = KeywordMatcher(["war"], whole_words=True)
+    assert matcher.scan("Film wins award in Warsaw")[0] == []
+    assert matcher.scan("War, again.")[0] == ["war"]
+
+
+def test_whole_words_wildcard_suffix():
+    matcher = KeywordMatcher(["strike*"], whole_words=True)
+    assert matcher.scan("Overnight strikes reported")[0] == ["strike*"]
+    assert matcher.scan("Airstrike reported")[0] == []
+
+
+def test_whole_words_shared_prefix_backtracks():
+    matcher = KeywordMatcher(["Iran", "Iranian"], whole_words=True)
+    assert matcher.scan("Iranian officials")[0] == ["Iranian"]
+    assert matcher.scan("Iran's officials")[0] == ["Iran"]
+
+
+def test_empty_matcher():
+    assert KeywordMatcher().scan("anything") == ([], 0)
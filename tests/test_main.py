@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from warmonitor.main import _calculate_defcon, _time_ago
-from warmonitor.models import Event
+from tests.conftest import make_record
+from warmonitor import config, fetcher
+from warmonitor.main import (
+    EventRow,
+    WarmonitorApp,
+    _event_row_text,
+    _metrics_table,
+    _speed,
+    _time_ago,
+)
+from warmonitor.metrics import FetchMetrics
+from warmonitor.models import Event, Source
+from warmonitor.scheduler import PollScheduler
+from warmonitor.seen import SeenIndex
 
 
 def _make_event(severity: int, age_minutes: int = 0, url: str = "https://example.com/") -> Event:
@@ -51,35 +65,201 @@ def test_time_ago_days():
     assert result == "2d ago"
 
 
-# ── _calculate_defcon ────────────────────────────────────────────────────────
+# ── _event_row_text ──────────────────────────────────────────────────────────
 
-def test_calculate_defcon_no_events():
-    assert _calculate_defcon([]) == 5
+def test_event_row_text():
+    event = _make_event(5, age_minutes=5)
+    assert _event_row_text(event) == "🔴 [5m ago] Test event\n    ↳ Test Source"
 
 
-def test_calculate_defcon_sev3_only():
-    events = [_make_event(3)]
-    assert _calculate_defcon(events) == 4
+def test_event_row_text_counts_clustered_sources():
+    event = _make_event(5, age_minutes=5)
+    assert _event_row_text(event, sources=3).endswith("↳ Test Source +2 more")
 
 
-def test_calculate_defcon_single_sev4():
-    events = [_make_event(4, age_minutes=60)]
-    assert _calculate_defcon(events) == 3
+def test_metrics_table_lists_polled_sources():
+    sources = [
+        Source(id=i, name=i.upper(), url="", type="rss", keywords=[], credibility="", color="")
+        for i in ("bbc", "ap")
+    ]
+    metrics = FetchMetrics()
+    assert _metrics_table(metrics, sources).endswith("No polls recorded yet.")
+    metrics.record("ap", "ok", {"ttfb": 0.04}, size=4096, new=4, matched=1)
+    metrics.record("ap", "error", {}, error="http_503")
+    lines = _metrics_table(metrics, sources).splitlines()
+    assert len(lines) == 3
+    assert lines[2].startswith("AP ")
+    assert lines[2].split()[1:3] == ["2", "1"]  # polls, errors
+    assert lines[2].endswith("25%  http_503")
 
 
-def test_calculate_defcon_two_sev4_recent():
-    events = [
-        _make_event(4, age_minutes=10, url="https://a.com/"),
-        _make_event(4, age_minutes=20, url="https://b.com/"),
-    ]
-    assert _calculate_defcon(events) == 2
+def test_replay_speed_parsing():
+    assert _speed("10x") == 10.0
+    assert _speed("0.5X") == 0.5
+    assert _speed("3") == 3.0
+    for bad in ("0x", "-2", "fast"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            _speed(bad)
+
+
+# ── WarmonitorApp (Textual pilot) ────────────────────────────────────────────
+
+
+@pytest.fixture
+def app(monkeypatch):
+    async def no_polling(self, cached):
+        pass  # feed the app by hand, never from the network
+
+    monkeypatch.setattr(WarmonitorApp, "_start_polling", no_polling)
+    return WarmonitorApp(standalone=True)
+
+
+def _row_ids(app: WarmonitorApp) -> list[str]:
+    return [row._event.id for row in app.query(EventRow)]
+
+
+async def test_feed_rows_are_patched_by_event_id(app):
+    async with app.run_test() as pilot:
+        app._apply_events([make_record(1, severity=5), make_record(2), make_record(3)], [])
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-3", "ev-2", "ev-1"]
+        rows = dict(app._rows)
+        rows["ev-2"].focus()
+        await pilot.pause()
+
+        app._apply_events([make_record(4)], ["ev-3"])
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-4", "ev-2", "ev-1"]
+        assert app._rows["ev-2"] is rows["ev-2"]
+        assert app.focused is rows["ev-2"]
+
+        await pilot.press("s")  # sort by severity: rows move, none is rebuilt
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-1", "ev-4", "ev-2"]
+        assert app._rows["ev-1"] is rows["ev-1"]
+        assert app.focused is rows["ev-2"]
+
+
+async def test_search_box_filters_rows(app):
+    async with app.run_test() as pilot:
+        app._apply_events(
+            [
+                make_record(1, title="Missile strike"),
+                make_record(2, title="Oil prices"),
+                make_record(3, title="Missile test"),
+            ],
+            [],
+        )
+        await pilot.press("slash", *"missi")  # prefix match while typing
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-3", "ev-1"]
+        assert str(app.query_one("#search-facets").render()).startswith("2 matches")
+
+        await pilot.press(*"le -strike")
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-3"]
+
+        await pilot.press("escape")
+        await pilot.pause()
+        assert _row_ids(app) == ["ev-3", "ev-2", "ev-1"]
+
+
+def _source_toml(source_id: str) -> str:
+    return (
+        f'[[sources]]\nid = "{source_id}"\nname = "{source_id.upper()}"\n'
+        f'url = "https://{source_id}.example/rss"\ntype = "rss"\nkeywords = ["Iran"]\n'
+        'credibility = "HIGH"\ncolor = "green"\n'
+    )
+
+
+def _sidebar(app: WarmonitorApp) -> list[tuple[str, str]]:
+    return [(label.id, str(label.render())) for label in app.query(".source-item")]
+
+
+async def test_sources_panel_follows_config_edits(app):
+    async with app.run_test() as pilot:
+        config._CONFIG_PATH.write_text(
+            "replace_defaults = true\n" + _source_toml("a") + _source_toml("b"),
+            encoding="utf-8",
+        )
+        app._check_config()
+        await pilot.pause()
+        assert _sidebar(app) == [("src-a", "⚪ A"), ("src-b", "⚪ B")]
+
+        app.source_status["b"] = "ok"
+        app._update_source_label("b")
+        label_b = app.query_one("#src-b")
+        config._CONFIG_PATH.write_text(
+            "replace_defaults = true\n" + _source_toml("c") + _source_toml("b"),
+            encoding="utf-8",
+        )
+        app._check_config()
+        await pilot.pause()
+        # a goes, c is new, and the untouched b keeps its entry and status.
+        assert _sidebar(app) == [("src-c", "⚪ C"), ("src-b", "🟢 B")]
+        assert app.query_one("#src-b") is label_b
+
+        app._in_flight = {"c"}  # removed while being fetched: kept until it is done
+        config._CONFIG_PATH.write_text(
+            "replace_defaults = true\n" + _source_toml("b") + _source_toml("d"),
+            encoding="utf-8",
+        )
+        app._check_config()
+        await pilot.pause()
+        assert [label_id for label_id, _ in _sidebar(app)] == ["src-c", "src-b", "src-d"]
+        app._in_flight = set()
+        app._check_config()
+        await pilot.pause()
+        assert [label_id for label_id, _ in _sidebar(app)] == ["src-b", "src-d"]
+
+        app.source_status.update(b="open", d="half_open")
+        app._update_source_indicators()
+        assert _sidebar(app) == [("src-b", "⛔ B"), ("src-d", "🟠 D")]
+
+
+def _source(source_id: str) -> Source:
+    return Source(
+        id=source_id,
+        name=source_id.upper(),
+        url=f"https://{source_id}.example/rss",
+        type="rss",
+        keywords=["Iran"],
+        credibility="HIGH",
+        color="green",
+    )
+
+
+async def test_due_sources_start_while_a_slow_one_streams(app, monkeypatch):
+    release = asyncio.Event()
+    polled: list[str] = []
 
+    async def fake_fetch_iter(sources, source_status, *args, **kwargs):
+        for source in sources:
+            polled.append(source.id)
+            if source.id == "slow":
+                await release.wait()
+            source_status[source.id] = "ok"
+            yield fetcher.SourceBatch(source, [make_record(polled.index(source.id) + 1)])
 
-def test_calculate_defcon_sev5_recent():
-    events = [_make_event(5, age_minutes=5)]
-    assert _calculate_defcon(events) == 1
+    monkeypatch.setattr(fetcher, "fetch_iter", fake_fetch_iter)
+    async with app.run_test() as pilot:
+        app.sources = [_source("slow"), _source("fast")]
+        app.scheduler = PollScheduler(app.sources[:1], jitter=0.0)
+        app.validators, app.seen = {}, SeenIndex()
+        app.client = app.limiter = app.executor = app.archive = app.breakers = None
 
+        app._poll_due_sources()
+        await pilot.pause()
+        app.scheduler.add(app.sources[1])  # due while "slow" is still fetching
+        app._poll_due_sources()
+        await pilot.pause()
+        assert polled == ["slow", "fast"]
+        assert app.source_status["fast"] == "ok"
+        assert app.source_status["slow"] == "fetching"
+        assert app.fetching
 
-def test_calculate_defcon_sev5_old():
-    events = [_make_event(5, age_minutes=90)]
-    assert _calculate_defcon(events) == 2
+        release.set()
+        await pilot.pause()
+        assert app.source_status["slow"] == "ok"
+        assert not app.fetching
+        assert _row_ids(app) == ["ev-2", "ev-1"]
@@ -0,0 +1,65 @@
+"""Tests for warmonitor.metrics module."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from warmonitor.metrics import BUCKETS, FetchMetrics, Histogram
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram()
+    assert hist.quantile(0.5) is None
+    for value in (0.004, 0.004, 0.2, 60.0):
+        hist.observe(value)
+    assert hist.count == 4
+    assert hist.sum == pytest.approx(60.208)
+    assert hist.counts[BUCKETS.index(0.005)] == 2
+    assert hist.counts[-1] == 1  # above the last bound
+    assert 0.0025 < hist.quantile(0.5) <= 0.005
+    assert hist.quantile(0.99) == BUCKETS[-1]
+
+
+def test_record_counts_outcomes_errors_and_volume():
+    metrics = FetchMetrics()
+    metrics.record(
+        "bbc", "ok", {"ttfb": 0.1, "parse": 0.01}, size=1000, entries=10, new=4, matched=1
+    )
+    metrics.record("bbc", "error", {"connect": 2.0}, error="ConnectTimeout")
+    bbc = metrics.sources["bbc"]
+    assert bbc.outcomes == {"ok": 1, "error": 1}
+    assert bbc.errors == {"ConnectTimeout": 1}
+    assert bbc.last_error == "ConnectTimeout"
+    assert (bbc.bytes, bbc.entries, bbc.new, bbc.matched) == (1000, 10, 4, 1)
+    assert bbc.match_ratio == 0.25
+    assert bbc.phases["connect"].count == 1
+    assert bbc.phases["download"].count == 0
+
+
+def test_to_dict_round_trips_through_json():
+    metrics = FetchMetrics()
+    metrics.record("bbc", "ok", {"ttfb": 0.1}, size=10)
+    metrics.record("ap", "error", {}, error="http_503")
+    reader = FetchMetrics()
+    reader.update(json.loads(json.dumps(metrics.to_dict(["bbc"]))))
+    assert list(reader.sources) == ["bbc"]
+    ttfb = reader.sources["bbc"].phases["ttfb"]
+    assert ttfb.counts == metrics.sources["bbc"].phases["ttfb"].counts
+    reader.update(json.loads(json.dumps(metrics.to_dict())))
+    assert reader.render_prometheus() == metrics.render_prometheus()
+
+
+def test_render_prometheus_histogram_is_cumulative():
+    metrics = FetchMetrics()
+    metrics.record('odd"id', "ok", {"ttfb": 0.003})
+    metrics.record('odd"id', "ok", {"ttfb": 0.3})
+    text = metrics.render_prometheus()
+    labels = 'source="odd\\"id",phase="ttfb"'
+    assert f'warmonitor_fetch_phase_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'warmonitor_fetch_phase_seconds_bucket{{{labels},le="0.5"}} 2' in text
+    assert f'warmonitor_fetch_phase_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"warmonitor_fetch_phase_seconds_count{{{labels}}} 2" in text
+    assert 'warmonitor_fetches_total{source="odd\\"id",outcome="ok"} 2' in text
+    assert text.endswith("\n")
@@ -0,0 +1,66 @@
+"""Tests for warmonitor.records module."""
+
+from __future__ import annotations
+
+import pickle
+from datetime import datetime, timezone
+
+from warmonitor.models import Event
+from warmonitor.records import SUMMARY_LIMIT, EventRecord, compact_summary
+
+
+def _make_event(summary: str = "Summary", source_id: str = "test") -> Event:
+    return Event(
+        id="ev-1",
+        title="Test event",
+        summary=summary,
+        url="https://example.com/1",
+        published=datetime(2025, 1, 1, 12, tzinfo=timezone.utc),
+        source_id=source_id,
+        source_name="Test Source",
+        credibility="HIGH",
+        keywords_matched=["Iran", "strike"],
+        severity=5,
+    )
+
+
+def test_round_trip_through_event():
+    event = _make_event()
+    record = EventRecord.from_event(event)
+    assert record.ts == 1735732800
+    assert record.published == event.published
+    assert record.source_name == "Test Source"
+    assert record.keywords_matched == ["Iran", "strike"]
+    assert record.to_event() == event
+
+
+def test_records_share_source_and_keywords():
+    a = EventRecord.from_event(_make_event())
+    b = EventRecord.from_event(_make_event())
+    assert a.source is b.source
+    assert a.keywords is b.keywords
+    assert EventRecord.from_event(_make_event(source_id="other")).source is not a.source
+
+
+def test_compact_summary_strips_markup_and_truncates():
+    assert compact_summary("<p>Hello&nbsp;<b>world</b></p>\n\n") == "Hello world"
+    long = compact_summary("word " * 200)
+    assert len(long) == SUMMARY_LIMIT
+    assert long.endswith("…")
+
+
+def test_record_pickles():
+    record = EventRecord.from_event(_make_event())
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_from_dict_matches_validated_event():
+    event = _make_event()
+    record = EventRecord.from_dict(event.model_dump(mode="json"))
+    assert record == EventRecord.from_event(event)
+
+
+def test_to_dict_matches_validated_event():
+    record = EventRecord.from_event(_make_event())
+    assert record.to_dict() == record.to_event().model_dump(mode="json")
+    assert EventRecord.from_dict(record.to_dict()) == record
@@ -0,0 +1,135 @@
+"""Tests for warmonitor.replay and warmonitor.clock modules."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from warmonitor import clock
+from warmonitor.clock import ScaledClock
+from warmonitor.fetcher import create_client, fetch_source
+from warmonitor.metrics import FetchMetrics
+from warmonitor.models import Settings, Source
+from warmonitor.replay import Recorder, ReplayServer, load_recording
+
+_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>T</title>
+<item><title>Iran missile test</title><link>https://example.com/a</link>
+<pubDate>Sat, 14 Jun 2025 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+def _make_source() -> Source:
+    return Source(
+        id="test",
+        name="Test Source",
+        url="https://feeds.example.com/rss",
+        type="rss",
+        keywords=["Iran"],
+        credibility="HIGH",
+        color="green",
+    )
+
+
+async def _record(path, handler) -> None:
+    """Poll the test source three times through *handler*, recording into *path*."""
+    recorder = Recorder(path)
+    transport = recorder.wrap(httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(3):
+            await fetch_source(client, _make_source(), {})
+
+
+def _upstream():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 2:
+            raise httpx.ConnectTimeout("timed out", request=request)
+        return httpx.Response(
+            200,
+            headers={"Content-Encoding": "gzip", "ETag": '"v1"'},
+            content=gzip.compress(_FEED),
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_recording_keeps_raw_bodies_once(tmp_path):
+    await _record(tmp_path, _upstream())
+    recording = load_recording(tmp_path)
+    assert [e.status for e in recording.exchanges] == [200, 0, 200]
+    assert recording.exchanges[1].error == "ConnectTimeout"
+    assert all(e.url == "https://feeds.example.com/rss" for e in recording.exchanges)
+    first = recording.exchanges[0]
+    assert gzip.decompress(recording.body(first)) == _FEED
+    assert len(list((tmp_path / "bodies").iterdir())) == 1
+    with pytest.raises(FileExistsError):
+        Recorder(tmp_path)
+    with pytest.raises(ValueError):
+        load_recording(tmp_path / "missing")
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_exchanges_in_order_through_the_fetcher(tmp_path):
+    await _record(tmp_path, _upstream())
+    server = ReplayServer(load_recording(tmp_path), speed=50)
+    await server.start()
+    client = create_client(Settings(), wrap=server.wrap)
+    metrics = FetchMetrics()
+    status: dict[str, str] = {}
+    try:
+        results = [
+            await fetch_source(client, _make_source(), status, metrics=metrics)
+            for _ in range(4)
+        ]
+    finally:
+        await client.aclose()
+        await server.close()
+    assert [len(events) for events in results] == [1, 0, 1, 1]  # the last exchange repeats
+    assert results[0][0].title == "Iran missile test"
+    assert results[0][0].url == "https://example.com/a"
+    source = metrics.sources["test"]
+    assert source.outcomes == {"ok": 3, "error": 1}
+    assert source.errors == {"ConnectTimeout": 1}
+
+
+@pytest.mark.asyncio
+async def test_replay_of_unknown_url_is_not_found(tmp_path):
+    await _record(tmp_path, _upstream())
+    server = ReplayServer(load_recording(tmp_path))
+    await server.start()
+    client = create_client(Settings(), wrap=server.wrap)
+    try:
+        response = await client.get("https://other.example.com/rss")
+    finally:
+        await client.aclose()
+        await server.close()
+    assert response.status_code == 404
+
+
+def test_scaled_clock(monkeypatch):
+    ticks = iter([100.0, 105.0])
+    monkeypatch.setattr("warmonitor.clock.time.monotonic", lambda: next(ticks))
+    scaled = ScaledClock(start=1_750_000_000, speed=10)
+    clock.set_clock(scaled)
+    try:
+        assert clock.now() == datetime.fromtimestamp(1_750_000_050, tz=timezone.utc)
+    finally:
+        clock.set_clock(None)
+    assert abs(clock.now() - datetime.now(timezone.utc)).total_seconds() < 5
+    with pytest.raises(ValueError):
+        ScaledClock(0, speed=0)
+
+
+def test_recording_format_is_checked(tmp_path):
+    (tmp_path / "recording.json").write_text(json.dumps({"format": 99, "started": 0}))
+    (tmp_path / "exchanges.jsonl").write_text("")
+    with pytest.raises(ValueError):
+        load_recording(tmp_path)
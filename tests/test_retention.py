@@ -0,0 +1,77 @@
+"""Tests for warmonitor.retention module."""
+
+from __future__ import annotations
+
+import random
+
+from tests.conftest import T0, make_record
+from warmonitor.records import EventRecord
+from warmonitor.retention import RetainedEvents
+
+
+def _ids(events: list[EventRecord]) -> list[str]:
+    return [e.id for e in events]
+
+
+def test_merge_reports_added_and_removed():
+    retained = RetainedEvents(2, [make_record(2), make_record(1)])
+    changed = make_record(2, title="Updated")
+    added, removed = retained.merge([make_record(3), changed])
+    assert _ids(retained.newest()) == ["ev-3", "ev-2"]
+    assert added == [make_record(3), changed]
+    assert removed == ["ev-1"]
+    assert retained.merge([changed]) == ([], [])
+
+
+def test_merge_skips_events_older_than_a_full_window():
+    retained = RetainedEvents(2, [make_record(5), make_record(4)])
+    assert retained.merge([make_record(1), make_record(6)]) == ([make_record(6)], ["ev-4"])
+    assert "ev-1" not in retained
+    # An event pushed out by a later one in the same batch was never reported.
+    assert retained.merge([make_record(7), make_record(8), make_record(9)]) == (
+        [make_record(9), make_record(8)],
+        ["ev-5", "ev-6"],
+    )
+
+
+def test_apply_replaces_and_drops():
+    retained = RetainedEvents(10, [make_record(2), make_record(1)])
+    retained.apply([make_record(3), make_record(2, title="Updated")], ["ev-1"])
+    assert [(e.id, e.title) for e in retained.newest()] == [
+        ("ev-3", "Test event"),
+        ("ev-2", "Updated"),
+    ]
+
+
+def test_views_match_full_sorts():
+    """Same result as stably sorting "changed + retained" by time and truncating."""
+    rng = random.Random(7)
+    retained = RetainedEvents(50)
+    expected: list[EventRecord] = []
+    for _ in range(30):
+        new = [
+            make_record(n, severity=rng.randint(1, 5), ts=T0 + rng.randrange(40))
+            for n in rng.sample(range(150), 15)
+        ]
+        added, removed = retained.merge(new)
+        previous = {e.id: e for e in expected}
+        changed = [e for e in new if previous.get(e.id) != e]
+        changed_ids = {e.id for e in changed}
+        kept = sorted(
+            changed + [e for e in expected if e.id not in changed_ids], key=lambda e: -e.ts
+        )[:50]
+        assert retained.newest() == kept
+        assert retained.by_severity() == sorted(kept, key=lambda e: -e.severity)
+        assert added == [e for e in kept if previous.get(e.id) != e]
+        assert set(removed) == set(previous) - {e.id for e in kept}
+        expected = kept
+
+
+def test_views_are_reused_until_changed():
+    retained = RetainedEvents(5, [make_record(1, severity=5), make_record(2, severity=1)])
+    newest, severe = retained.newest(), retained.by_severity()
+    assert _ids(newest) == ["ev-2", "ev-1"]
+    assert _ids(severe) == ["ev-1", "ev-2"]
+    assert retained.newest() is newest
+    retained.merge([make_record(3, severity=4)])
+    assert _ids(retained.by_severity()) == ["ev-1", "ev-3", "ev-2"]
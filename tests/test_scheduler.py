@@ -0,0 +1,93 @@
+"""Tests for warmonitor.scheduler module."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from warmonitor.models import Source
+from warmonitor.scheduler import PollScheduler
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _make_source(source_id: str = "test", interval: int | None = None) -> Source:
+    return Source(
+        id=source_id,
+        name="Test Source",
+        url="https://example.com/rss",
+        type="rss",
+        keywords=["Iran"],
+        credibility="HIGH",
+        color="green",
+        interval=interval,
+    )
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+def _scheduler(clock: _Clock, *sources: Source, jitter: float = 0.0) -> PollScheduler:
+    return PollScheduler(sources, clock=clock, jitter=jitter, rng=random.Random(0))
+
+
+def test_new_sources_are_due_once_until_recorded(clock):
+    scheduler = _scheduler(clock, _make_source("a"), _make_source("b"))
+    assert sorted(scheduler.due()) == ["a", "b"]
+    assert scheduler.due() == []
+
+
+def test_per_source_interval(clock):
+    scheduler = _scheduler(clock, _make_source("fast", interval=30), _make_source("slow"))
+    scheduler.due()
+    scheduler.record_success("fast")
+    scheduler.record_success("slow")
+    clock.now += 31
+    assert scheduler.due() == ["fast"]
+
+
+def test_ttl_and_max_age_are_floors(clock):
+    scheduler = _scheduler(clock, _make_source())
+    scheduler.record_success("test", ttl=5)
+    assert scheduler.interval("test") == 300
+    scheduler.record_success("test", {"cache-control": "public, max-age=600"})
+    assert scheduler.interval("test") == 600
+
+
+def test_high_severity_speeds_up(clock):
+    scheduler = _scheduler(clock, _make_source())
+    scheduler.record_success("test", max_severity=4)
+    assert scheduler.interval("test") == 30
+    scheduler.record_success("test", max_severity=5)
+    assert scheduler.interval("test") == 15
+
+
+def test_errors_back_off_and_honour_retry_after(clock):
+    scheduler = _scheduler(clock, _make_source())
+    scheduler.record_error("test")
+    assert scheduler.interval("test") == 120
+    scheduler.record_error("test")
+    assert scheduler.interval("test") == 240
+    scheduler.record_error("test", {"retry-after": "7200"})
+    assert scheduler.next_due("test") == clock.now + 7200
+    scheduler.record_success("test")
+    assert scheduler.interval("test") == 60
+
+
+def test_jitter_spreads_next_due(clock):
+    sources = [_make_source(str(i)) for i in range(10)]
+    scheduler = _scheduler(clock, *sources, jitter=0.1)
+    for source in sources:
+        scheduler.record_success(source.id)
+    due_times = {scheduler.next_due(s.id) for s in sources}
+    assert len(due_times) == 10
+    assert all(clock.now + 54 <= t <= clock.now + 66 for t in due_times)
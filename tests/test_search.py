@@ -0,0 +1,127 @@
+"""Tests for warmonitor.search module."""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.conftest import T0, make_record
+from warmonitor import search
+from warmonitor.search import Query, QueryError, SearchIndex, parse_query
+
+
+def _ids(result) -> list[str]:
+    return [e.id for e in result.events]
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    return SearchIndex(
+        [
+            make_record(
+                event_id="a",
+                title="Missile strike on Tehran airport",
+                summary="Officials confirm damage.",
+                source_id="reuters",
+                severity=5,
+                ts=T0 + 30,
+            ),
+            make_record(
+                event_id="b",
+                title="Navy drill in the Gulf",
+                summary="Routine exercise near Hormuz.",
+                source_id="bbc",
+                severity=2,
+                ts=T0 + 20,
+                keywords=("Iran", "US military"),
+            ),
+            make_record(
+                event_id="c",
+                title="Strike talks resume in Geneva",
+                summary="Nuclear negotiators meet.",
+                source_id="ap",
+                ts=T0 + 10,
+                keywords=("Israel",),
+            ),
+        ]
+    )
+
+
+def test_parse_query_fields_and_operators():
+    query = parse_query('strike nucl* -drill source:bbc,ap severity:4 keyword:"US military"')
+    assert query == Query(
+        terms=("strike",),
+        prefixes=("nucl",),
+        excluded=("drill",),
+        sources=frozenset({"bbc", "ap"}),
+        keywords=frozenset({"us military"}),
+        min_severity=4,
+    )
+    assert parse_query("tehr", prefix=True).prefixes == ("tehr",)
+    assert parse_query("see https://x.example").terms == ("see", "https", "example")
+    with pytest.raises(QueryError):
+        parse_query("severity:high")
+    with pytest.raises(QueryError):
+        parse_query("-source:bbc")
+
+
+def test_terms_match_title_summary_and_keywords_newest_first(index):
+    assert _ids(index.search("strike")) == ["a", "c"]
+    assert _ids(index.search("STRIKE tehran")) == ["a"]
+    assert _ids(index.search("hormuz")) == ["b"]
+    assert _ids(index.search("military")) == ["b"]
+    assert _ids(index.search("strike -geneva")) == ["a"]
+    assert _ids(index.search("nucl*")) == ["c"]
+    assert _ids(index.search("teh", prefix=True)) == ["a"]
+    assert _ids(index.search("")) == ["a", "b", "c"]
+    assert _ids(index.search("absent")) == []
+
+
+def test_filters_and_limit(index):
+    assert _ids(index.search("source:bbc,ap")) == ["b", "c"]
+    assert _ids(index.search("severity:3")) == ["a", "c"]
+    assert _ids(index.search("keyword:israel")) == ["c"]
+    assert _ids(index.search(Query(since=T0 + 15))) == ["a", "b"]
+    result = index.search("", limit=1)
+    assert _ids(result) == ["a"]
+    assert result.total == 3
+
+
+def test_facets_count_every_match(index):
+    facets = index.search("strike", limit=1).facets
+    assert facets.source == {"reuters": 1, "ap": 1}
+    assert facets.severity == {5: 1, 3: 1}
+    assert facets.keyword == {"Iran": 1, "Israel": 1}
+    assert index.facets(["b", "missing"]).keyword == {"Iran": 1, "US military": 1}
+
+
+def test_apply_replaces_and_removes(index):
+    index.apply(
+        [make_record(event_id="a", title="Ceasefire announced", severity=2, ts=T0 + 40)], ["c"]
+    )
+    assert _ids(index.search("strike")) == []
+    assert _ids(index.search("ceasefire")) == ["a"]
+    assert index.search("").facets.severity == {2: 2}
+    assert len(index) == 2
+
+
+def test_compaction_keeps_results(monkeypatch):
+    monkeypatch.setattr(search, "_COMPACT_MIN", 4)
+    index = SearchIndex()
+    for n in range(20):
+        index.apply(
+            [make_record(event_id=f"e{n}", title=f"Report {n} strike", ts=T0 + n)], [f"e{n - 3}"]
+        )
+    assert len(index._docs) < 20  # removed documents were dropped
+    assert _ids(index.search("strike")) == ["e19", "e18", "e17"]
+    assert _ids(index.search("17")) == ["e17"]
+    assert _ids(index.search(Query(since=T0 + 17))) == ["e19", "e18"]
+
+
+def test_bulk_apply_orders_by_publication():
+    events = [
+        make_record(event_id=f"e{n}", title="Update", ts=T0 + (n * 7) % 100) for n in range(100)
+    ]
+    index = SearchIndex(events)
+    ordered = [e.ts for e in index.search("update").events]
+    assert ordered == sorted(ordered, reverse=True)
+    assert len(ordered) == 100
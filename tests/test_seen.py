@@ -0,0 +1,75 @@
+"""Tests for warmonitor.seen module."""
+
+from __future__ import annotations
+
+import pickle
+
+from warmonitor.seen import BloomFilter, SeenIndex, canonical_url
+
+
+def test_canonical_url_strips_tracking_params_and_fragment():
+    assert (
+        canonical_url("https://www.Example.com/news/a/?utm_source=rss&id=7&fbclid=x#top")
+        == "https://example.com/news/a?id=7"
+    )
+
+
+def test_canonical_url_normalises_host_variants():
+    expected = canonical_url("https://example.com/a")
+    assert canonical_url("http://m.example.com/a") == expected
+    assert canonical_url("https://EXAMPLE.com:443/a/") == expected
+    assert canonical_url("https://example.com:8443/a") != expected
+
+
+def test_canonical_url_sorts_query():
+    assert canonical_url("https://example.com/?b=2&a=1") == canonical_url(
+        "https://example.com/?a=1&b=2"
+    )
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(size_bits=1 << 12, hashes=4)
+    keys = [f"https://example.com/{i}" for i in range(200)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 200
+    misses = sum(f"https://example.com/x{i}" in bloom for i in range(1000))
+    assert misses < 50
+
+
+def test_seen_index_trims_recent_but_bloom_remembers():
+    index = SeenIndex(recent_limit=3)
+    index.add("src", ["a", "b", "c", "d"])
+    seen = index.view("src")
+    assert list(seen.recent) == ["b", "c", "d"]
+    assert "a" in seen
+    assert "z" not in seen
+    assert index.dirty == {"src"}
+
+
+def test_seen_index_resets_full_bloom():
+    index = SeenIndex(recent_limit=2, bloom_capacity=2)
+    index.add("src", ["a", "b", "c"])
+    seen = index.view("src")
+    assert seen.bloom.count == 1
+    assert "a" not in seen
+    assert "b" in seen and "c" in seen
+
+
+def test_seen_index_only_marks_changes_dirty():
+    index = SeenIndex()
+    index.add("src", ["a"])
+    index.dirty.clear()
+    index.add("src", ["a"])
+    assert not index.dirty
+    index.forget("src")
+    assert index.dirty == {"src"}
+    assert len(index) == 0
+
+
+def test_source_seen_pickles():
+    index = SeenIndex()
+    index.add("src", ["a"])
+    restored = pickle.loads(pickle.dumps(index.view("src")))
+    assert "a" in restored
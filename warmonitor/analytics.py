@@ -0,0 +1,127 @@
+"""Incremental event statistics for warmonitor.
+
+:class:`EventStats` keeps per-minute buckets of severity counts plus running
+totals per severity and per source. It is updated only when events are added
+or dropped, so DEFCON, events/hr and the severity breakdown are read from a
+bounded number of buckets (at most the two-hour DEFCON window) instead of
+rescanning the retained history. Shared by the TUI and the web backend.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+
+from warmonitor import clock
+from warmonitor.records import EventRecord
+
+_BUCKET_SECONDS = 60
+
+
+class _Bucket:
+    __slots__ = ("counts", "items")
+
+    def __init__(self) -> None:
+        self.counts = [0] * 6  # indexed by severity 1-5
+        self.items: list[tuple[int, int]] = []  # (timestamp, severity)
+
+
+class EventStats:
+    """Time-bucketed counters over a changing set of events."""
+
+    def __init__(self, events: Iterable[EventRecord] = ()) -> None:
+        self._buckets: dict[int, _Bucket] = {}
+        self._keys: list[int] = []  # sorted bucket keys
+        self._events: dict[str, tuple[int, int, str]] = {}  # id → (ts, severity, source)
+        self.severity_counts = {level: 0 for level in range(1, 6)}
+        self.source_counts: Counter[str] = Counter()
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, event: EventRecord) -> None:
+        """Count *event*, replacing any earlier version with the same id."""
+        self.discard(event.id)
+        ts = event.ts
+        key = int(ts // _BUCKET_SECONDS)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+            bisect.insort(self._keys, key)
+        bucket.counts[event.severity] += 1
+        bucket.items.append((ts, event.severity))
+        self._events[event.id] = (ts, event.severity, event.source_id)
+        self.severity_counts[event.severity] += 1
+        self.source_counts[event.source_id] += 1
+
+    def discard(self, event_id: str) -> None:
+        """Stop counting the event with *event_id*, if present."""
+        entry = self._events.pop(event_id, None)
+        if entry is None:
+            return
+        ts, severity, source_id = entry
+        key = int(ts // _BUCKET_SECONDS)
+        bucket = self._buckets[key]
+        bucket.counts[severity] -= 1
+        bucket.items.remove((ts, severity))
+        if not bucket.items:
+            del self._buckets[key]
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        self.severity_counts[severity] -= 1
+        self.source_counts[source_id] -= 1
+        if not self.source_counts[source_id]:
+            del self.source_counts[source_id]
+
+    def apply(self, added: Iterable[EventRecord], removed: Iterable[str]) -> None:
+        """Apply one merge: count *added* events and drop *removed* ids."""
+        for event_id in removed:
+            self.discard(event_id)
+        for event in added:
+            self.add(event)
+
+    def count_since(self, cutoff: float, severity: int | None = None) -> int:
+        """Events published at or after *cutoff* (epoch seconds), optionally of one severity."""
+        first = int(cutoff // _BUCKET_SECONDS)
+        total = 0
+        for key in self._keys[bisect.bisect_left(self._keys, first) :]:
+            bucket = self._buckets[key]
+            if key == first:
+                # Only the bucket straddling the cutoff needs per-event checks.
+                total += sum(
+                    1
+                    for ts, sev in bucket.items
+                    if ts >= cutoff and (severity is None or sev == severity)
+                )
+            elif severity is None:
+                total += len(bucket.items)
+            else:
+                total += bucket.counts[severity]
+        return total
+
+    def events_per_hour(self, now: datetime | None = None) -> int:
+        now = now or clock.now()
+        return self.count_since(now.timestamp() - 3600)
+
+    def defcon(self, now: datetime | None = None) -> int:
+        """DEFCON 1-5 from the severity of recent and retained events."""
+        now_ts = (now or clock.now()).timestamp()
+        if self.count_since(now_ts - 30 * 60, severity=5):
+            return 1
+        if self.count_since(now_ts - 120 * 60, severity=5) or (
+            self.count_since(now_ts - 30 * 60, severity=4) >= 2
+        ):
+            return 2
+        if self.severity_counts[4]:
+            return 3
+        if self.severity_counts[3]:
+            return 4
+        return 5
+
+
+def calculate_defcon(events: Iterable[EventRecord]) -> int:
+    """One-off DEFCON for an event list; prefer a maintained :class:`EventStats`."""
+    return EventStats(events).defcon()
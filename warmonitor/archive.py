@@ -0,0 +1,352 @@
+"""Long-term event archive for warmonitor.
+
+The live feed keeps the newest events in memory and the cache keeps a few
+hundred on disk; :class:`Archive` keeps every fetched event, partitioned by
+UTC day of publication under the ``archive_dir`` setting (off unless set,
+e.g. to ``~/.warmonitor_archive``)::
+
+    2025-06-14.jsonl          events published that day, appended as fetched
+    2025-06-14.jsonl.gz       the same day after compaction
+    2025-06-14.rollup.json    hourly event counts per severity and per source
+
+- segments are append-only: an event whose content changed is appended
+  again and the last line for an id wins;
+- every append also updates the day's rollup (rewritten atomically), so
+  trend queries read one small file per day and no events at all;
+- time-range queries open only the segments of the days in range, newest
+  first, and stop once they have enough events;
+- :meth:`Archive.compact` rewrites older days without superseded lines and
+  gzips them, or drops their events and keeps only the rollups.
+
+Appends take an exclusive lock on the day's segment where ``fcntl`` exists
+and first read lines another writer added, so a TUI and the web backend
+fetching independently still produce consistent rollups. Normally only the
+collector writes. Within a process, appends are serialized by a thread lock:
+the fetcher runs them in worker threads.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, NamedTuple
+
+from warmonitor.records import EventRecord
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single writer is assumed
+    fcntl = None
+
+_HOUR = 3600
+_DAY = 86400
+_OPEN_DAYS = 8  # per-day writer states kept in memory
+_MAX_TS = 253_402_300_799  # 9999-12-31 23:59:59 UTC, the last representable second
+
+
+class TrendBucket(NamedTuple):
+    start: int  # bucket start, epoch seconds
+    total: int
+    severity: dict[int, int]
+    source: dict[str, int]
+
+
+def _day(ts: int) -> str:
+    ts = min(max(ts, 0), _MAX_TS)  # open-ended query ranges
+    return datetime.fromtimestamp(ts, tz=UTC).strftime("%Y-%m-%d")
+
+
+def _day_start(day: str) -> int:
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=UTC).timestamp())
+
+
+def _parse_lines(data: bytes) -> Iterator[dict]:
+    for line in data.splitlines():
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue  # a torn line from an interrupted write
+
+
+def _dump(item: dict) -> bytes:
+    """One segment line (without its newline) for an ``Event`` JSON dict."""
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class _DayState:
+    """A writer's view of one day: the counted version of each event and the rollup."""
+
+    __slots__ = ("events", "hours", "offset")
+
+    def __init__(self) -> None:
+        # event id → (hour start, severity, source id, hash of its archived line)
+        self.events: dict[str, tuple[int, int, str, int]] = {}
+        self.hours: dict[int, tuple[Counter[int], Counter[str]]] = {}
+        self.offset = 0  # bytes of the plain segment already counted
+
+    def count(self, item: dict, line_hash: int) -> bool:
+        """Count one archived line; ``False`` if it repeats the counted version."""
+        old = self.events.get(item["id"])
+        if old is not None:
+            if old[3] == line_hash:
+                return False
+            severity, source = self.hours[old[0]]
+            severity[old[1]] -= 1
+            source[old[2]] -= 1
+        ts = int(datetime.fromisoformat(item["published"]).timestamp())
+        hour = ts - ts % _HOUR
+        severity, source = self.hours.setdefault(hour, (Counter(), Counter()))
+        severity[int(item["severity"])] += 1
+        source[item["source_id"]] += 1
+        self.events[item["id"]] = (hour, int(item["severity"]), item["source_id"], line_hash)
+        return True
+
+    def rollup(self) -> dict:
+        hours = {}
+        for hour, (severity, source) in sorted(self.hours.items()):
+            severity, source = +severity, +source  # drop zero counts
+            if severity:
+                hours[str(hour)] = {
+                    "severity": {str(k): n for k, n in sorted(severity.items())},
+                    "source": dict(sorted(source.items())),
+                }
+        return {"hours": hours}
+
+
+class Archive:
+    """Day-partitioned, append-only event store with hourly rollups."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._states: OrderedDict[str, _DayState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _segment(self, day: str) -> Path:
+        return self.path / f"{day}.jsonl"
+
+    def _compacted(self, day: str) -> Path:
+        return self.path / f"{day}.jsonl.gz"
+
+    def _rollup(self, day: str) -> Path:
+        return self.path / f"{day}.rollup.json"
+
+    def days(self) -> list[str]:
+        """Days with archived events or rollups, oldest first."""
+        if not self.path.is_dir():
+            return []
+        return sorted({p.name[:10] for p in self.path.glob("????-??-??.*")})
+
+    def _days_between(self, start: int, end: int) -> list[str]:
+        first, last = _day(start), _day(max(start, end - 1))
+        return [day for day in self.days() if first <= day <= last]
+
+    # --- Writing ---
+
+    def append(self, events: Iterable[EventRecord]) -> None:
+        """Archive *events*, skipping any already archived unchanged."""
+        by_day: dict[str, list[EventRecord]] = {}
+        for event in events:
+            by_day.setdefault(_day(event.ts), []).append(event)
+        if not by_day:
+            return
+        with self._lock:
+            self._append(by_day)
+
+    def _append(self, by_day: dict[str, list[EventRecord]]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        for day, batch in sorted(by_day.items()):
+            state = self._state(day)
+            with self._locked(self._segment(day)) as segment:
+                self._catch_up(state, segment)
+                lines = []
+                for event in batch:
+                    item = event.to_dict()
+                    line = _dump(item)
+                    if state.count(item, hash(line)):
+                        lines.append(line + b"\n")
+                if not lines:
+                    continue
+                segment.seek(0, os.SEEK_END)
+                segment.write(b"".join(lines))
+                segment.flush()
+                state.offset = segment.tell()
+                self._write_rollup(day, state)
+
+    def _state(self, day: str) -> _DayState:
+        state = self._states.get(day)
+        if state is None:
+            state = self._states[day] = _DayState()
+            compacted = self._compacted(day)
+            if compacted.exists():
+                for line in gzip.decompress(compacted.read_bytes()).splitlines():
+                    with contextlib.suppress(ValueError, KeyError):
+                        state.count(json.loads(line), hash(line))
+            while len(self._states) > _OPEN_DAYS:
+                self._states.popitem(last=False)
+        self._states.move_to_end(day)
+        return state
+
+    @contextlib.contextmanager
+    def _locked(self, path: Path) -> Iterator[IO[bytes]]:
+        """*path* opened for appending, exclusively locked where supported."""
+        while True:
+            with open(path, "a+b") as segment:
+                if fcntl is not None:
+                    fcntl.flock(segment, fcntl.LOCK_EX)
+                    if not os.fstat(segment.fileno()).st_nlink:
+                        continue  # compacted away while we waited; use the new file
+                yield segment
+                return
+
+    def _catch_up(self, state: _DayState, segment: IO[bytes]) -> None:
+        """Count lines appended to *segment* since *state* last saw it."""
+        size = segment.seek(0, os.SEEK_END)
+        if size < state.offset:
+            state.offset = 0  # the segment was replaced; recount it
+        if size == state.offset:
+            return
+        segment.seek(state.offset)
+        data = segment.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            with contextlib.suppress(ValueError, KeyError):
+                state.count(json.loads(line), hash(line))
+        state.offset += len(complete)
+
+    def _write_rollup(self, day: str, state: _DayState) -> None:
+        path = self._rollup(day)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state.rollup(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # --- Reading ---
+
+    def _read_day(self, day: str) -> dict[str, dict]:
+        """The latest archived version of each event published on *day*."""
+        latest: dict[str, dict] = {}
+        compacted, segment = self._compacted(day), self._segment(day)
+        if compacted.exists():
+            for item in _parse_lines(gzip.decompress(compacted.read_bytes())):
+                latest[item["id"]] = item
+        if segment.exists():
+            for item in _parse_lines(segment.read_bytes()):
+                latest[item["id"]] = item
+        return latest
+
+    def events(
+        self,
+        start: int,
+        end: int,
+        sources: Iterable[str] = (),
+        min_severity: int = 1,
+        limit: int | None = None,
+        before: tuple[int, str] | None = None,
+    ) -> list[EventRecord]:
+        """Archived events published in ``[start, end)``, newest first.
+
+        Events are ordered by ``(ts, id)``; *before* resumes after such a key
+        for paging. Only the segments of days in the range are read, newest
+        day first, stopping once *limit* events are found.
+        """
+        if before is not None:
+            end = min(end, before[0] + 1)
+        wanted = set(sources)
+        found: list[EventRecord] = []
+        for day in reversed(self._days_between(start, end)):
+            batch = []
+            for item in self._read_day(day).values():
+                if int(item["severity"]) < min_severity:
+                    continue
+                if wanted and item["source_id"] not in wanted:
+                    continue
+                event = EventRecord.from_dict(item)
+                if start <= event.ts < end and (before is None or (event.ts, event.id) < before):
+                    batch.append(event)
+            batch.sort(key=lambda e: (e.ts, e.id), reverse=True)
+            found.extend(batch)
+            if limit is not None and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def trend(self, start: int, end: int, step: int = _HOUR) -> list[TrendBucket]:
+        """Event counts in ``[start, end)`` per *step* seconds (a multiple of an hour).
+
+        Read from the rollups only. Buckets start on multiples of *step* (UTC)
+        and come oldest first; empty ones are omitted.
+        """
+        if step <= 0 or step % _HOUR:
+            raise ValueError("step must be a positive multiple of 3600 seconds")
+        buckets: dict[int, tuple[Counter[int], Counter[str]]] = {}
+        for day in self._days_between(start, end):
+            try:
+                hours = json.loads(self._rollup(day).read_text(encoding="utf-8"))["hours"]
+            except (OSError, ValueError, KeyError):
+                continue
+            for hour, counts in hours.items():
+                hour = int(hour)
+                if not start <= hour < end:
+                    continue
+                severity, source = buckets.setdefault(hour - hour % step, (Counter(), Counter()))
+                severity.update({int(k): n for k, n in counts["severity"].items()})
+                source.update(counts["source"])
+        return [
+            TrendBucket(
+                bucket,
+                sum(severity.values()),
+                dict(sorted(severity.items())),
+                dict(source.most_common()),
+            )
+            for bucket, (severity, source) in sorted(buckets.items())
+        ]
+
+    # --- Maintenance ---
+
+    def compact(self, before: int, drop_events: bool = False) -> list[str]:
+        """Compact every day that ended before *before*; returns the days compacted.
+
+        Each day's segments are rewritten as one gzip file holding only the
+        latest version of each event, and its rollup is rebuilt from it. With
+        *drop_events* the events are deleted instead and only the rollups are
+        kept, so trends survive but event queries for those days return
+        nothing.
+        """
+        done = []
+        for day in self.days():
+            if _day_start(day) + _DAY > before:
+                break
+            segment, compacted = self._segment(day), self._compacted(day)
+            if not segment.exists() and (not compacted.exists() or not drop_events):
+                continue  # already compacted
+            with self._locked(segment):
+                latest = self._read_day(day)
+                state = _DayState()
+                lines = []
+                for item in sorted(latest.values(), key=lambda item: item["published"]):
+                    line = _dump(item)
+                    state.count(item, hash(line))
+                    lines.append(line + b"\n")
+                if drop_events:
+                    compacted.unlink(missing_ok=True)
+                else:
+                    tmp = compacted.with_name(f"{compacted.name}.{os.getpid()}.tmp")
+                    tmp.write_bytes(gzip.compress(b"".join(lines)))
+                    os.replace(tmp, compacted)
+                self._write_rollup(day, state)
+                segment.unlink()
+            self._states.pop(day, None)
+            done.append(day)
+        return done
+
+
+def open_archive(directory: str) -> Archive | None:
+    """The archive in *directory* (the ``archive_dir`` setting); ``None`` if disabled."""
+    if not directory:
+        return None
+    return Archive(Path(directory).expanduser())
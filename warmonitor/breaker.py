@@ -0,0 +1,170 @@
+"""Per-source circuit breakers and latency-aware timeouts for warmonitor.
+
+Without them a dead or tar-pitting feed costs a full ``total_timeout`` on
+every poll. :class:`SourceBreakers` remembers, per source:
+
+- a circuit breaker. After ``breaker_threshold`` consecutive failed polls
+  the circuit *opens* and :func:`~warmonitor.fetcher.fetch_source` refuses
+  to poll the source, so it holds no connection or host slot. Once
+  ``breaker_cooldown`` has passed, a single trial poll goes out
+  (*half-open*): success closes the circuit, failure reopens it with the
+  cooldown doubled, up to ``max_interval``;
+- how long its recent successful fetches took. The timeout for the next
+  fetch is ``timeout_factor`` times their p95 (between ``min_timeout`` and
+  ``total_timeout``), and with ``hedge_threshold`` set, a source whose p90
+  is under that gets a second, racing request once a fetch runs past its p90.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from warmonitor import clock as _clock
+
+if TYPE_CHECKING:
+    from warmonitor.models import Settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_WINDOW = 32  # recent fetch durations kept per source
+_MIN_SAMPLES = 5  # before timeouts adapt or requests are hedged
+
+
+def _percentile(samples: deque[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Circuit:
+    __slots__ = ("cooldown", "failures", "latencies", "opened_at", "state")
+
+    def __init__(self, cooldown: float) -> None:
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0  # clock time the circuit (re)opened or its trial began
+        self.cooldown = cooldown
+        self.latencies: deque[float] = deque(maxlen=_WINDOW)
+
+
+class SourceBreakers:
+    """Circuit state and fetch-time history for every source."""
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        cooldown: float = 300,
+        max_cooldown: float = 3600,
+        timeout_factor: float = 4.0,
+        min_timeout: float = 5.0,
+        hedge_threshold: float = 0.0,
+        clock: Callable[[], float] = _clock.monotonic,
+    ) -> None:
+        self.threshold = threshold  # 0: never open
+        self.cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+        self.timeout_factor = timeout_factor  # 0: always the default timeout
+        self.min_timeout = min_timeout
+        self.hedge_threshold = hedge_threshold  # 0: never hedge
+        self._clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> SourceBreakers:
+        return cls(
+            threshold=settings.breaker_threshold,
+            cooldown=settings.breaker_cooldown,
+            max_cooldown=settings.max_interval,
+            timeout_factor=settings.timeout_factor,
+            min_timeout=settings.min_timeout,
+            hedge_threshold=settings.hedge_threshold,
+        )
+
+    def _circuit(self, source_id: str) -> _Circuit:
+        circuit = self._circuits.get(source_id)
+        if circuit is None:
+            circuit = self._circuits[source_id] = _Circuit(self.cooldown)
+        return circuit
+
+    def state(self, source_id: str) -> str:
+        circuit = self._circuits.get(source_id)
+        return CLOSED if circuit is None else circuit.state
+
+    def forget(self, source_id: str) -> None:
+        """Drop the history of *source_id*, e.g. after its definition changed."""
+        self._circuits.pop(source_id, None)
+
+    def allow(self, source_id: str) -> bool:
+        """Whether *source_id* may be polled now; may start a half-open trial.
+
+        A trial that never reports back (its poll was cancelled) is replaced
+        by a new one after another cooldown.
+        """
+        circuit = self._circuits.get(source_id)
+        if circuit is None or circuit.state == CLOSED:
+            return True
+        now = self._clock()
+        if now < circuit.opened_at + circuit.cooldown:
+            return False
+        circuit.state = HALF_OPEN
+        circuit.opened_at = now
+        return True
+
+    def retry_in(self, source_id: str) -> float:
+        """Seconds until a refused source may be tried again (0 if not refused)."""
+        circuit = self._circuits.get(source_id)
+        if circuit is None or circuit.state == CLOSED:
+            return 0.0
+        return max(0.0, circuit.opened_at + circuit.cooldown - self._clock())
+
+    def record_success(self, source_id: str, elapsed: float) -> None:
+        """A poll got its response after *elapsed* seconds: close the circuit."""
+        circuit = self._circuit(source_id)
+        circuit.state = CLOSED
+        circuit.failures = 0
+        circuit.cooldown = self.cooldown
+        circuit.latencies.append(elapsed)
+
+    def record_failure(self, source_id: str) -> None:
+        """A poll failed: open the circuit at the threshold, or reopen a trial's."""
+        circuit = self._circuit(source_id)
+        circuit.failures += 1
+        if circuit.state == HALF_OPEN:
+            circuit.cooldown = min(circuit.cooldown * 2, self.max_cooldown)
+        elif not self.threshold or circuit.failures < self.threshold:
+            return
+        circuit.state = OPEN
+        circuit.opened_at = self._clock()
+
+    def timeout(self, source_id: str, default: float) -> float:
+        """Total timeout for the next poll of *source_id*, at most *default*.
+
+        A half-open trial gets the full *default*, so a source that has
+        merely become slower can still close its circuit.
+        """
+        circuit = self._circuits.get(source_id)
+        if (
+            not self.timeout_factor
+            or circuit is None
+            or circuit.state == HALF_OPEN
+            or len(circuit.latencies) < _MIN_SAMPLES
+        ):
+            return default
+        adaptive = self.timeout_factor * _percentile(circuit.latencies, 0.95)
+        return min(default, max(self.min_timeout, adaptive))
+
+    def hedge_delay(self, source_id: str) -> float | None:
+        """Seconds after which to send a second request, or ``None`` not to hedge."""
+        circuit = self._circuits.get(source_id)
+        if (
+            not self.hedge_threshold
+            or circuit is None
+            or circuit.state != CLOSED
+            or len(circuit.latencies) < _MIN_SAMPLES
+        ):
+            return None
+        p90 = _percentile(circuit.latencies, 0.9)
+        return p90 if p90 < self.hedge_threshold else None
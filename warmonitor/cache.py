@@ -1,39 +1,236 @@
 """Persistent event cache for warmonitor.
 
-Cache file: ``~/.warmonitor_cache.json``
-Stores up to 500 events across restarts.
+Cache file: ``~/.warmonitor_cache.db`` (SQLite)
+Stores up to ``max_events`` events (the newest) across restarts.
+
+Each save writes only events that are new or changed since the last load or
+save, inside one transaction, so a crash mid-write leaves the previous
+contents intact. Events are stored as :class:`~warmonitor.models.Event` JSON
+and decoded straight into compact :class:`~warmonitor.records.EventRecord`
+tuples on load, without Pydantic, so the cached feed can be shown before the
+model schemas are built.
+
+HTTP validators (``ETag`` / ``Last-Modified``) for each feed URL live in the
+same database so conditional requests survive restarts too, as does the
+per-source index of already-ingested entries (:mod:`warmonitor.seen`).
+
+A legacy ``~/.warmonitor_cache.json`` is imported once when the database is
+first created.
 """
 
 from __future__ import annotations
 
 import json
+import sqlite3
 import sys
 from pathlib import Path
 
-from warmonitor.models import Event
+from warmonitor.records import MAX_EVENTS, EventRecord
+from warmonitor.seen import SeenIndex
+
+_CACHE_PATH = Path.home() / ".warmonitor_cache.db"
+_LEGACY_CACHE_PATH = Path.home() / ".warmonitor_cache.json"
 
-_CACHE_PATH = Path.home() / ".warmonitor_cache.json"
-_CACHE_LIMIT = 500
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    published REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_published ON events (published);
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE TABLE IF NOT EXISTS seen (
+    source_id TEXT PRIMARY KEY,
+    recent TEXT NOT NULL,
+    bloom BLOB NOT NULL,
+    bloom_count INTEGER NOT NULL,
+    digest TEXT,
+    ttl INTEGER
+);
+"""
 
+# Events known to be on disk, by id, for the database at _written_path.
+_written: dict[str, EventRecord] = {}
+_written_path: Path | None = None
 
-def load_cache() -> list[Event]:
-    """Load cached events from disk. Returns an empty list on any error."""
-    if not _CACHE_PATH.exists():
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database, creating (and migrating into) it if needed."""
+    global _written, _written_path
+    if _written_path != _CACHE_PATH:
+        _written, _written_path = {}, _CACHE_PATH
+    is_new = not _CACHE_PATH.exists()
+    conn = sqlite3.connect(_CACHE_PATH)
+    conn.executescript(_SCHEMA)
+    if is_new and _LEGACY_CACHE_PATH.exists():
+        _import_legacy(conn)
+    return conn
+
+
+def _import_legacy(conn: sqlite3.Connection) -> None:
+    from warmonitor.models import Event
+
+    try:
+        data = json.loads(_LEGACY_CACHE_PATH.read_text(encoding="utf-8"))
+        events = [EventRecord.from_event(Event.model_validate(item)) for item in data]
+    except (OSError, ValueError, TypeError) as exc:
+        print(
+            f"warmonitor: warning: could not import {_LEGACY_CACHE_PATH}: {exc}",
+            file=sys.stderr,
+        )
+        return
+    with conn:
+        _upsert(conn, events)
+
+
+def _upsert(conn: sqlite3.Connection, events: list[EventRecord]) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO events (id, published, data) VALUES (?, ?, ?)",
+        [(e.id, e.ts, json.dumps(e.to_dict(), separators=(",", ":")).encode()) for e in events],
+    )
+
+
+def load_cache(limit: int = MAX_EVENTS) -> list[EventRecord]:
+    """Load up to *limit* cached events, newest first. Returns an empty list on any error."""
+    global _written
+    if not _CACHE_PATH.exists() and not _LEGACY_CACHE_PATH.exists():
         return []
     try:
-        raw = _CACHE_PATH.read_text(encoding="utf-8")
-        data = json.loads(raw)
-        return [Event.model_validate(item) for item in data]
-    except Exception as exc:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT data FROM events ORDER BY published DESC LIMIT ?", (limit,)
+            ).fetchall()
+        finally:
+            conn.close()
+        events = [EventRecord.from_dict(json.loads(data)) for (data,) in rows]
+        _written = {e.id: e for e in events}
+        return events
+    except (OSError, sqlite3.Error, ValueError, KeyError, TypeError) as exc:
         print(f"warmonitor: warning: could not load cache {_CACHE_PATH}: {exc}", file=sys.stderr)
         return []
 
 
-def save_cache(events: list[Event]) -> None:
-    """Save events to the cache file, trimmed to the cache limit."""
+def save_cache(events: list[EventRecord], limit: int = MAX_EVENTS) -> None:
+    """Write new or changed events of *events* (newest first), keeping the newest *limit*."""
+    global _written
     try:
-        limited = events[:_CACHE_LIMIT]
-        payload = json.dumps([e.model_dump(mode="json") for e in limited], indent=None)
-        _CACHE_PATH.write_text(payload, encoding="utf-8")
-    except Exception as exc:
+        conn = _connect()
+        try:
+            limited = events[:limit]
+            changed = [
+                e for e in limited if (old := _written.get(e.id)) is not e and old != e
+            ]
+            with conn:
+                _upsert(conn, changed)
+                conn.execute(
+                    "DELETE FROM events WHERE id NOT IN "
+                    "(SELECT id FROM events ORDER BY published DESC LIMIT ?)",
+                    (limit,),
+                )
+        finally:
+            conn.close()
+        _written.update((e.id, e) for e in changed)
+        if len(_written) > 2 * limit:
+            _written = {e.id: e for e in limited}
+    except (OSError, sqlite3.Error) as exc:
         print(f"warmonitor: warning: could not save cache {_CACHE_PATH}: {exc}", file=sys.stderr)
+
+
+def load_validators() -> dict[str, dict[str, str]]:
+    """Load per-URL HTTP validators from disk. Returns an empty dict on any error."""
+    if not _CACHE_PATH.exists():
+        return {}
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute("SELECT url, etag, last_modified FROM validators").fetchall()
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as exc:
+        print(f"warmonitor: warning: could not load validators {_CACHE_PATH}: {exc}", file=sys.stderr)
+        return {}
+    validators: dict[str, dict[str, str]] = {}
+    for url, etag, last_modified in rows:
+        entry = {"etag": etag, "last_modified": last_modified}
+        validators[url] = {k: v for k, v in entry.items() if v}
+    return validators
+
+
+def save_validators(validators: dict[str, dict[str, str]]) -> None:
+    """Replace the stored per-URL HTTP validators."""
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM validators")
+                conn.executemany(
+                    "INSERT INTO validators (url, etag, last_modified) VALUES (?, ?, ?)",
+                    [
+                        (url, entry.get("etag"), entry.get("last_modified"))
+                        for url, entry in validators.items()
+                    ],
+                )
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as exc:
+        print(f"warmonitor: warning: could not save validators {_CACHE_PATH}: {exc}", file=sys.stderr)
+
+
+def load_seen() -> SeenIndex:
+    """Load the seen-entry index from disk. Returns an empty index on any error."""
+    index = SeenIndex()
+    if not _CACHE_PATH.exists():
+        return index
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT source_id, recent, bloom, bloom_count, digest, ttl FROM seen"
+            ).fetchall()
+        finally:
+            conn.close()
+        for source_id, recent, bloom, count, digest, ttl in rows:
+            index.load(source_id, json.loads(recent), bloom, count, digest, ttl)
+    except (OSError, sqlite3.Error, ValueError, TypeError) as exc:
+        print(f"warmonitor: warning: could not load seen index {_CACHE_PATH}: {exc}", file=sys.stderr)
+        return SeenIndex()
+    return index
+
+
+def save_seen(index: SeenIndex) -> None:
+    """Write the sources whose seen entries changed since the last save."""
+    if not index.dirty:
+        return
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                current = dict(index.items())
+                for source_id in index.dirty:
+                    seen = current.get(source_id)
+                    if seen is None:
+                        conn.execute("DELETE FROM seen WHERE source_id = ?", (source_id,))
+                        continue
+                    conn.execute(
+                        "INSERT OR REPLACE INTO seen "
+                        "(source_id, recent, bloom, bloom_count, digest, ttl) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            source_id,
+                            json.dumps(list(seen.recent)),
+                            bytes(seen.bloom.bits),
+                            seen.bloom.count,
+                            seen.digest,
+                            seen.ttl,
+                        ),
+                    )
+        finally:
+            conn.close()
+        index.dirty.clear()
+    except (OSError, sqlite3.Error) as exc:
+        print(f"warmonitor: warning: could not save seen index {_CACHE_PATH}: {exc}", file=sys.stderr)
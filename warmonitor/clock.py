@@ -0,0 +1,50 @@
+"""Process-wide time source for warmonitor.
+
+Code that asks "what time is it?" for the feed (event ages, DEFCON windows,
+poll scheduling, undated entries) reads :func:`now` and :func:`monotonic`
+instead of the system clock. Normally they are the system clock; during
+``warmonitor --replay`` a :class:`ScaledClock` is installed so a recording
+runs on its original timeline, compressed by the replay speed.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime
+
+
+class ScaledClock:
+    """Wall time starting at *start* (epoch seconds), running *speed* times faster."""
+
+    def __init__(self, start: float, speed: float = 1.0) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.start = start
+        self.speed = speed
+        self._origin = time.monotonic()
+
+    def monotonic(self) -> float:
+        return (time.monotonic() - self._origin) * self.speed
+
+    def time(self) -> float:
+        return self.start + self.monotonic()
+
+
+_clock: ScaledClock | None = None
+
+
+def set_clock(clock: ScaledClock | None) -> None:
+    """Install *clock* for the whole process; ``None`` restores the system clock."""
+    global _clock
+    _clock = clock
+
+
+def monotonic() -> float:
+    return time.monotonic() if _clock is None else _clock.monotonic()
+
+
+def now() -> datetime:
+    """The current UTC time."""
+    if _clock is None:
+        return datetime.now(UTC)
+    return datetime.fromtimestamp(_clock.time(), tz=UTC)
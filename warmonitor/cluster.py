@@ -0,0 +1,214 @@
+"""Cross-source near-duplicate story clustering for warmonitor.
+
+The same incident arrives from several outlets under different URLs, so
+URL-based event ids keep every copy. :class:`StoryClusters` groups such
+near-duplicates incrementally:
+
+- each event's title and summary are reduced to a set of normalised words and
+  summarised by a MinHash signature;
+- signatures are split into bands and indexed in a locality-sensitive hash
+  table, so finding candidates for a new event is a handful of dict lookups
+  rather than a comparison against every retained event;
+- candidates are confirmed by the estimated Jaccard similarity of their
+  signatures and must have been published within a time window of each other;
+- events with only a few words are never clustered: short template headlines
+  ("strike number 12 ...") differ in too few words to tell apart;
+- near-exact copies joining a cluster are not indexed themselves (the
+  cluster is already findable), which keeps buckets small when a wire story
+  is syndicated widely.
+
+:meth:`StoryClusters.collapse` turns a list of events into one row per story,
+keeping the highest severity, the earliest timestamp and the source count.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from warmonitor.records import EventRecord
+
+_NUM_PERM = 32
+_ROWS = 2  # signature values per LSH band
+_BANDS = _NUM_PERM // _ROWS
+_MASK64 = (1 << 64) - 1
+_MAX_CANDIDATES = 256  # cap on verified candidates per lookup
+_COPY = 0.9  # similarity above which a new member adds nothing to the index
+
+_rng = random.Random(0x5EED)
+# Multiply-add permutations of 64-bit token hashes; multipliers must be odd.
+_PERMUTATIONS = tuple(
+    (_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(_NUM_PERM)
+)
+
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+        "in", "is", "it", "its", "of", "on", "or", "over", "says", "said", "than",
+        "that", "the", "their", "this", "to", "was", "were", "will", "with", "after",
+        "into", "amid",
+    }
+)
+
+
+def _words(text: str) -> set[str]:
+    """Lowercased content words, with a plural/verb ``s`` stripped."""
+    words = set()
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) < 3 or word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+def signature(text: str) -> tuple[int, ...]:
+    """MinHash signature of *text*'s words; empty if it has none."""
+    return _signature(_words(text))
+
+
+def _signature(words: set[str]) -> tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+        for word in words
+    ]
+    if not hashes:
+        return ()
+    return tuple(min((a * h + b) & _MASK64 for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / _NUM_PERM
+
+
+class StoryCluster(NamedTuple):
+    """One displayed story: a representative record plus how many reported it."""
+
+    record: EventRecord  # lead event, with the cluster's max severity and earliest ts
+    sources: int  # distinct sources in the cluster
+    size: int  # events in the cluster
+
+
+class StoryClusters:
+    """Incremental LSH index assigning each event to a story cluster."""
+
+    def __init__(
+        self,
+        events: Iterable[EventRecord] = (),
+        threshold: float = 0.6,
+        window: int = 12 * 3600,
+        min_words: int = 6,
+    ) -> None:
+        self.threshold = threshold
+        self.window = window  # max seconds between clustered events
+        self.min_words = min_words  # events with fewer content words are not clustered
+        self._sigs: dict[str, tuple[int, ...]] = {}
+        self._ts: dict[str, int] = {}
+        self._cluster_of: dict[str, str] = {}  # event id → cluster id
+        self._members: dict[str, set[str]] = {}  # cluster id → event ids
+        self._buckets: dict[tuple[int, ...], set[str]] = {}  # (band, *values) → event ids
+        self._indexed: set[str] = set()  # event ids present in _buckets
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def cluster_of(self, event_id: str) -> str:
+        return self._cluster_of[event_id]
+
+    def _bands(self, sig: tuple[int, ...]) -> Iterable[tuple[int, ...]]:
+        for band in range(_BANDS):
+            yield (band, *sig[band * _ROWS : (band + 1) * _ROWS])
+
+    def _best_match(self, sig: tuple[int, ...], ts: int) -> tuple[str | None, float]:
+        candidates: set[str] = set()
+        for key in self._bands(sig):
+            candidates.update(self._buckets.get(key, ()))
+            if len(candidates) >= _MAX_CANDIDATES:
+                break
+        best, best_score = None, self.threshold
+        for other in candidates:
+            if abs(self._ts[other] - ts) > self.window:
+                continue
+            score = similarity(sig, self._sigs[other])
+            if score >= best_score:
+                best, best_score = other, score
+        return best, best_score
+
+    def _index(self, event_id: str) -> None:
+        self._indexed.add(event_id)
+        for key in self._bands(self._sigs[event_id]):
+            self._buckets.setdefault(key, set()).add(event_id)
+
+    def _unindex(self, event_id: str) -> None:
+        self._indexed.discard(event_id)
+        for key in self._bands(self._sigs[event_id]):
+            bucket = self._buckets[key]
+            bucket.discard(event_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def add(self, event: EventRecord) -> None:
+        """Assign *event* to a cluster, replacing any earlier version."""
+        self.discard(event.id)
+        words = _words(f"{event.title} {event.summary}")
+        sig = _signature(words) if len(words) >= self.min_words else ()
+        match, score = self._best_match(sig, event.ts) if sig else (None, 0.0)
+        cluster = self._cluster_of[match] if match else event.id
+        self._cluster_of[event.id] = cluster
+        self._members.setdefault(cluster, set()).add(event.id)
+        self._sigs[event.id] = sig
+        self._ts[event.id] = event.ts
+        if sig and (match is None or score < _COPY):
+            self._index(event.id)
+
+    def discard(self, event_id: str) -> None:
+        """Forget the event with *event_id*, if present."""
+        cluster = self._cluster_of.pop(event_id, None)
+        if cluster is None:
+            return
+        members = self._members[cluster]
+        members.discard(event_id)
+        if event_id in self._indexed:
+            self._unindex(event_id)
+            # Keep the cluster findable through one of its remaining members.
+            if members and members.isdisjoint(self._indexed):
+                self._index(next(iter(members)))
+        if not members:
+            del self._members[cluster]
+        del self._sigs[event_id]
+        del self._ts[event_id]
+
+    def apply(self, added: Iterable[EventRecord], removed: Iterable[str]) -> None:
+        """Apply one merge: index *added* events and drop *removed* ids."""
+        for event_id in removed:
+            self.discard(event_id)
+        for event in added:
+            self.add(event)
+
+    def collapse(self, events: Iterable[EventRecord]) -> list[StoryCluster]:
+        """One :class:`StoryCluster` per story among *events*, in first-seen order.
+
+        Events not in the index are treated as stories of their own.
+        """
+        groups: dict[str, list[EventRecord]] = {}
+        for event in events:
+            groups.setdefault(self._cluster_of.get(event.id, event.id), []).append(event)
+        stories = []
+        for members in groups.values():
+            lead = min(members, key=lambda e: (-e.severity, e.ts))
+            if len(members) > 1:
+                lead = lead._replace(ts=min(e.ts for e in members))
+            stories.append(
+                StoryCluster(lead, len({e.source.id for e in members}), len(members))
+            )
+        return stories
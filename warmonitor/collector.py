@@ -0,0 +1,395 @@
+"""Headless collector daemon for warmonitor.
+
+``warmonitor collect`` runs one :class:`Collector` per host. It owns fetching,
+scoring and persistence (the cache database) and publishes the feed over a
+Unix socket (``collector_socket`` setting, default ``~/.warmonitor.sock``).
+The TUI and the web backend attach with :func:`attach` and become thin
+readers, so upstream polling and parsing cost the same however many viewers
+are open.
+
+The protocol is newline-delimited JSON. On connect the collector sends::
+
+    {"type": "snapshot", "events": [...], "status": {...}, "metrics": {...}}
+
+and then, as sources are polled (a delta per source, as each one answers)::
+
+    {"type": "status", "status": {...}}
+    {"type": "delta", "added": [...], "removed": [ids], "status": {...},
+     "metrics": {...}}
+
+Events are :class:`~warmonitor.models.Event` JSON; ``added`` also carries
+events whose content changed. ``metrics`` is
+:meth:`FetchMetrics.to_dict <warmonitor.metrics.FetchMetrics.to_dict>` for
+every source in a snapshot and for the sources just polled in a delta. Readers may send ``{"type": "refresh"}`` to
+poll every source now. A reader too slow to keep up is disconnected.
+
+The socket is private to the user running the collector. To share one
+collector between users, put them in a group, set ``collector_group`` to it
+and ``collector_socket`` to a path in a directory they can all reach (e.g.
+``/srv/warmonitor/collector.sock``) in every user's config; the socket is
+then group-accessible.
+
+Edits to the sources in ``~/.warmonitor.toml`` are picked up while running:
+new and changed sources are polled at once, and the events of removed
+sources go out as a delta without ``metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import sys
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from warmonitor.archive import open_archive
+from warmonitor.breaker import SourceBreakers
+from warmonitor.cache import (
+    load_cache,
+    load_seen,
+    load_validators,
+    save_cache,
+    save_seen,
+    save_validators,
+)
+from warmonitor.config import ConfigWatcher, SourceDiff
+from warmonitor.metrics import FetchMetrics
+from warmonitor.models import Settings, Source
+from warmonitor.records import EventRecord
+from warmonitor.retention import RetainedEvents
+from warmonitor.seen import SeenIndex
+
+if TYPE_CHECKING:
+    from warmonitor.fetcher import SourceBatch
+    from warmonitor.scheduler import PollScheduler
+
+_LINE_LIMIT = 16 * 2**20  # largest protocol message (a full snapshot), bytes
+_QUEUE_SIZE = 64  # messages buffered per reader before it is dropped
+
+
+def socket_path(settings: Settings) -> Path:
+    return Path(settings.collector_socket).expanduser()
+
+
+def _restrict_socket(path: Path, group: str) -> None:
+    """Let only this user, and members of *group* when set, connect to *path*."""
+    if not group:
+        os.chmod(path, 0o600)
+        return
+    import grp
+
+    try:
+        os.chown(path, -1, grp.getgrnam(group).gr_gid)
+    except (KeyError, OSError) as exc:
+        raise RuntimeError(f"cannot share {path} with group {group!r}: {exc}") from None
+    os.chmod(path, 0o660)
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def _event_json(records: list[EventRecord]) -> list[dict[str, Any]]:
+    return [e.to_dict() for e in records]
+
+
+class _Reader:
+    __slots__ = ("queue", "writer")
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(_QUEUE_SIZE)
+        self.writer = writer
+
+
+class Collector:
+    """Polls every source on its schedule and publishes the feed to readers."""
+
+    def __init__(self, sources: list[Source], settings: Settings, path: Path) -> None:
+        self.sources = sources
+        self.settings = settings
+        self.path = path
+        self.retained = RetainedEvents(settings.max_events)
+        self.source_status: dict[str, str] = {s.id: "unknown" for s in sources}
+        self.metrics = FetchMetrics()
+        self._readers: set[_Reader] = set()
+        self._refresh = asyncio.Event()
+        self._in_flight: set[str] = set()  # ids of sources being polled right now
+
+    async def run(self) -> None:
+        """Serve until cancelled, removing the socket on the way out."""
+        # The fetch stack is only needed here, not by readers importing this module.
+        from warmonitor.fetcher import (
+            HostLimiter,
+            create_client,
+            create_executor,
+            fetch_iter,
+        )
+        from warmonitor.scheduler import PollScheduler
+
+        self.retained.merge(load_cache(self.settings.max_events))
+        validators = load_validators() if self.retained else {}
+        seen = load_seen() if self.retained else SeenIndex()
+        scheduler = PollScheduler(
+            self.sources,
+            default_interval=self.settings.refresh_interval,
+            min_interval=self.settings.min_interval,
+            max_interval=self.settings.max_interval,
+        )
+        server = await self._listen()
+        client = create_client(self.settings)
+        executor = create_executor(self.settings)
+        limiter = HostLimiter(self.settings.per_host_limit)
+        archive = open_archive(self.settings.archive_dir)
+        breakers = SourceBreakers.from_settings(self.settings)
+        watcher = ConfigWatcher(self.sources)
+        fetch = functools.partial(
+            fetch_iter,
+            validators=validators,
+            client=client,
+            limiter=limiter,
+            executor=executor,
+            scheduler=scheduler,
+            settings=self.settings,
+            seen=seen,
+            metrics=self.metrics,
+            archive=archive,
+            breakers=breakers,
+        )
+        rounds: set[asyncio.Task] = set()
+        try:
+            while True:
+                diff = watcher.poll(self._in_flight)
+                if diff is not None:
+                    self._reload(watcher.sources, diff, scheduler, breakers, validators, seen)
+                due = set(scheduler.due())
+                if self._refresh.is_set():
+                    self._refresh.clear()
+                    due = {s.id for s in self.sources}
+                # Each round runs on its own, so a slow source holds up neither
+                # other due sources nor refresh requests.
+                sources = [s for s in self.sources if s.id in due and s.id not in self._in_flight]
+                if sources:
+                    task = asyncio.create_task(self._poll(sources, fetch, validators, seen))
+                    rounds.add(task)
+                    task.add_done_callback(rounds.discard)
+                try:
+                    await asyncio.wait_for(self._refresh.wait(), 1.0)
+                except TimeoutError:
+                    pass
+        finally:
+            for task in rounds:
+                task.cancel()
+            await asyncio.gather(*rounds, return_exceptions=True)
+            server.close()
+            for reader in list(self._readers):
+                reader.writer.close()
+            await client.aclose()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self.path.unlink(missing_ok=True)
+
+    async def _poll(
+        self,
+        sources: list[Source],
+        fetch: Callable[..., AsyncIterator[SourceBatch]],
+        validators: dict[str, dict[str, str]],
+        seen: SeenIndex,
+    ) -> None:
+        """Poll *sources* with *fetch*, publishing a delta per source as it answers."""
+        ids = {s.id for s in sources}
+        self._in_flight |= ids
+        try:
+            for source in sources:
+                self.source_status[source.id] = "fetching"
+            self._broadcast({"type": "status", "status": self.source_status})
+            batches = fetch(sources, self.source_status)
+            async with contextlib.aclosing(batches):
+                async for batch in batches:
+                    self._in_flight.discard(batch.source.id)
+                    added, removed = self.retained.merge(batch.events)
+                    self._broadcast(
+                        {
+                            "type": "delta",
+                            "added": _event_json(added),
+                            "removed": removed,
+                            "status": self.source_status,
+                            "metrics": self.metrics.to_dict([batch.source.id]),
+                        }
+                    )
+            save_cache(self.retained.newest(), self.settings.max_events)
+            save_validators(validators)
+            save_seen(seen)
+        finally:
+            self._in_flight -= ids
+
+    def _reload(
+        self,
+        sources: list[Source],
+        diff: SourceDiff,
+        scheduler: PollScheduler,
+        breakers: SourceBreakers,
+        validators: dict[str, dict[str, str]],
+        seen: SeenIndex,
+    ) -> None:
+        """Switch to the reloaded *sources*, touching only what *diff* names."""
+        from warmonitor.fetcher import forget_sources
+
+        previous = {s.id: s for s in self.sources}
+        self.sources = sources
+        stale = [*diff.removed, *diff.changed, *(previous[s.id] for s in diff.changed)]
+        forget_sources(stale, validators, seen)
+        for source in stale:
+            breakers.forget(source.id)
+        for source in diff.removed:
+            scheduler.remove(source.id)
+            self.source_status.pop(source.id, None)
+        for source in (*diff.added, *diff.changed):
+            scheduler.add(source)  # due now
+            self.source_status[source.id] = "unknown"
+        gone = {s.id for s in diff.removed}
+        removed = [e.id for e in self.retained.newest() if e.source_id in gone]
+        self.retained.apply([], removed)
+        self._broadcast(
+            {"type": "delta", "added": [], "removed": removed, "status": self.source_status}
+        )
+
+    async def _listen(self) -> asyncio.AbstractServer:
+        if self.path.exists():
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                self.path.unlink()  # left behind by a collector that died
+            else:
+                writer.close()
+                raise RuntimeError(f"another collector is already serving {self.path}")
+        server = await asyncio.start_unix_server(self._serve, self.path, limit=_LINE_LIMIT)
+        try:
+            _restrict_socket(self.path, self.settings.collector_group)
+        except RuntimeError:
+            server.close()
+            self.path.unlink(missing_ok=True)
+            raise
+        return server
+
+    def _broadcast(self, message: dict[str, Any]) -> None:
+        data = _encode(message)
+        for reader in list(self._readers):
+            try:
+                reader.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                self._readers.discard(reader)
+                reader.writer.transport.abort()
+
+    async def _serve(self, stream: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        reader = _Reader(writer)
+        reader.queue.put_nowait(
+            _encode(
+                {
+                    "type": "snapshot",
+                    "events": _event_json(self.retained.newest()),
+                    "status": self.source_status,
+                    "metrics": self.metrics.to_dict(),
+                }
+            )
+        )
+        self._readers.add(reader)
+        sender = asyncio.create_task(self._send(reader))
+        requests = asyncio.create_task(self._read_requests(stream))
+        try:
+            await asyncio.wait({sender, requests}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._readers.discard(reader)
+            sender.cancel()
+            requests.cancel()
+            writer.close()
+
+    async def _send(self, reader: _Reader) -> None:
+        try:
+            while True:
+                reader.writer.write(await reader.queue.get())
+                await reader.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _read_requests(self, stream: asyncio.StreamReader) -> None:
+        async for line in stream:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("type") == "refresh":
+                self._refresh.set()
+
+
+def run_collector(sources: list[Source], settings: Settings, path: Path | None = None) -> None:
+    """Entry point for ``warmonitor collect``."""
+    path = path or socket_path(settings)
+    print(f"warmonitor: collecting {len(sources)} sources on {path}", file=sys.stderr)
+    try:
+        asyncio.run(Collector(sources, settings, path).run())
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as exc:
+        print(f"warmonitor: error: {exc}", file=sys.stderr)
+        raise SystemExit(1) from None
+
+
+# --- Reader side ---
+
+
+class CollectorConnection:
+    """A reader's connection to a running collector."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    async def messages(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield decoded messages until the collector goes away.
+
+        A message that cannot be read or decoded ends the stream like a
+        disconnect. Event lists (``events`` / ``added``) arrive as :class:`EventRecord`.
+        """
+        try:
+            async for line in self._reader:
+                message = json.loads(line)
+                for key in ("events", "added"):
+                    if key in message:
+                        message[key] = [EventRecord.from_dict(e) for e in message[key]]
+                yield message
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ValueError,  # a line over _LINE_LIMIT, or one that is not JSON
+        ):
+            return
+
+    async def request_refresh(self) -> None:
+        try:
+            self._writer.write(_encode({"type": "refresh"}))
+            await self._writer.drain()
+        except ConnectionError:
+            pass
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def attach(path: Path) -> CollectorConnection | None:
+    """Connect to the collector at *path*; ``None`` if none is running."""
+    if not hasattr(asyncio, "open_unix_connection") or not path.exists():
+        return None
+    try:
+        reader, writer = await asyncio.open_unix_connection(path, limit=_LINE_LIMIT)
+    except OSError:
+        return None
+    return CollectorConnection(reader, writer)
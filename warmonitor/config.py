@@ -1,24 +1,51 @@
 """Configurable sources loader for warmonitor.
 
 Loads user-defined sources from ``~/.warmonitor.toml`` and merges them with
-(or replaces) the built-in ``SOURCES`` list.
+(or replaces) the built-in ``SOURCES`` list. Top-level keys other than
+``replace_defaults`` and ``sources`` are read as :class:`Settings`.
+
+:func:`load_config` reuses the validated result kept in
+``~/.warmonitor_config.cache`` while neither the config file nor the
+built-in defaults have changed, so a restart skips TOML parsing and
+validation. The cache is written by :func:`save_config_cache` once the
+dashboard is up, never at import.
+
+:class:`ConfigWatcher` notices edits to the config file while warmonitor is
+running, and :func:`diff_sources` tells the caller which sources were added,
+removed or changed, so only those need to be rebuilt.
 """
 
 from __future__ import annotations
 
+import json
+import os
 import sys
+from collections.abc import Collection
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
-from warmonitor.models import Source
-from warmonitor.sources import SOURCES as DEFAULT_SOURCES
+if TYPE_CHECKING:
+    from warmonitor.models import Settings, Source
 
 _CONFIG_PATH = Path.home() / ".warmonitor.toml"
+_CONFIG_CACHE_PATH = Path.home() / ".warmonitor_config.cache"
+# Modules defining the built-in defaults; editing them invalidates the cache.
+_DEFAULTS_PATHS = (Path(__file__).with_name("sources.py"), Path(__file__).with_name("models.py"))
 
+_warnings = 0  # warnings printed so far; a config that caused any is not cached
+_pending_cache: dict | None = None  # validated by load_config, not yet saved
 
-def load_sources() -> list[Source]:
-    """Return the active source list, merging config file if present."""
+
+def _warn(message: str) -> None:
+    global _warnings
+    _warnings += 1
+    print(f"warmonitor: warning: {message}", file=sys.stderr)
+
+
+def _read_config() -> dict | None:
+    """Parse the config file. Returns ``None`` if it is missing or unreadable."""
     if not _CONFIG_PATH.exists():
-        return list(DEFAULT_SOURCES)
+        return None
 
     try:
         if sys.version_info >= (3, 11):
@@ -27,9 +54,38 @@ def load_sources() -> list[Source]:
             import tomli as tomllib  # type: ignore[no-redef]
 
         with open(_CONFIG_PATH, "rb") as fh:
-            config = tomllib.load(fh)
-    except Exception as exc:
-        print(f"warmonitor: warning: could not load {_CONFIG_PATH}: {exc}", file=sys.stderr)
+            return tomllib.load(fh)
+    except (ImportError, OSError, ValueError) as exc:  # TOMLDecodeError is a ValueError
+        _warn(f"could not load {_CONFIG_PATH}: {exc}")
+        return None
+
+
+def load_settings() -> Settings:
+    """Return the active settings, falling back to defaults on any error."""
+    from warmonitor.models import Settings
+
+    config = _read_config()
+    if config is None:
+        return Settings()
+
+    known = {k: v for k, v in config.items() if k in Settings.model_fields}
+    try:
+        return Settings(**known)
+    except ValueError as exc:  # pydantic's ValidationError
+        _warn(f"invalid settings in {_CONFIG_PATH}: {exc}")
+        return Settings()
+
+
+def load_sources() -> list[Source]:
+    """Return the active source list, merging config file if present."""
+    return _sources_from(_read_config())
+
+
+def _sources_from(config: dict | None) -> list[Source]:
+    from warmonitor.models import Source
+    from warmonitor.sources import SOURCES as DEFAULT_SOURCES
+
+    if config is None:
         return list(DEFAULT_SOURCES)
 
     replace_defaults = config.get("replace_defaults", False)
@@ -39,8 +95,8 @@ def load_sources() -> list[Source]:
     for raw in raw_sources:
         try:
             custom.append(Source(**raw))
-        except Exception as exc:
-            print(f"warmonitor: warning: skipping invalid source {raw!r}: {exc}", file=sys.stderr)
+        except (TypeError, ValueError) as exc:
+            _warn(f"skipping invalid source {raw!r}: {exc}")
 
     if replace_defaults:
         return custom if custom else list(DEFAULT_SOURCES)
@@ -49,3 +105,131 @@ def load_sources() -> list[Source]:
     custom_ids = {s.id for s in custom}
     merged = custom + [s for s in DEFAULT_SOURCES if s.id not in custom_ids]
     return merged
+
+
+def _config_stamp() -> list:
+    """Identify the inputs of the active config: the config file and the defaults."""
+    stamp: list = []
+    for path in (_CONFIG_PATH, *_DEFAULTS_PATHS):
+        try:
+            st = path.stat()
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append([str(path), st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+def load_config() -> tuple[list[Source], Settings]:
+    """Return ``(load_sources(), load_settings())``, from the cache when unchanged.
+
+    Nothing is written here, as this runs when :mod:`warmonitor.main` is
+    imported; :func:`save_config_cache` stores a freshly validated config.
+    """
+    global _pending_cache
+    from warmonitor.models import Settings, Source
+
+    stamp = _config_stamp()
+    try:
+        cached = json.loads(_CONFIG_CACHE_PATH.read_text(encoding="utf-8"))
+        if cached["stamp"] == stamp:
+            return (
+                [Source.model_construct(**raw) for raw in cached["sources"]],
+                Settings.model_construct(**cached["settings"]),
+            )
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    warnings = _warnings
+    sources, settings = load_sources(), load_settings()
+    if _warnings == warnings:  # cache only a config that loaded cleanly
+        _pending_cache = {
+            "stamp": stamp,
+            "sources": [s.model_dump() for s in sources],
+            "settings": settings.model_dump(),
+        }
+    return sources, settings
+
+
+def save_config_cache() -> None:
+    """Write the config validated by the last :func:`load_config`, if any."""
+    global _pending_cache
+    data, _pending_cache = _pending_cache, None
+    if data is None:
+        return
+    tmp = _CONFIG_CACHE_PATH.with_name(f"{_CONFIG_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, _CONFIG_CACHE_PATH)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+class SourceDiff(NamedTuple):
+    """How a reloaded source list differs from the running one."""
+
+    added: list[Source]
+    removed: list[Source]
+    changed: list[Source]  # same id, new definition
+
+
+def diff_sources(old: list[Source], new: list[Source]) -> SourceDiff:
+    """Compare two source lists by id. Order-only changes are not reported."""
+    before = {s.id: s for s in old}
+    after = {s.id for s in new}
+    return SourceDiff(
+        added=[s for s in new if s.id not in before],
+        removed=[s for s in old if s.id not in after],
+        changed=[s for s in new if s.id in before and before[s.id] != s],
+    )
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigWatcher:
+    """Reloads the source list when the config file changes on disk.
+
+    The file's modification stamp is polled, which is cheap enough to do
+    every second and needs no platform-specific notification API. Settings
+    are not reloaded: they size pools and timeouts that are built once.
+    """
+
+    def __init__(self, sources: list[Source]) -> None:
+        self.sources = list(sources)  # as last reported by poll()
+        self._stamp = _file_stamp(_CONFIG_PATH)
+        self._target: list[Source] | None = None  # loaded, not yet fully reported
+
+    def poll(self, busy: Collection[str] = ()) -> SourceDiff | None:
+        """Reload if the file changed; ``None`` if nothing is left to report.
+
+        A file that exists but does not parse (say, saved halfway) keeps the
+        running sources; the next save is picked up as usual. Removed and
+        changed sources whose ids are in *busy* (being fetched) keep their
+        old definition for now and are reported by a later poll, so results
+        for the old definition never land after the switch.
+        """
+        stamp = _file_stamp(_CONFIG_PATH)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            config = _read_config()
+            if config is not None or stamp is None:
+                self._target = _sources_from(config)
+        if self._target is None:
+            return None
+        before = {s.id: s for s in self.sources}
+        wanted = {s.id for s in self._target}
+        sources = [before.get(s.id, s) if s.id in busy else s for s in self._target]
+        sources += [s for s in self.sources if s.id in busy and s.id not in wanted]
+        if sources == self._target:
+            self._target = None
+        if sources == self.sources:
+            return None
+        diff = diff_sources(self.sources, sources)
+        self.sources = sources
+        return diff
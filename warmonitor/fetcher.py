@@ -1,108 +1,703 @@
 """Async RSS feed fetcher for warmonitor."""
 
 import asyncio
+import contextlib
+import functools
 import hashlib
-from datetime import datetime, timezone
+import heapq
+import importlib.util
+import multiprocessing
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import ClassVar, NamedTuple
 
 import feedparser
 import httpx
 
-from warmonitor.models import Event, Source
+from warmonitor import clock
+from warmonitor.archive import Archive
+from warmonitor.breaker import HALF_OPEN, OPEN, SourceBreakers
+from warmonitor.keywords import KeywordMatcher
+from warmonitor.metrics import FetchMetrics
+from warmonitor.models import Settings, Source
+from warmonitor.records import (
+    EventRecord,
+    compact_summary,
+    intern_keywords,
+    reintern,
+    source_ref,
+)
+from warmonitor.scheduler import PollScheduler
+from warmonitor.seen import SeenIndex, SourceSeen, body_digest, canonical_url
 
-MAX_EVENTS = 200
+USER_AGENT = "warmonitor/0.1 (conflict-monitor)"
 
+
+def _accept_encoding() -> str:
+    """Content codings httpx can decode here; brotli needs an optional package."""
+    encodings = ["gzip", "deflate"]
+    if any(importlib.util.find_spec(name) for name in ("brotli", "brotlicffi")):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+# A trailing "*" only matters for whole-word sources: it lets the stem match
+# inflected forms ("strikes", "attacked").
 SEVERITY_KEYWORDS: list[tuple[int, list[str]]] = [
-    (5, ["strike", "attack", "nuclear", "war", "explosion", "killed", "casualties"]),
-    (4, ["missile", "drone", "retaliation", "military", "troops"]),
-    (3, ["sanctions", "diplomacy", "threat", "warning"]),
-    (2, ["talks", "negotiations", "meeting"]),
+    (5, ["strike*", "attack*", "nuclear", "war", "explosion*", "killed", "casualties"]),
+    (4, ["missile*", "drone*", "retaliation", "military", "troops"]),
+    (3, ["sanctions", "diplomacy", "threat*", "warning*"]),
+    (2, ["talks", "negotiations", "meeting*"]),
 ]
 
 
-def _calculate_severity(text: str) -> int:
-    lower = text.lower()
-    for severity, keywords in SEVERITY_KEYWORDS:
-        if any(kw.lower() in lower for kw in keywords):
-            return severity
-    return 1
+@functools.lru_cache(maxsize=256)
+def _compile_matcher(keywords: tuple[str, ...], whole_words: bool = False) -> KeywordMatcher:
+    """Matcher for a source's keywords combined with ``SEVERITY_KEYWORDS``."""
+    return KeywordMatcher(keywords, SEVERITY_KEYWORDS, whole_words=whole_words)
+
+
+def _calculate_severity(text: str, whole_words: bool = False) -> int:
+    _, severity = _compile_matcher((), whole_words).scan(text)
+    return max(severity, 1)
 
 
-def _match_keywords(text: str, keywords: list[str]) -> list[str]:
-    lower = text.lower()
-    return [kw for kw in keywords if kw.lower() in lower]
+def _match_keywords(text: str, keywords: list[str], whole_words: bool = False) -> list[str]:
+    matched, _ = _compile_matcher(tuple(keywords), whole_words).scan(text)
+    return matched
 
 
 def _parse_published(entry: feedparser.FeedParserDict) -> datetime:
     if hasattr(entry, "published_parsed") and entry.published_parsed:
-        return datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+        return datetime(*entry.published_parsed[:6], tzinfo=UTC)
     if hasattr(entry, "updated_parsed") and entry.updated_parsed:
-        return datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-    return datetime.now(timezone.utc)
+        return datetime(*entry.updated_parsed[:6], tzinfo=UTC)
+    return clock.now()
 
 
 def _make_event_id(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
+class ParsedFeed(NamedTuple):
+    events: list[EventRecord]
+    ttl: int | None  # the feed's <ttl>, in minutes
+    keys: list[str]  # canonical URLs of entries not seen before
+    entries: int = 0  # entries in the feed, seen or not
+    parse_time: float = 0.0  # seconds in feedparser
+    match_time: float = 0.0  # seconds matching, scoring and building events
+
+
+def _parse_ttl(feed: feedparser.FeedParserDict) -> int | None:
+    try:
+        return int(feed.feed.get("ttl", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_feed(content: bytes, source: Source, seen: SourceSeen | None = None) -> ParsedFeed:
+    """Parse a raw feed body and extract keyword-matching events.
+
+    Entries whose canonical URL is in *seen* were ingested on an earlier poll
+    and are skipped before any matching or validation.
+
+    Kept at module level and free of shared state so it can run in a thread
+    or process pool.
+    """
+    start = time.perf_counter()
+    feed = feedparser.parse(content)
+    parsed_at = time.perf_counter()
+    matcher = _compile_matcher(tuple(source.keywords), source.whole_words)
+    ref = source_ref(source.id, source.name, source.credibility)
+    events: list[EventRecord] = []
+    keys: list[str] = []
+    for entry in feed.entries:
+        url = getattr(entry, "link", "") or ""
+        if not url:
+            continue
+        key = canonical_url(url)
+        if seen is not None and key in seen:
+            continue
+        keys.append(key)
+        title = getattr(entry, "title", "") or ""
+        summary = getattr(entry, "summary", "") or ""
+        matched, severity = matcher.scan(f"{title} {summary}")
+        if not matched:
+            continue
+        events.append(
+            EventRecord(
+                id=_make_event_id(url),
+                title=title,
+                summary=compact_summary(summary),
+                url=url,
+                ts=int(_parse_published(entry).timestamp()),
+                source=ref,
+                keywords=intern_keywords(matched),
+                severity=max(severity, 1),
+            )
+        )
+    return ParsedFeed(
+        events,
+        _parse_ttl(feed),
+        keys,
+        len(feed.entries),
+        parsed_at - start,
+        time.perf_counter() - parsed_at,
+    )
+
+
+def create_client(
+    settings: Settings | None = None,
+    wrap: Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport] | None = None,
+) -> httpx.AsyncClient:
+    """Build a long-lived client with pooled keep-alive connections.
+
+    The caller owns the client and must ``aclose()`` it. HTTP/2 is used only
+    when enabled in *settings* and the optional ``h2`` package is installed.
+    Connect and read timeouts come from *settings*; the overall per-download
+    limit is enforced by :func:`fetch_source`. *wrap*, when given, wraps the
+    pooled transport (see :mod:`warmonitor.replay`).
+    """
+    settings = settings or Settings()
+    http2 = settings.http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print(
+                "warmonitor: warning: http2 requires the 'h2' package; using HTTP/1.1",
+                file=sys.stderr,
+            )
+            http2 = False
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    transport = None
+    if wrap is not None:
+        transport = wrap(httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+        timeout=httpx.Timeout(
+            settings.read_timeout,
+            connect=settings.connect_timeout,
+            pool=settings.connect_timeout,
+        ),
+        limits=limits,
+        http2=http2,
+        transport=transport,
+    )
+
+
+def create_executor(settings: Settings | None = None) -> Executor | None:
+    """Build the pool that feed parsing runs in, per ``parse_executor``.
+
+    Returns ``None`` for ``"inline"``, meaning parse on the event loop. The
+    caller owns the pool and must shut it down.
+    """
+    settings = settings or Settings()
+    if settings.parse_executor == "process":
+        # "spawn" avoids forking a process that already runs threads.
+        return ProcessPoolExecutor(
+            max_workers=settings.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    if settings.parse_executor == "thread":
+        return ThreadPoolExecutor(
+            max_workers=settings.parse_workers,
+            thread_name_prefix="warmonitor-parse",
+        )
+    return None
+
+
+class HostLimiter:
+    """Caps the number of concurrent requests to any single feed host."""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = max(1, limit)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._limit)
+        return semaphore
+
+
+def _conditional_headers(validators: dict[str, dict[str, str]] | None, url: str) -> dict[str, str]:
+    """Build ``If-None-Match`` / ``If-Modified-Since`` headers for *url*."""
+    if validators is None:
+        return {}
+    cached = validators.get(url, {})
+    headers: dict[str, str] = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def _remember_validators(
+    validators: dict[str, dict[str, str]] | None,
+    url: str,
+    response: httpx.Response,
+) -> None:
+    """Store the response's ``ETag`` / ``Last-Modified`` for the next request."""
+    if validators is None:
+        return
+    entry: dict[str, str] = {}
+    if etag := response.headers.get("etag"):
+        entry["etag"] = etag
+    if last_modified := response.headers.get("last-modified"):
+        entry["last_modified"] = last_modified
+    if entry:
+        validators[url] = entry
+    else:
+        validators.pop(url, None)
+
+
+def forget_sources(
+    sources: Iterable[Source],
+    validators: dict[str, dict[str, str]],
+    seen: SeenIndex,
+) -> None:
+    """Drop the validators and seen entries of *sources* (old or new definitions).
+
+    Their next fetch then downloads and matches the whole feed again, which
+    is what a source whose URL or keywords were edited needs.
+    """
+    for source in sources:
+        validators.pop(source.url, None)
+        seen.forget(source.id)
+
+
+class FeedTooLarge(Exception):
+    """A feed body exceeded its download cap."""
+
+
+async def _read_capped(response: httpx.Response, max_bytes: int) -> bytes:
+    """Read a streamed body, aborting as soon as it exceeds *max_bytes*.
+
+    ``Content-Length`` is checked first so oversized feeds are refused before
+    any of the body is read; the running total then caps the decoded size,
+    which also guards against compression bombs.
+    """
+    declared = response.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise FeedTooLarge(f"{response.url}: Content-Length {declared} exceeds {max_bytes}")
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > max_bytes:
+            raise FeedTooLarge(f"{response.url}: body exceeds {max_bytes} bytes")
+    return bytes(body)
+
+
+class _Trace:
+    """httpcore trace hook timing connection setup, filling ``connect`` / ``tls``."""
+
+    _PHASES: ClassVar[dict[str, str]] = {
+        "connect_tcp": "connect",
+        "connect_unix_socket": "connect",
+        "start_tls": "tls",
+    }
+
+    def __init__(self, phases: dict[str, float]) -> None:
+        self.phases = phases
+        self.sent: float | None = None  # when the last request's headers went out
+        self._started: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict) -> None:
+        step, _, stage = name.rpartition(".")
+        step = step.rpartition(".")[2]
+        now = time.perf_counter()
+        if stage == "started":
+            self._started[step] = now
+            if step == "send_request_headers":
+                self.sent = now
+        elif stage in ("complete", "failed") and step in self._PHASES and step in self._started:
+            phase = self._PHASES[step]
+            self.phases[phase] = self.phases.get(phase, 0.0) + now - self._started.pop(step)
+
+
+async def _download(
+    client: httpx.AsyncClient,
+    source: Source,
+    validators: dict[str, dict[str, str]] | None,
+    settings: Settings,
+    phases: dict[str, float] | None = None,
+    timeout: float | None = None,
+) -> tuple[httpx.Response, bytes]:
+    """Stream *source*'s feed within the total timeout and size cap.
+
+    Returns the (closed) response and its body; the body is empty for
+    ``304 Not Modified``. HTTP errors are raised. Connection setup, time to
+    first byte and download time are added to *phases* when given.
+    *timeout* overrides the ``total_timeout`` setting.
+    """
+    max_bytes = source.max_bytes or settings.max_feed_bytes
+    trace = _Trace(phases) if phases is not None else None
+    start = time.perf_counter()
+    async with asyncio.timeout(timeout or settings.total_timeout):
+        async with client.stream(
+            "GET",
+            source.url,
+            headers=_conditional_headers(validators, source.url),
+            follow_redirects=True,
+            extensions={"trace": trace} if trace is not None else None,
+        ) as response:
+            headers_at = time.perf_counter()
+            if phases is not None:
+                # Transports that do not trace (e.g. mocks) count setup as ttfb.
+                phases["ttfb"] = headers_at - (trace.sent or start)
+            if response.status_code == 304:
+                return response, b""
+            response.raise_for_status()
+            body = await _read_capped(response, max_bytes)
+            if phases is not None:
+                phases["download"] = time.perf_counter() - headers_at
+            return response, body
+
+
+async def _hedged(
+    download: Callable[[dict[str, float]], Awaitable[tuple[httpx.Response, bytes]]],
+    phases: dict[str, float],
+    delay: float | None,
+    slot: asyncio.Semaphore | None = None,
+) -> tuple[httpx.Response, bytes]:
+    """Run *download*; past *delay* seconds, race a second one against it.
+
+    The first to succeed wins and the other is cancelled; the error of the
+    last to fail is raised if both do. The winner's timings go into *phases*.
+    The second request holds a *slot* of its own (the host's limiter), and
+    is not sent when none is free.
+    """
+    if delay is None:
+        return await download(phases)
+    attempts: dict[asyncio.Task, dict[str, float]] = {}
+
+    async def in_slot(attempt_phases: dict[str, float]) -> tuple[httpx.Response, bytes]:
+        async with slot if slot is not None else contextlib.nullcontext():
+            return await download(attempt_phases)
+
+    def launch(run: Callable[[dict[str, float]], Awaitable[tuple[httpx.Response, bytes]]]) -> None:
+        attempt_phases: dict[str, float] = {}
+        attempts[asyncio.ensure_future(run(attempt_phases))] = attempt_phases
+
+    launch(download)
+    done, _ = await asyncio.wait(attempts, timeout=delay)
+    if not done and (slot is None or not slot.locked()):
+        launch(in_slot)
+    pending = set(attempts)
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            won = [task for task in done if task.exception() is None]
+            if won or not pending:
+                winner = won[0] if won else done.pop()
+                phases.update(attempts[winner])
+                return winner.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _error_class(exc: Exception) -> str:
+    """Short label for a failed poll: ``http_<status>`` or the exception's class."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    return type(exc).__name__
+
+
 async def fetch_source(
     client: httpx.AsyncClient,
     source: Source,
     source_status: dict[str, str],
-) -> list[Event]:
+    validators: dict[str, dict[str, str]] | None = None,
+    limiter: HostLimiter | None = None,
+    executor: Executor | None = None,
+    scheduler: PollScheduler | None = None,
+    settings: Settings | None = None,
+    seen: SeenIndex | None = None,
+    metrics: FetchMetrics | None = None,
+    breakers: SourceBreakers | None = None,
+) -> list[EventRecord]:
+    """Fetch and parse one source.
+
+    When *validators* is given, the stored ``ETag`` / ``Last-Modified`` for the
+    source URL are sent as conditional headers; a ``304 Not Modified`` reply
+    counts as a successful fetch with no new entries and skips parsing.
+    *limiter* bounds how many requests run against the source's host at once.
+    The body is streamed and abandoned once it passes ``Source.max_bytes``
+    (or the ``max_feed_bytes`` setting) or the ``total_timeout`` setting.
+    Parsing runs in *executor* when given, keeping large feeds off the loop.
+    Entries already recorded in *seen* are skipped (a byte-identical body is
+    not parsed at all), and new ones are recorded once parsed, so like
+    *validators* it needs the caller to keep old events.
+    The outcome and the server's caching hints are reported to *scheduler*,
+    and per-phase timings, sizes and errors to *metrics*.
+    With *breakers*, a source whose circuit is open is not polled at all
+    (its status becomes ``"open"``; a trial poll shows ``"half_open"``, and
+    a failure that opens the circuit leaves ``"open"`` rather than
+    ``"error"``), the timeout follows the source's recent fetch times, and
+    usually-fast sources may get a hedged second request.
+    A feed that downloads but fails to parse is an error that does not count
+    against the circuit.
+    """
+    settings = settings or Settings()
+    if breakers is not None and not breakers.allow(source.id):
+        source_status[source.id] = OPEN
+        if scheduler is not None:
+            scheduler.defer(source.id, breakers.retry_in(source.id))
+        if metrics is not None:
+            metrics.record(source.id, "open", {})
+        return []
     source_status[source.id] = "fetching"
+    timeout, hedge = settings.total_timeout, None
+    if breakers is not None:
+        if breakers.state(source.id) == HALF_OPEN:
+            source_status[source.id] = HALF_OPEN
+        timeout = breakers.timeout(source.id, timeout)
+        hedge = breakers.hedge_delay(source.id)
+    phases: dict[str, float] = {}
+    content = b""
+    downloaded = False  # only transport and HTTP errors count against the circuit
     try:
-        response = await client.get(source.url, timeout=20.0, follow_redirects=True)
-        response.raise_for_status()
-        feed = feedparser.parse(response.text)
-        events: list[Event] = []
-        for entry in feed.entries:
-            title = getattr(entry, "title", "") or ""
-            summary = getattr(entry, "summary", "") or ""
-            url = getattr(entry, "link", "") or ""
-            if not url:
-                continue
-            combined = f"{title} {summary}"
-            matched = _match_keywords(combined, source.keywords)
-            if not matched:
-                continue
-            events.append(
-                Event(
-                    id=_make_event_id(url),
-                    title=title,
-                    summary=summary,
-                    url=url,
-                    published=_parse_published(entry),
-                    source_id=source.id,
-                    source_name=source.name,
-                    credibility=source.credibility,
-                    keywords_matched=matched,
-                    severity=_calculate_severity(combined),
-                )
+        queued = time.perf_counter()
+        slot = limiter(source.url) if limiter else None
+        async with slot if slot is not None else contextlib.nullcontext():
+            started = time.perf_counter()
+            phases["queue"] = started - queued
+            response, content = await _hedged(
+                lambda p: _download(client, source, validators, settings, p, timeout),
+                phases,
+                hedge,
+                slot,
+            )
+            elapsed = time.perf_counter() - started
+        downloaded = True
+        if breakers is not None:
+            breakers.record_success(source.id, elapsed)
+        if response.status_code == 304:
+            source_status[source.id] = "ok"
+            if scheduler is not None:
+                scheduler.record_success(source.id, response.headers)
+            if metrics is not None:
+                metrics.record(source.id, "not_modified", phases)
+            return []
+        source_seen = seen.view(source.id) if seen is not None else None
+        digest = body_digest(content) if source_seen is not None else None
+        outcome = "ok"
+        if source_seen is not None and digest == source_seen.digest:
+            # Byte-identical to the last parse: nothing new, skip parsing.
+            parsed = ParsedFeed([], source_seen.ttl, [])
+            outcome = "unchanged"
+        elif executor is None:
+            parsed = _parse_feed(content, source, source_seen)
+        else:
+            loop = asyncio.get_running_loop()
+            parsed = await loop.run_in_executor(
+                executor, _parse_feed, content, source, source_seen
             )
+            if isinstance(executor, ProcessPoolExecutor):
+                # Unpickled records carry private copies; share the parent's.
+                parsed = parsed._replace(events=[reintern(e) for e in parsed.events])
+        if seen is not None:
+            seen.add(source.id, parsed.keys, digest, parsed.ttl)
+        _remember_validators(validators, source.url, response)
         source_status[source.id] = "ok"
-        return events
-    except Exception:
+        if scheduler is not None:
+            scheduler.record_success(
+                source.id,
+                response.headers,
+                ttl=parsed.ttl,
+                max_severity=max((e.severity for e in parsed.events), default=0),
+            )
+        if metrics is not None:
+            if outcome == "ok":
+                phases["parse"] = parsed.parse_time
+                phases["match"] = parsed.match_time
+            metrics.record(
+                source.id,
+                outcome,
+                phases,
+                size=len(content),
+                entries=parsed.entries,
+                new=len(parsed.keys),
+                matched=len(parsed.events),
+            )
+        return parsed.events
+    except Exception as exc:
         source_status[source.id] = "error"
+        if breakers is not None and not downloaded:
+            breakers.record_failure(source.id)
+            if breakers.state(source.id) == OPEN:
+                source_status[source.id] = OPEN
+        if scheduler is not None:
+            failed = getattr(exc, "response", None)
+            scheduler.record_error(source.id, failed.headers if failed is not None else None)
+        if metrics is not None:
+            metrics.record(source.id, "error", phases, size=len(content), error=_error_class(exc))
         return []
 
 
 async def fetch_all(
     sources: list[Source],
     source_status: dict[str, str],
-) -> list[Event]:
-    async with httpx.AsyncClient(
-        headers={"User-Agent": "warmonitor/0.1 (conflict-monitor)"}
-    ) as client:
+    validators: dict[str, dict[str, str]] | None = None,
+    client: httpx.AsyncClient | None = None,
+    limiter: HostLimiter | None = None,
+    executor: Executor | None = None,
+    scheduler: PollScheduler | None = None,
+    settings: Settings | None = None,
+    seen: SeenIndex | None = None,
+    metrics: FetchMetrics | None = None,
+    archive: Archive | None = None,
+    breakers: SourceBreakers | None = None,
+) -> list[EventRecord]:
+    """Fetch every source concurrently and return deduplicated, newest-first events.
+
+    *validators* is passed through to :func:`fetch_source`; callers that use it
+    must keep previously fetched events, since unchanged feeds return nothing.
+    Pass a long-lived *client* from :func:`create_client` to reuse pooled
+    connections across refreshes; otherwise a throwaway client is used.
+    With an *executor* from :func:`create_executor`, feeds parse in parallel.
+    *settings* supplies download caps and timeouts. *seen*, like
+    *validators*, skips entries ingested on earlier calls. Each poll is
+    recorded in *metrics* when given, and sources are guarded by *breakers*
+    (see :func:`fetch_source`). At most ``max_events`` (from *settings*)
+    are returned; every fetched event is appended to *archive*.
+    """
+    settings = settings or Settings()
+    owned = client is None
+    if client is None:
+        client = create_client(settings)
+    try:
         results = await asyncio.gather(
-            *[fetch_source(client, source, source_status) for source in sources],
+            *[
+                fetch_source(
+                    client,
+                    source,
+                    source_status,
+                    validators,
+                    limiter,
+                    executor,
+                    scheduler,
+                    settings,
+                    seen,
+                    metrics,
+                    breakers,
+                )
+                for source in sources
+            ],
             return_exceptions=False,
         )
-    all_events: list[Event] = []
-    seen: set[str] = set()
+    finally:
+        if owned:
+            await client.aclose()
+    all_events: list[EventRecord] = []
+    emitted_ids: set[str] = set()
     for batch in results:
         for event in batch:
-            if event.id not in seen:
-                seen.add(event.id)
+            if event.id not in emitted_ids:
+                emitted_ids.add(event.id)
                 all_events.append(event)
-    all_events.sort(key=lambda e: e.published, reverse=True)
-    return all_events[:MAX_EVENTS]
+    await _archive_events(archive, all_events)
+    # Same order as a stable newest-first sort, in O(n log K).
+    return heapq.nlargest(settings.max_events, all_events, key=lambda e: e.ts)
+
+
+class SourceBatch(NamedTuple):
+    """One source's events from a :func:`fetch_iter` round."""
+
+    source: Source
+    events: list[EventRecord]  # newest first
+
+
+async def fetch_iter(
+    sources: list[Source],
+    source_status: dict[str, str],
+    validators: dict[str, dict[str, str]] | None = None,
+    client: httpx.AsyncClient | None = None,
+    limiter: HostLimiter | None = None,
+    executor: Executor | None = None,
+    scheduler: PollScheduler | None = None,
+    settings: Settings | None = None,
+    seen: SeenIndex | None = None,
+    metrics: FetchMetrics | None = None,
+    archive: Archive | None = None,
+    breakers: SourceBreakers | None = None,
+) -> AsyncIterator[SourceBatch]:
+    """Fetch every source concurrently, yielding each one's batch as it completes.
+
+    Takes the same arguments as :func:`fetch_all`, but the first results
+    arrive as soon as the fastest source answers rather than the slowest.
+    *source_status* for a batch's source is final when it is yielded; a
+    source with nothing new still yields an empty batch. An event already
+    yielded this round (another source linking the same URL) is not yielded
+    again. Closing the iterator early (``contextlib.aclosing``) cancels the
+    fetches still running.
+    """
+    settings = settings or Settings()
+    owned = client is None
+    if client is None:
+        client = create_client(settings)
+    tasks = {
+        asyncio.ensure_future(
+            fetch_source(
+                client,
+                source,
+                source_status,
+                validators,
+                limiter,
+                executor,
+                scheduler,
+                settings,
+                seen,
+                metrics,
+                breakers,
+            )
+        ): source
+        for source in sources
+    }
+    pending = set(tasks)
+    yielded: set[str] = set()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task, source in tasks.items():
+                if task not in done:
+                    continue
+                events: list[EventRecord] = []
+                for event in task.result():
+                    if event.id in yielded:
+                        continue
+                    yielded.add(event.id)
+                    events.append(event)
+                await _archive_events(archive, events)
+                yield SourceBatch(
+                    source, heapq.nlargest(settings.max_events, events, key=lambda e: e.ts)
+                )
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if owned:
+            await client.aclose()
+
+
+async def _archive_events(archive: Archive | None, events: list[EventRecord]) -> None:
+    if archive is None or not events:
+        return
+    try:
+        await asyncio.to_thread(archive.append, events)
+    except OSError as exc:
+        print(f"warmonitor: warning: could not archive events: {exc}", file=sys.stderr)
@@ -0,0 +1,122 @@
+"""Compiled keyword matching for warmonitor.
+
+A :class:`KeywordMatcher` folds a keyword list into one trie-shaped regular
+expression, so a text is scanned once no matter how many keywords there are.
+Each hit is then resolved against the trie to report every keyword that
+matches at that position, including overlapping ones ("US" inside
+"US military").
+
+Matching is case-insensitive. By default keywords match as substrings; with
+``whole_words=True`` they must be bounded by non-word characters, so "war"
+no longer matches "award" or "Warsaw". A trailing ``*`` (``"strike*"``)
+lets a whole-word keyword continue into a longer word ("strikes").
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+class _Term(NamedTuple):
+    index: int  # definition order, used to report matches stably
+    keyword: str  # keyword as written by the caller
+    weight: int
+    tag: bool  # reported in the matched list (vs. weight only)
+    wild: bool  # trailing ``*``: may continue into a longer word
+
+
+class _Node:
+    __slots__ = ("children", "terms")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.terms: list[_Term] = []
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Single-pass matcher for tag keywords plus weighted (severity) keywords."""
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = (),
+        weighted: Iterable[tuple[int, Iterable[str]]] = (),
+        whole_words: bool = False,
+    ) -> None:
+        self.whole_words = whole_words
+        self._root = _Node()
+        index = 0
+        for keyword in keywords:
+            self._add(_Term(index, keyword, 0, True, False))
+            index += 1
+        for weight, group in weighted:
+            for keyword in group:
+                self._add(_Term(index, keyword, weight, False, False))
+                index += 1
+        trie = self._pattern(self._root)
+        if not self._root.children:
+            self._regex = None
+        elif whole_words:
+            self._regex = re.compile(rf"(?<!\w)(?={trie})")
+        else:
+            self._regex = re.compile(f"(?={trie})")
+
+    def _add(self, term: _Term) -> None:
+        text = term.keyword.lower()
+        if text.endswith("*"):
+            text = text.rstrip("*")
+            term = term._replace(wild=self.whole_words)
+        if not text:
+            return
+        node = self._root
+        for ch in text:
+            node = node.children.setdefault(ch, _Node())
+        node.terms.append(term)
+
+    def _pattern(self, node: _Node) -> str:
+        if node.terms and not self.whole_words:
+            # Any substring match ending here is enough to flag the position.
+            return ""
+        branches = [re.escape(ch) + self._pattern(child) for ch, child in node.children.items()]
+        if node.terms:
+            wild = any(term.wild for term in node.terms)
+            branches.append(r"\w*(?!\w)" if wild else r"(?!\w)")
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    def _walk(self, text: str, start: int, found: dict[int, _Term]) -> None:
+        node = self._root
+        i = start
+        while True:
+            if node.terms:
+                bounded = i == len(text) or not _is_word(text[i])
+                for term in node.terms:
+                    if not self.whole_words or term.wild or bounded:
+                        found[term.index] = term
+            if i == len(text):
+                return
+            child = node.children.get(text[i])
+            if child is None:
+                return
+            node = child
+            i += 1
+
+    def scan(self, text: str) -> tuple[list[str], int]:
+        """Return the matched tag keywords (in definition order) and the
+        highest weight among matched weighted keywords (0 if none)."""
+        if self._regex is None:
+            return [], 0
+        lower = text.lower()
+        found: dict[int, _Term] = {}
+        for match in self._regex.finditer(lower):
+            self._walk(lower, match.start(), found)
+        terms = sorted(found.values())
+        matched = [term.keyword for term in terms if term.tag]
+        weight = max((term.weight for term in terms), default=0)
+        return matched, weight
@@ -1,26 +1,62 @@
 """Warmonitor — Live Iran–USA conflict terminal dashboard.
 
 Entry point: `warmonitor` or `uv run warmonitor`.
+
+Startup is arranged so the cached feed is on screen before anything slow
+happens: the config comes from a validated cache, the fetch stack (httpx,
+feedparser) is imported in a worker thread after the first frame, and the
+first network fetch runs in the background.
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import contextlib
+import importlib
+import random
+import sys
 import webbrowser
-from datetime import datetime, timezone
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
-from textual.containers import ScrollableContainer, Vertical, Horizontal
+from textual.containers import Horizontal, ScrollableContainer, Vertical
 from textual.reactive import reactive
-from textual.widgets import Label, Static
-
-from warmonitor.cache import load_cache, save_cache
-from warmonitor.config import load_sources
-from warmonitor.fetcher import fetch_all
-from warmonitor.models import Event
-
-SOURCES = load_sources()
-REFRESH_INTERVAL = 60  # seconds
+from textual.widgets import Input, Label, Static
+
+from warmonitor import clock
+from warmonitor.analytics import EventStats
+from warmonitor.archive import open_archive
+from warmonitor.breaker import SourceBreakers
+from warmonitor.cache import (
+    load_cache,
+    load_seen,
+    load_validators,
+    save_cache,
+    save_seen,
+    save_validators,
+)
+from warmonitor.cluster import StoryCluster, StoryClusters
+from warmonitor.collector import CollectorConnection, attach, run_collector, socket_path
+from warmonitor.config import ConfigWatcher, SourceDiff, load_config, save_config_cache
+from warmonitor.metrics import FetchMetrics
+from warmonitor.records import EventRecord
+from warmonitor.retention import RetainedEvents
+from warmonitor.search import Query, QueryError, SearchIndex, SearchResult, parse_query
+from warmonitor.seen import SeenIndex
+
+if TYPE_CHECKING:
+    from warmonitor.models import Source
+    from warmonitor.replay import Recorder, ReplayServer
+    from warmonitor.scheduler import PollScheduler
+
+SOURCES, SETTINGS = load_config()
+REFRESH_INTERVAL = SETTINGS.refresh_interval  # default per-source base, seconds
+REATTACH_DELAY = 1.0  # first wait before re-attaching to a lost collector, seconds
+REATTACH_MAX_DELAY = 30.0  # the wait doubles up to this while none is reachable
 
 SEVERITY_EMOJI = {5: "🔴", 4: "🟠", 3: "🟡", 2: "🔵", 1: "⚪"}
 SEVERITY_CLASS = {
@@ -34,7 +70,7 @@ SEVERITY_LABEL = {5: "CRITICAL", 4: "HIGH", 3: "MEDIUM", 2: "LOW", 1: "INFO"}
 
 
 def _time_ago(dt: datetime) -> str:
-    delta = datetime.now(timezone.utc) - dt
+    delta = clock.now() - dt
     total_seconds = int(delta.total_seconds())
     if total_seconds < 60:
         return f"{total_seconds}s ago"
@@ -46,31 +82,48 @@ def _time_ago(dt: datetime) -> str:
         return f"{total_seconds // 86400}d ago"
 
 
-def _calculate_defcon(events: list[Event]) -> int:
-    now = datetime.now(timezone.utc)
+# Phases shown in the metrics panel, with their column headings.
+_METRIC_COLUMNS = {
+    "connect": "conn",
+    "tls": "tls",
+    "ttfb": "ttfb",
+    "download": "dl",
+    "parse": "parse",
+    "match": "match",
+}
 
-    def recent(minutes: int) -> list[Event]:
-        cutoff = now.timestamp() - minutes * 60
-        return [e for e in events if e.published.timestamp() >= cutoff]
 
-    last_30 = recent(30)
-    last_120 = recent(120)
+def _ms(seconds: float | None) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.0f}"
 
-    sev5_30 = any(e.severity == 5 for e in last_30)
-    sev5_120 = any(e.severity == 5 for e in last_120)
-    sev4_30_count = sum(1 for e in last_30 if e.severity == 4)
-    has_sev4 = any(e.severity == 4 for e in events)
-    has_sev3 = any(e.severity == 3 for e in events)
 
-    if sev5_30:
-        return 1
-    if sev5_120 or sev4_30_count >= 2:
-        return 2
-    if has_sev4:
-        return 3
-    if has_sev3:
-        return 4
-    return 5
+def _metrics_table(metrics: FetchMetrics, sources: list[Source]) -> str:
+    """Per-source fetch metrics: polls, errors, median ms per phase, volume."""
+    heads = "".join(f"{head:>7}" for head in _METRIC_COLUMNS.values())
+    lines = [
+        "FETCH METRICS · median ms per phase",
+        f"{'source':<18}{'polls':>6}{'err':>5}{heads}{'KB':>8}{'new':>6}{'match':>7}  last error",
+    ]
+    for source in sources:
+        m = metrics.sources.get(source.id)
+        if m is None:
+            continue
+        phases = "".join(f"{_ms(m.phases[phase].quantile(0.5)):>7}" for phase in _METRIC_COLUMNS)
+        ratio = "—" if m.match_ratio is None else f"{m.match_ratio:.0%}"
+        lines.append(
+            f"{source.name[:17]:<18}{sum(m.outcomes.values()):>6}{m.outcomes['error']:>5}"
+            f"{phases}{m.bytes // 1024:>8}{m.new:>6}{ratio:>7}  {m.last_error}"
+        )
+    if len(lines) == 2:
+        lines.append("No polls recorded yet.")
+    return "\n".join(lines)
+
+
+def _event_row_text(event: EventRecord, sources: int = 1) -> str:
+    emoji = SEVERITY_EMOJI[event.severity]
+    age = _time_ago(event.published)
+    more = f" +{sources - 1} more" if sources > 1 else ""
+    return f"{emoji} [{age}] {event.title}\n    ↳ {event.source_name}{more}"
 
 
 class EventRow(Static):
@@ -78,9 +131,20 @@ class EventRow(Static):
 
     can_focus = True
 
-    def __init__(self, event: Event, renderable="", **kwargs) -> None:
+    def __init__(self, event: EventRecord, renderable="", **kwargs) -> None:
         super().__init__(renderable, **kwargs)
         self._event = event
+        self._text = renderable
+
+    def set_event(self, event: EventRecord, text: str) -> None:
+        """Point the row at *event*, repainting only if its text changed."""
+        if event.severity != self._event.severity:
+            self.remove_class(SEVERITY_CLASS[self._event.severity])
+            self.add_class(SEVERITY_CLASS[event.severity])
+        self._event = event
+        if text != self._text:
+            self._text = text
+            self.update(text)
 
     def on_key(self, key_event) -> None:
         if key_event.key in ("enter", "o"):
@@ -92,28 +156,59 @@ class WarmonitorApp(App):
     """Live Iran–USA conflict dashboard."""
 
     CSS_PATH = "app.tcss"
+    AUTO_FOCUS = "#feed-container"  # not the (hidden) search box
 
     BINDINGS = [
         Binding("r", "refresh", "Refresh", show=True),
         Binding("q", "quit", "Quit", show=True),
         Binding("f", "filter", "Filter ≥3", show=True),
         Binding("s", "sort_toggle", "Sort", show=True),
+        Binding("c", "cluster_toggle", "Cluster", show=True),
+        Binding("slash", "search", "Search", show=True),
+        Binding("m", "metrics_toggle", "Metrics", show=True),
         Binding("o", "open_url", "Open URL", show=True),
+        Binding("escape", "clear_search", "Clear search", show=False),
     ]
 
-    events_data: reactive[list[Event]] = reactive([], layout=True)
+    events_data: reactive[list[EventRecord]] = reactive([], layout=True)
     source_status: dict[str, str] = {}
     filter_active: reactive[bool] = reactive(False)
     sort_by_severity: reactive[bool] = reactive(False)
+    cluster_stories: reactive[bool] = reactive(False)
+    search_query: str = ""
     fetching: reactive[bool] = reactive(False)
 
+    def __init__(
+        self,
+        standalone: bool = False,
+        recorder: Recorder | None = None,
+        replay: ReplayServer | None = None,
+    ) -> None:
+        super().__init__()
+        # Recording and replaying need the fetching done in this process.
+        self.standalone = standalone or recorder is not None or replay is not None
+        self.recorder = recorder  # --record
+        self.replay = replay  # --replay
+        self.sources = list(SOURCES)  # replaced when the config file is edited
+        self.collector: CollectorConnection | None = None
+        self.scheduler: PollScheduler | None = None  # set once polling in this process
+        self._in_flight: set[str] = set()  # ids of sources being fetched right now
+        self.validators: dict[str, dict[str, str]] = {}  # loaded once polling starts
+        self.client = None
+        self.executor = None
+        self._rows: dict[str, EventRow] = {}  # event id → mounted feed row
+        self._row_order: list[str] = []  # event ids in on-screen order
+        self._search: SearchResult | None = None  # last search behind the display
+        self._search_error = ""
+        self.metrics = FetchMetrics()  # this process's polls, or the collector's
+
     def compose(self) -> ComposeResult:
         # Header
         with Horizontal(id="header"):
             yield Label("🔴 WARMONITOR", id="header-title")
             yield Label("  Iran–USA Conflict Dashboard", id="header-subtitle")
             yield Label("", id="header-timestamp")
-            yield Label(f"  AUTO-REFRESH: {REFRESH_INTERVAL}s", id="header-refresh")
+            yield Label(f"  AUTO-REFRESH: ~{REFRESH_INTERVAL}s", id="header-refresh")
 
         # Body
         with Horizontal(id="body"):
@@ -128,73 +223,307 @@ class WarmonitorApp(App):
             # Center — Live Feed
             with Vertical(id="feed-panel"):
                 yield Label("⚡ LIVE FEED", id="feed-panel-title")
+                yield Input(
+                    placeholder="Search: words, word*, -word, source:id, severity:N, keyword:K",
+                    id="search-box",
+                )
+                yield Static("", id="search-facets")
+                yield Static("", id="metrics-panel")
                 with ScrollableContainer(id="feed-container"):
                     yield Static(
                         "No matching events yet — waiting for feed update…",
                         id="no-events-msg",
                     )
+                    yield Static("", id="feed-notes", classes="event-severity-medium")
 
             # Right — Sources
             with Vertical(id="sources-panel"):
                 yield Label("SOURCES", id="sources-panel-title")
-                for source in SOURCES:
+                for source in self.sources:
                     self.source_status[source.id] = "unknown"
                     yield Label(f"🟡 {source.name}", id=f"src-{source.id}", classes="source-item")
                 yield Static(
-                    "\n[R] Refresh\n[Q] Quit\n[F] Filter\n[S] Sort",
+                    "\n[R] Refresh\n[Q] Quit\n[F] Filter\n[S] Sort\n[C] Cluster\n[/] Search"
+                    "\n[M] Metrics",
                     id="keybindings",
                 )
 
     async def on_mount(self) -> None:
-        self.events_data = load_cache()
+        self.retained = RetainedEvents(SETTINGS.max_events)
+        self.stats = EventStats()
+        self.clusters = StoryClusters()
+        self.search = SearchIndex()
         self._update_timestamp()
         self.set_interval(1, self._update_timestamp)
-        self.set_interval(REFRESH_INTERVAL, self.action_refresh)
+        # Rows are patched in place, so keeping ages current is cheap.
+        self.set_interval(30, self._refresh_feed)
+        if self.replay is None:  # a replay keeps the sources it was recorded with
+            self.config_watcher = ConfigWatcher(self.sources)
+            self.set_interval(1, self._check_config)
+        # Show the last session's feed before waiting on a socket or the network.
+        cached = load_cache(SETTINGS.max_events) if self.replay is None else []
+        self._apply_events(cached, [])
+        save_config_cache()  # a config validated at import, for the next start
+        if self.standalone:
+            self.run_worker(self._start_polling(bool(cached)), exclusive=True)
+        else:
+            self.collector = await attach(socket_path(SETTINGS))
+            self.run_worker(self._follow_collector(bool(cached)), exclusive=True)
+
+    async def _start_polling(self, cached: bool) -> None:
+        """Fetch feeds in this process (no collector to attach to).
+
+        *cached* says whether the feed on screen came from the cache.
+        """
+        # httpx and feedparser are slow to import; keep that off the UI thread.
+        await asyncio.to_thread(importlib.import_module, "warmonitor.fetcher")
+        from warmonitor.fetcher import HostLimiter, create_client, create_executor
+        from warmonitor.scheduler import PollScheduler
+
+        wrap = None
+        refresh_note = f"  AUTO-REFRESH: ~{REFRESH_INTERVAL}s"
+        if self.recorder is not None:
+            wrap = self.recorder.wrap
+            refresh_note = f"  RECORDING: {self.recorder.path}"
+        elif self.replay is not None:
+            # A replay starts from nothing and runs on the recording's timeline.
+            await self.replay.start()
+            clock.set_clock(clock.ScaledClock(self.replay.recording.started, self.replay.speed))
+            wrap = self.replay.wrap
+            refresh_note = f"  REPLAY: {self.replay.speed:g}x"
+        # One pooled client for the app's lifetime so refreshes reuse connections.
+        self.client = create_client(SETTINGS, wrap=wrap)
+        self.limiter = HostLimiter(SETTINGS.per_host_limit)
+        self.executor = create_executor(SETTINGS)
+        self.archive = open_archive(SETTINGS.archive_dir) if self.replay is None else None
+        self.breakers = SourceBreakers.from_settings(SETTINGS)
+        # Validators and the seen index are only trustworthy alongside the
+        # events they produced: without a cache, a 304 or a skipped entry
+        # would leave the feed empty.
+        self.validators = load_validators() if cached else {}
+        self.seen = load_seen() if cached else SeenIndex()
+        self.scheduler = PollScheduler(
+            self.sources,
+            default_interval=SETTINGS.refresh_interval,
+            min_interval=SETTINGS.min_interval,
+            max_interval=SETTINGS.max_interval,
+            rng=random.Random(0) if self.replay is not None else None,
+        )
+        self.refresh_note = refresh_note
+        self.query_one("#header-refresh", Label).update(refresh_note)
+        self.set_interval(1, self._poll_due_sources)
         await self._do_fetch()
 
+    async def _follow_collector(self, cached: bool) -> None:
+        """Mirror the collector's feed, polling locally only while none is reachable.
+
+        A collector drops readers that fall behind and may be restarted, so
+        after a disconnect this keeps re-attaching, waiting longer between
+        attempts up to ``REATTACH_MAX_DELAY``. *cached* says whether the feed
+        on screen came from the cache.
+        """
+        delay = REATTACH_DELAY
+        while True:
+            if self.collector is None:
+                if self.scheduler is None:
+                    await self._start_polling(cached)
+                else:
+                    self.query_one("#header-refresh", Label).update(self.refresh_note)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, REATTACH_MAX_DELAY)
+                self.collector = await attach(socket_path(SETTINGS))
+                continue
+            self.query_one("#header-refresh", Label).update("  LIVE: collector")
+            async for message in self.collector.messages():
+                if "status" in message:
+                    self.source_status.update(message["status"])
+                    self._update_source_indicators()
+                if "metrics" in message:
+                    self.metrics.update(message["metrics"])
+                    self._refresh_metrics()
+                if message["type"] == "snapshot":
+                    delay = REATTACH_DELAY
+                    self._apply_events(message["events"], [e.id for e in self.events_data])
+                elif message["type"] == "delta":
+                    self._apply_events(message["added"], message["removed"])
+            await self.collector.close()
+            self.collector = None
+            self.notify("Collector disconnected; fetching feeds directly.", severity="warning")
+            if self.scheduler is None:
+                cached_events = load_cache(SETTINGS.max_events)
+                self._apply_events(cached_events, [e.id for e in self.events_data])
+                cached = bool(cached_events)
+
+    def _apply_events(self, added: list[EventRecord], removed: list[str]) -> None:
+        """Apply new/changed and dropped events to the feed and its indexes."""
+        self.retained.apply(added, removed)
+        self.events_data = self.retained.newest()
+        self.stats.apply(added, removed)
+        self.clusters.apply(added, removed)
+        self.search.apply(added, removed)
+        self._refresh_feed()
+        self._refresh_status()
+
+    async def on_unmount(self) -> None:
+        if self.collector is not None:
+            await self.collector.close()
+        if self.client is not None:
+            await self.client.aclose()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.replay is not None:
+            await self.replay.close()
+
     def _update_timestamp(self) -> None:
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        ts = clock.now().strftime("%Y-%m-%d %H:%M:%S UTC")
         try:
             self.query_one("#header-timestamp", Label).update(ts)
         except Exception:
             pass
 
     async def action_refresh(self) -> None:
-        if not self.fetching:
-            await self._do_fetch()
+        if self.collector is not None:
+            await self.collector.request_refresh()
+        elif self.scheduler is not None:  # the fetch stack is up
+            self.run_worker(self._do_fetch())
 
-    async def _do_fetch(self) -> None:
+    def _poll_due_sources(self) -> None:
+        if self.collector is not None:
+            return
+        due = set(self.scheduler.due())
+        if due:
+            # A round of its own, so a slow source never holds up the next tick.
+            self.run_worker(self._do_fetch([s for s in self.sources if s.id in due]))
+
+    async def _do_fetch(self, sources: list[Source] | None = None) -> None:
+        """Fetch *sources* (all by default), merging each one's events as it answers.
+
+        Rounds may overlap; a source still being fetched by an earlier round
+        is left to that round until its batch is in.
+        """
+        sources = self.sources if sources is None else sources
+        sources = [s for s in sources if s.id not in self._in_flight]
+        if not sources:
+            return
+        ids = {s.id for s in sources}
+        self._in_flight |= ids
         self.fetching = True
-        self._set_all_sources_fetching()
+        self._set_sources_fetching(sources)
+        from warmonitor.fetcher import fetch_iter
+
+        batches = fetch_iter(
+            sources,
+            self.source_status,
+            self.validators,
+            client=self.client,
+            limiter=self.limiter,
+            executor=self.executor,
+            scheduler=self.scheduler,
+            settings=SETTINGS,
+            seen=self.seen,
+            metrics=self.metrics,
+            archive=self.archive,
+            breakers=self.breakers,
+        )
         try:
-            new_events = await fetch_all(SOURCES, self.source_status)
-            # Merge with existing, keeping up to MAX_EVENTS
-            new_ids = {e.id for e in new_events}
-            merged = new_events + [e for e in self.events_data if e.id not in new_ids]
-            merged.sort(key=lambda e: e.published, reverse=True)
-            self.events_data = merged[:200]
-            save_cache(self.events_data)
+            async with contextlib.aclosing(batches):
+                async for batch in batches:
+                    self._in_flight.discard(batch.source.id)
+                    added, removed = self.retained.merge(batch.events)
+                    self._update_source_label(batch.source.id)
+                    if added or removed:
+                        self.events_data = self.retained.newest()
+                        self.stats.apply(added, removed)
+                        self.clusters.apply(added, removed)
+                        self.search.apply(added, removed)
+                        self._refresh_feed()
+                        self._refresh_status()
+            if self.replay is None:  # a replay leaves the live cache alone
+                save_cache(self.events_data, SETTINGS.max_events)
+                save_validators(self.validators)
+                save_seen(self.seen)
         finally:
-            self.fetching = False
+            self._in_flight -= ids
+            self.fetching = bool(self._in_flight)
             self._update_source_indicators()
             self._refresh_feed()
             self._refresh_status()
+            self._refresh_metrics()
+
+    def _check_config(self) -> None:
+        """Apply source edits in the config file without a restart.
+
+        Only what changed is touched: removed sources lose their sidebar
+        entry, schedule and events; new and changed ones get a fresh entry
+        and are polled at once. Keyword matchers are compiled per keyword
+        list on first use, so unchanged sources keep theirs. A removed or
+        changed source that is being fetched is switched once its results
+        are in; everything else applies right away.
+        """
+        diff = self.config_watcher.poll(self._in_flight)
+        if diff is None:
+            return
+        previous = {s.id: s for s in self.sources}
+        self.sources = self.config_watcher.sources
+        for source in diff.removed:
+            self.source_status.pop(source.id, None)
+        self._update_sources_panel(diff)
+        if self.scheduler is not None:
+            from warmonitor.fetcher import forget_sources
+
+            stale = [*diff.removed, *diff.changed, *(previous[s.id] for s in diff.changed)]
+            forget_sources(stale, self.validators, self.seen)
+            for source in stale:
+                self.breakers.forget(source.id)
+            for source in diff.removed:
+                self.scheduler.remove(source.id)
+            for source in (*diff.added, *diff.changed):
+                self.scheduler.add(source)  # due at the next poll tick
+            gone = {s.id for s in diff.removed}
+            self._apply_events([], [e.id for e in self.events_data if e.source_id in gone])
+        if any(diff):
+            self.notify(
+                f"Sources reloaded: {len(diff.added)} added, {len(diff.removed)} removed,"
+                f" {len(diff.changed)} changed."
+            )
 
-    def _set_all_sources_fetching(self) -> None:
-        for source in SOURCES:
+    def _update_sources_panel(self, diff: SourceDiff) -> None:
+        """Remove, mount and relabel sidebar entries for the sources in *diff*."""
+        panel = self.query_one("#sources-panel", Vertical)
+        for source in diff.removed:
+            panel.query(f"#src-{source.id}").remove()
+        added = {s.id for s in diff.added}
+        anchor: Label = self.query_one("#sources-panel-title", Label)
+        for source in self.sources:
+            if source.id in added:
+                label = Label(f"⚪ {source.name}", id=f"src-{source.id}", classes="source-item")
+                panel.mount(label, after=anchor)
+            else:
+                label = panel.query_one(f"#src-{source.id}", Label)
+            anchor = label
+        for source in (*diff.added, *diff.changed):
+            self._update_source_label(source.id)
+
+    def _set_sources_fetching(self, sources: list[Source]) -> None:
+        for source in sources:
             self.source_status[source.id] = "fetching"
             self._update_source_label(source.id)
 
     def _update_source_indicators(self) -> None:
-        for source in SOURCES:
+        for source in self.sources:
             self._update_source_label(source.id)
 
     def _update_source_label(self, source_id: str) -> None:
         status = self.source_status.get(source_id, "unknown")
-        indicator = {"ok": "🟢", "error": "🔴", "fetching": "🟡", "unknown": "⚪"}.get(
-            status, "⚪"
-        )
-        source = next((s for s in SOURCES if s.id == source_id), None)
+        indicator = {
+            "ok": "🟢",
+            "error": "🔴",
+            "fetching": "🟡",
+            "open": "⛔",  # circuit open: not polled until its cooldown is over
+            "half_open": "🟠",  # trial poll after the cooldown
+            "unknown": "⚪",
+        }.get(status, "⚪")
+        source = next((s for s in self.sources if s.id == source_id), None)
         if source:
             try:
                 self.query_one(f"#src-{source_id}", Label).update(
@@ -203,43 +532,121 @@ class WarmonitorApp(App):
             except Exception:
                 pass
 
-    def _get_display_events(self) -> list[Event]:
-        events = self.events_data
+    def _search_events(self) -> list[EventRecord]:
+        """Events matching the search box and the severity filter, newest first."""
+        self._search_error = ""
+        try:
+            query = parse_query(self.search_query, prefix=True)
+        except QueryError as exc:
+            self._search_error = str(exc)
+            query = Query()
         if self.filter_active:
-            events = [e for e in events if e.severity >= 3]
-        if self.sort_by_severity:
-            events = sorted(events, key=lambda e: (-e.severity, -e.published.timestamp()))
-        return events
+            query = query._replace(min_severity=max(query.min_severity, 3))
+        self._search = self.search.search(query)
+        return self._search.events
+
+    def _get_display_stories(self) -> list[StoryCluster]:
+        self._search = None
+        by_severity = self.sort_by_severity
+        if self.search_query or self.filter_active:
+            events = self._search_events()
+            if by_severity:
+                # Filter the maintained severity order instead of sorting matches.
+                matched = {e.id for e in events}
+                events = [e for e in self.retained.by_severity() if e.id in matched]
+        else:
+            events = self.retained.by_severity() if by_severity else self.events_data
+        if not self.cluster_stories:
+            return [StoryCluster(e, 1, 1) for e in events]
+        # Stories are ordered by their lead event, which the event views do not know.
+        stories = self.clusters.collapse(events)
+        if by_severity:
+            return sorted(stories, key=lambda s: (-s.record.severity, -s.record.ts))
+        return sorted(stories, key=lambda s: -s.record.ts)
 
     def _refresh_feed(self) -> None:
-        container = self.query_one("#feed-container", ScrollableContainer)
-        container.remove_children()
-
-        display = self._get_display_events()
-        if not display:
-            container.mount(
-                Static(
-                    "No matching events yet — waiting for feed update…",
-                    id="no-events-msg",
-                )
-            )
-            return
+        """Bring the feed rows in line with the display list.
 
-        filter_note = " [FILTER ≥3 ACTIVE]" if self.filter_active else ""
-        sort_note = " [SORTED BY SEVERITY]" if self.sort_by_severity else ""
-        if filter_note or sort_note:
-            container.mount(Static(f"{filter_note}{sort_note}", classes="event-severity-medium"))
-
-        for event in display:
-            emoji = SEVERITY_EMOJI[event.severity]
-            sev_class = SEVERITY_CLASS[event.severity]
-            age = _time_ago(event.published)
-            text = f"{emoji} [{age}] {event.title}\n    ↳ {event.source_name}"
-            container.mount(EventRow(event, text, classes=f"event-row {sev_class}"))
+        Rows are keyed by event id (a story's lead event when clustering) and
+        reused: rows for new events are mounted, rows for events that dropped
+        out are removed, and surviving rows are only moved when their relative
+        order changed (e.g. a sort toggle). Age text is updated in place.
+        """
+        container = self.query_one("#feed-container", ScrollableContainer)
+        stories = self._get_display_stories()
+        display = [story.record for story in stories]
+        wanted = {event.id for event in display}
+
+        with self.batch_update():
+            self.query_one("#no-events-msg", Static).display = not display
+            filter_note = " [FILTER ≥3 ACTIVE]" if self.filter_active else ""
+            sort_note = " [SORTED BY SEVERITY]" if self.sort_by_severity else ""
+            cluster_note = " [CLUSTERED]" if self.cluster_stories else ""
+            notes = self.query_one("#feed-notes", Static)
+            notes.update(f"{filter_note}{sort_note}{cluster_note}")
+            notes.display = bool(display and (filter_note or sort_note or cluster_note))
+            facets = self.query_one("#search-facets", Static)
+            facets.update(self._search_summary())
+            facets.display = bool(self.search_query)
+
+            stale = [row for event_id, row in self._rows.items() if event_id not in wanted]
+            if stale:
+                container.remove_children(stale)
+                for row in stale:
+                    del self._rows[row._event.id]
+
+            kept_before = [event_id for event_id in self._row_order if event_id in self._rows]
+            kept_now = [event.id for event in display if event.id in self._rows]
+            reorder = kept_before != kept_now
+
+            anchor: Static = notes
+            pending: list[EventRow] = []
+            for event, story in zip(display, stories):
+                text = _event_row_text(event, story.sources)
+                row = self._rows.get(event.id)
+                if row is None:
+                    row = EventRow(
+                        event, text, classes=f"event-row {SEVERITY_CLASS[event.severity]}"
+                    )
+                    self._rows[event.id] = row
+                    pending.append(row)
+                    continue
+                if pending:
+                    container.mount(*pending, after=anchor)
+                    anchor = pending[-1]
+                    pending = []
+                row.set_event(event, text)
+                if reorder:
+                    container.move_child(row, after=anchor)
+                anchor = row
+            if pending:
+                container.mount(*pending, after=anchor)
+
+        self._row_order = [event.id for event in display]
+
+    def _search_summary(self) -> str:
+        """One line of match and facet counts for the current search."""
+        if self._search_error:
+            return f"⚠ {self._search_error}"
+        if self._search is None:
+            return ""
+        names = {s.id: s.name for s in self.sources}
+        facets = self._search.facets
+        parts = [f"{self._search.total} matches"]
+        if facets.source:
+            top = list(facets.source.items())[:4]
+            parts.append(", ".join(f"{names.get(k, k)} {n}" for k, n in top))
+        if facets.severity:
+            levels = sorted(facets.severity.items(), reverse=True)
+            parts.append(" ".join(f"{SEVERITY_EMOJI[k]} {n}" for k, n in levels))
+        if facets.keyword:
+            top = list(facets.keyword.items())[:4]
+            parts.append(", ".join(f"{k} {n}" for k, n in top))
+        return " · ".join(parts)
 
     def _refresh_status(self) -> None:
         events = self.events_data
-        defcon = _calculate_defcon(events)
+        defcon = self.stats.defcon()
 
         # DEFCON label with color via CSS class (keep ID stable)
         defcon_label = self.query_one("#defcon-label", Label)
@@ -256,16 +663,12 @@ class WarmonitorApp(App):
             last_event_label.update("Last event:\n—")
 
         # Events per hour
-        now = datetime.now(timezone.utc)
-        last_hour = [e for e in events if (now.timestamp() - e.published.timestamp()) <= 3600]
         self.query_one("#events-per-hour", Label).update(
-            f"Events/hr:\n{len(last_hour)}"
+            f"Events/hr:\n{self.stats.events_per_hour()}"
         )
 
         # Severity breakdown
-        counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for e in events:
-            counts[e.severity] += 1
+        counts = self.stats.severity_counts
         breakdown = "Severity:\n"
         breakdown += f"🔴 {counts[5]}\n"
         breakdown += f"🟠 {counts[4]}\n"
@@ -287,12 +690,128 @@ class WarmonitorApp(App):
         self.sort_by_severity = not self.sort_by_severity
         self._refresh_feed()
 
+    def action_cluster_toggle(self) -> None:
+        self.cluster_stories = not self.cluster_stories
+        self._refresh_feed()
+
+    def _refresh_metrics(self) -> None:
+        panel = self.query_one("#metrics-panel", Static)
+        if panel.display:
+            panel.update(_metrics_table(self.metrics, self.sources))
+
+    def action_metrics_toggle(self) -> None:
+        panel = self.query_one("#metrics-panel", Static)
+        panel.display = not panel.display
+        self._refresh_metrics()
+
+    def action_search(self) -> None:
+        box = self.query_one("#search-box", Input)
+        box.display = True
+        box.focus()
+
+    def action_clear_search(self) -> None:
+        box = self.query_one("#search-box", Input)
+        box.value = ""
+        box.display = False
+        self.search_query = ""
+        self._refresh_feed()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.search_query = event.value.strip()
+        self._refresh_feed()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.query_one("#feed-container", ScrollableContainer).focus()
+
     def action_quit(self) -> None:
         self.exit()
 
 
-def main() -> None:
-    app = WarmonitorApp()
+def _compact_archive(days: int, drop_events: bool) -> None:
+    archive = open_archive(SETTINGS.archive_dir)
+    if archive is None:
+        print("warmonitor: error: the archive is disabled (archive_dir is not set)", file=sys.stderr)
+        raise SystemExit(1)
+    before = int(datetime.now(UTC).timestamp()) - days * 86400
+    compacted = archive.compact(before, drop_events)
+    print(f"warmonitor: compacted {len(compacted)} archive days in {archive.path}", file=sys.stderr)
+
+
+def _speed(value: str) -> float:
+    """Parse a replay speed such as ``10x`` or ``0.5``."""
+    try:
+        speed = float(value.lower().removesuffix("x"))
+    except ValueError:
+        speed = 0.0
+    if not speed > 0:
+        raise argparse.ArgumentTypeError(f"invalid speed {value!r}; use e.g. 10x")
+    return speed
+
+
+def _traffic(args: argparse.Namespace) -> dict:
+    """The recorder or replay server asked for by ``--record`` / ``--replay``."""
+    if args.record is None and args.replay is None:
+        return {}
+    # Only now: the replay module pulls in httpx.
+    from warmonitor.replay import Recorder, ReplayServer, load_recording
+
+    try:
+        if args.record is not None:
+            return {"recorder": Recorder(args.record)}
+        return {"replay": ReplayServer(load_recording(args.replay), args.speed)}
+    except (OSError, ValueError) as exc:
+        print(f"warmonitor: error: {exc}", file=sys.stderr)
+        raise SystemExit(1) from None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="warmonitor", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--standalone",
+        action="store_true",
+        help="fetch feeds in this process even if a collector is running",
+    )
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument(
+        "--record", type=Path, metavar="DIR", help="record all feed traffic into DIR"
+    )
+    traffic.add_argument(
+        "--replay",
+        type=Path,
+        metavar="DIR",
+        help="replay the feed traffic recorded in DIR instead of fetching",
+    )
+    parser.add_argument(
+        "--speed",
+        type=_speed,
+        default=1.0,
+        help="replay speed, e.g. 10x (default: 1x, as recorded)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    collect = commands.add_parser(
+        "collect", help="run the headless collector that dashboards attach to"
+    )
+    collect.add_argument(
+        "--socket", type=Path, help="Unix socket to serve on (default: collector_socket)"
+    )
+    compact = commands.add_parser("compact", help="compact old days of the event archive")
+    compact.add_argument(
+        "--days", type=int, default=7, help="keep days newer than this many as is (default: 7)"
+    )
+    compact.add_argument(
+        "--drop-events",
+        action="store_true",
+        help="delete the events of compacted days, keeping only their hourly rollups",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        run_collector(SOURCES, SETTINGS, args.socket)
+        return
+    if args.command == "compact":
+        _compact_archive(args.days, args.drop_events)
+        return
+    app = WarmonitorApp(standalone=args.standalone, **_traffic(args))
     app.run()
 
 
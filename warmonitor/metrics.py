@@ -0,0 +1,226 @@
+"""Per-source fetch metrics for warmonitor.
+
+:func:`~warmonitor.fetcher.fetch_source` times every phase of a poll and
+reports it to a :class:`FetchMetrics`:
+
+- ``queue``: waiting for the per-host request limit;
+- ``connect``: opening a TCP connection, DNS lookup included (only when the
+  pool had no idle connection to the host);
+- ``tls``: the TLS handshake of a new connection;
+- ``ttfb``: request sent → response headers received;
+- ``download``: reading the body;
+- ``parse``: ``feedparser.parse``;
+- ``match``: keyword matching, scoring and building events for new entries.
+
+Alongside the timings it counts bytes downloaded, entries in the feed, new
+(not previously seen) entries, matched entries, outcomes (``ok``,
+``not_modified``, ``unchanged`` body, ``error``, ``open``: refused by the
+source's circuit breaker) and errors by class.
+
+Timings go into fixed-bucket histograms, so memory per source stays constant
+however long the process runs. :meth:`FetchMetrics.render_prometheus`
+produces the Prometheus text format; :meth:`FetchMetrics.to_dict` and
+:meth:`FetchMetrics.update` carry them over the collector socket.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+PHASES = ("queue", "connect", "tls", "ttfb", "download", "parse", "match")
+# Upper bounds in seconds; one more bucket counts everything above the last.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Observation counts in fixed buckets, with their sum."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # per bucket, not cumulative
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the *q* quantile by interpolating within its bucket.
+
+        ``None`` without observations; values in the overflow bucket are
+        reported as the last bound.
+        """
+        total = self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class SourceMetrics:
+    """Everything recorded for one source."""
+
+    __slots__ = (
+        "bytes", "entries", "errors", "last_error", "matched", "new", "outcomes", "phases"
+    )
+
+    def __init__(self) -> None:
+        self.phases = {phase: Histogram() for phase in PHASES}
+        self.bytes = 0
+        self.entries = 0  # entries in fetched feeds
+        self.new = 0  # of which not seen on an earlier poll
+        self.matched = 0  # of which matched a keyword and became events
+        self.outcomes: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()  # error class → count
+        self.last_error = ""
+
+    @property
+    def match_ratio(self) -> float | None:
+        return self.matched / self.new if self.new else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": {p: [h.counts, h.sum] for p, h in self.phases.items() if any(h.counts)},
+            "bytes": self.bytes,
+            "entries": self.entries,
+            "new": self.new,
+            "matched": self.matched,
+            "outcomes": dict(self.outcomes),
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SourceMetrics:
+        metrics = cls()
+        for phase, (counts, total) in data.get("phases", {}).items():
+            if phase in metrics.phases and len(counts) == len(BUCKETS) + 1:
+                metrics.phases[phase].counts = list(counts)
+                metrics.phases[phase].sum = total
+        metrics.bytes = data.get("bytes", 0)
+        metrics.entries = data.get("entries", 0)
+        metrics.new = data.get("new", 0)
+        metrics.matched = data.get("matched", 0)
+        metrics.outcomes = Counter(data.get("outcomes", {}))
+        metrics.errors = Counter(data.get("errors", {}))
+        metrics.last_error = data.get("last_error", "")
+        return metrics
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class FetchMetrics:
+    """Fetch metrics for every source polled by this process (or its collector)."""
+
+    def __init__(self) -> None:
+        self.sources: dict[str, SourceMetrics] = {}
+
+    def source(self, source_id: str) -> SourceMetrics:
+        metrics = self.sources.get(source_id)
+        if metrics is None:
+            metrics = self.sources[source_id] = SourceMetrics()
+        return metrics
+
+    def record(
+        self,
+        source_id: str,
+        outcome: str,
+        phases: dict[str, float],
+        size: int = 0,
+        entries: int = 0,
+        new: int = 0,
+        matched: int = 0,
+        error: str = "",
+    ) -> None:
+        """Record one poll of *source_id*: its *outcome* and per-phase seconds."""
+        metrics = self.source(source_id)
+        for phase, seconds in phases.items():
+            metrics.phases[phase].observe(seconds)
+        metrics.bytes += size
+        metrics.entries += entries
+        metrics.new += new
+        metrics.matched += matched
+        metrics.outcomes[outcome] += 1
+        if error:
+            metrics.errors[error] += 1
+            metrics.last_error = error
+
+    def to_dict(self, source_ids: Iterable[str] | None = None) -> dict[str, Any]:
+        """JSON-ready metrics for *source_ids* (default: every source)."""
+        ids = self.sources if source_ids is None else source_ids
+        return {i: self.sources[i].to_dict() for i in ids if i in self.sources}
+
+    def update(self, data: dict[str, Any]) -> None:
+        """Replace the sources in *data* (from :meth:`to_dict`) with its values."""
+        for source_id, values in data.items():
+            self.sources[source_id] = SourceMetrics.from_dict(values)
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        # Fetches may be recording on another thread; sorted() copies up front.
+        sources = sorted(self.sources.items())
+        lines = [
+            "# HELP warmonitor_fetch_phase_seconds Time spent in each phase of a feed poll.",
+            "# TYPE warmonitor_fetch_phase_seconds histogram",
+        ]
+        for source_id, metrics in sources:
+            for phase, hist in metrics.phases.items():
+                labels = f'source="{_label(source_id)}",phase="{phase}"'
+                cumulative = 0
+                for bound, n in zip((*BUCKETS, "+Inf"), hist.counts):
+                    cumulative += n
+                    lines.append(
+                        f'warmonitor_fetch_phase_seconds_bucket{{{labels},le="{bound}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(f"warmonitor_fetch_phase_seconds_sum{{{labels}}} {hist.sum:.6f}")
+                lines.append(f"warmonitor_fetch_phase_seconds_count{{{labels}}} {cumulative}")
+        counters = (
+            ("fetch_bytes", "Feed bytes downloaded.", "bytes"),
+            ("feed_entries", "Entries in fetched feeds.", "entries"),
+            ("feed_new_entries", "Entries not seen on an earlier poll.", "new"),
+            ("feed_matched_entries", "New entries that matched a keyword.", "matched"),
+        )
+        for name, help_text, attr in counters:
+            lines.append(f"# HELP warmonitor_{name}_total {help_text}")
+            lines.append(f"# TYPE warmonitor_{name}_total counter")
+            for source_id, metrics in sources:
+                lines.append(
+                    f'warmonitor_{name}_total{{source="{_label(source_id)}"}} '
+                    f"{getattr(metrics, attr)}"
+                )
+        lines.append("# HELP warmonitor_fetches_total Polls by outcome.")
+        lines.append("# TYPE warmonitor_fetches_total counter")
+        for source_id, metrics in sources:
+            for outcome, n in sorted(metrics.outcomes.items()):
+                lines.append(
+                    f'warmonitor_fetches_total{{source="{_label(source_id)}",'
+                    f'outcome="{_label(outcome)}"}} {n}'
+                )
+        lines.append("# HELP warmonitor_fetch_errors_total Failed polls by error class.")
+        lines.append("# TYPE warmonitor_fetch_errors_total counter")
+        for source_id, metrics in sources:
+            for error, n in sorted(metrics.errors.items()):
+                lines.append(
+                    f'warmonitor_fetch_errors_total{{source="{_label(source_id)}",'
+                    f'error="{_label(error)}"}} {n}'
+                )
+        return "\n".join(lines) + "\n"
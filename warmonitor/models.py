@@ -1,11 +1,20 @@
-"""Pydantic data models for warmonitor."""
+"""Pydantic data models for warmonitor.
+
+Schemas are built on first validation rather than at import (``defer_build``):
+the dashboard paints its cached feed before it needs to validate anything.
+"""
 
 from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
 
-from pydantic import BaseModel
+from warmonitor.records import MAX_EVENTS
 
 
 class Event(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: str
     title: str
     summary: str
@@ -19,6 +28,8 @@ class Event(BaseModel):
 
 
 class Source(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: str
     name: str
     url: str
@@ -27,3 +38,38 @@ class Source(BaseModel):
     credibility: str
     color: str
     status: str = "unknown"  # ok / error / fetching / unknown
+    whole_words: bool = False  # keywords must match whole words ("war" ≠ "award")
+    interval: int | None = None  # base poll interval in seconds; None uses the setting
+    max_bytes: int | None = None  # download cap; None uses the max_feed_bytes setting
+
+
+class Settings(BaseModel):
+    """Tunables read from the top level of ``~/.warmonitor.toml``."""
+
+    model_config = ConfigDict(defer_build=True)
+
+    max_connections: int = 20  # total pooled connections
+    max_keepalive_connections: int = 10  # idle connections kept open
+    keepalive_expiry: float = 30.0  # seconds before an idle connection closes
+    http2: bool = False  # needs the optional ``h2`` package
+    per_host_limit: int = 4  # concurrent requests per feed host
+    connect_timeout: float = 5.0  # seconds to establish a connection
+    read_timeout: float = 15.0  # seconds between received chunks
+    total_timeout: float = 30.0  # seconds for a whole download, start to finish
+    max_feed_bytes: int = 5_000_000  # default per-source download cap (decoded)
+    breaker_threshold: int = 3  # consecutive failed polls that open a source's circuit; 0 = never
+    breaker_cooldown: float = 300.0  # seconds an open circuit waits before one trial poll
+    timeout_factor: float = 4.0  # adaptive timeout: this times a source's p95 fetch time; 0 = off
+    min_timeout: float = 5.0  # the adaptive timeout never goes below this, seconds
+    hedge_threshold: float = 0.0  # hedge sources whose p90 fetch time is under this, s; 0 = off
+    parse_executor: Literal["thread", "process", "inline"] = "thread"
+    parse_workers: int | None = None  # pool size; None lets the pool decide
+    refresh_interval: int = 60  # default per-source poll interval, seconds
+    min_interval: int = 15  # fastest any source is polled
+    max_interval: int = 3600  # slowest any source is polled (errors, ttl)
+    max_events: int = MAX_EVENTS  # events kept in memory and in the on-disk cache
+    web_cache_ttl: int = 60  # web backend: serve fetched events this long, seconds
+    web_stale_ttl: int = 300  # then serve stale ones this long while refreshing
+    collector_socket: str = "~/.warmonitor.sock"  # where `warmonitor collect` listens
+    collector_group: str = ""  # group whose users may attach too; "" = only the collector's user
+    archive_dir: str = ""  # long-term event archive, e.g. "~/.warmonitor_archive"; "" = off
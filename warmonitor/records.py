@@ -0,0 +1,168 @@
+"""Compact in-memory event representation for warmonitor.
+
+:class:`warmonitor.models.Event` is the validated schema used at the edges
+(the on-disk cache and the web API). Inside the fetch → merge → display path
+events are :class:`EventRecord` tuples instead: no per-instance ``__dict__``,
+one shared :class:`SourceRef` per source, interned keyword tuples, an integer
+epoch timestamp and a plain-text summary capped at :data:`SUMMARY_LIMIT`
+characters. That keeps 100k+ retained events to tens of megabytes.
+
+Records expose the same read-only attribute names as ``Event``
+(``published``, ``source_name``, ``keywords_matched``, ...) so display code
+works with either.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import sys
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from warmonitor.models import Event
+
+MAX_EVENTS = 200  # default for the max_events setting
+SUMMARY_LIMIT = 280  # characters of plain-text summary kept per event
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class SourceRef(NamedTuple):
+    """The source fields every event carries, shared between its events."""
+
+    id: str
+    name: str
+    credibility: str
+
+
+_source_refs: dict[SourceRef, SourceRef] = {}
+_keyword_sets: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def source_ref(source_id: str, name: str, credibility: str) -> SourceRef:
+    """The shared :class:`SourceRef` for these values."""
+    ref = SourceRef(source_id, name, credibility)
+    return _source_refs.setdefault(ref, ref)
+
+
+def intern_keywords(keywords: list[str] | tuple[str, ...]) -> tuple[str, ...]:
+    """A shared tuple for a matched-keyword combination."""
+    key = tuple(keywords)
+    shared = _keyword_sets.get(key)
+    if shared is None:
+        shared = _keyword_sets[key] = tuple(sys.intern(k) for k in key)
+    return shared
+
+
+def reintern(record: EventRecord) -> EventRecord:
+    """*record* using the shared source and keyword tuple, e.g. once unpickled."""
+    return record._replace(
+        source=_source_refs.setdefault(record.source, record.source),
+        keywords=intern_keywords(record.keywords),
+    )
+
+
+def compact_summary(summary: str) -> str:
+    """Strip markup from *summary*, collapse whitespace and cap its length."""
+    text = _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", summary))).strip()
+    if len(text) > SUMMARY_LIMIT:
+        text = text[: SUMMARY_LIMIT - 1].rstrip() + "…"
+    return text
+
+
+class EventRecord(NamedTuple):
+    id: str
+    title: str
+    summary: str  # plain text, at most SUMMARY_LIMIT characters
+    url: str
+    ts: int  # published, as epoch seconds
+    source: SourceRef
+    keywords: tuple[str, ...]
+    severity: int  # 1-5
+
+    @property
+    def published(self) -> datetime:
+        return datetime.fromtimestamp(self.ts, tz=UTC)
+
+    @property
+    def source_id(self) -> str:
+        return self.source.id
+
+    @property
+    def source_name(self) -> str:
+        return self.source.name
+
+    @property
+    def credibility(self) -> str:
+        return self.source.credibility
+
+    @property
+    def keywords_matched(self) -> list[str]:
+        return list(self.keywords)
+
+    @classmethod
+    def from_event(cls, event: Event) -> EventRecord:
+        return cls(
+            id=event.id,
+            title=event.title,
+            summary=compact_summary(event.summary),
+            url=event.url,
+            ts=int(event.published.timestamp()),
+            source=source_ref(event.source_id, event.source_name, event.credibility),
+            keywords=intern_keywords(event.keywords_matched),
+            severity=event.severity,
+        )
+
+    @classmethod
+    def from_dict(cls, item: dict) -> EventRecord:
+        """Build from ``Event`` JSON written by warmonitor itself, unvalidated.
+
+        Used for the cache and collector messages, where skipping Pydantic
+        gets the feed on screen sooner; raises ``KeyError``/``ValueError`` on
+        malformed input.
+        """
+        return cls(
+            id=item["id"],
+            title=item["title"],
+            summary=compact_summary(item["summary"]),
+            url=item["url"],
+            ts=int(datetime.fromisoformat(item["published"]).timestamp()),
+            source=source_ref(item["source_id"], item["source_name"], item["credibility"]),
+            keywords=intern_keywords(item["keywords_matched"]),
+            severity=int(item["severity"]),
+        )
+
+    def to_dict(self) -> dict:
+        """``Event`` JSON, as :meth:`to_event` would dump it, without Pydantic."""
+        published = self.published.isoformat()
+        return {
+            "id": self.id,
+            "title": self.title,
+            "summary": self.summary,
+            "url": self.url,
+            "published": published.removesuffix("+00:00") + "Z",
+            "source_id": self.source.id,
+            "source_name": self.source.name,
+            "credibility": self.source.credibility,
+            "keywords_matched": list(self.keywords),
+            "severity": self.severity,
+        }
+
+    def to_event(self) -> Event:
+        from warmonitor.models import Event  # Pydantic stays off the startup path
+
+        return Event(
+            id=self.id,
+            title=self.title,
+            summary=self.summary,
+            url=self.url,
+            published=self.published,
+            source_id=self.source.id,
+            source_name=self.source.name,
+            credibility=self.source.credibility,
+            keywords_matched=list(self.keywords),
+            severity=self.severity,
+        )
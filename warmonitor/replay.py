@@ -0,0 +1,386 @@
+"""Record and replay feed traffic for warmonitor.
+
+``warmonitor --record DIR`` wraps the HTTP client's transport so that every
+feed exchange is stored as it happens: status, headers, the raw (still
+compressed) body and how long the headers and the body took, or the error
+that ended it::
+
+    DIR/recording.json     format version and wall-clock start
+    DIR/exchanges.jsonl    one line per request, in the order they were sent
+    DIR/bodies/<sha256>    response bodies, stored once however often repeated
+
+``warmonitor --replay DIR --speed 10x`` serves the exchanges back from a
+:class:`ReplayServer` on ``127.0.0.1``. Its transport sends every request
+there instead of upstream, so the real client, fetcher, parser, scorer and
+TUI all run. Each URL gets its recorded responses in order (the last one
+repeats once they run out), headers and bodies are delayed by their recorded
+times divided by the speed, and recorded errors are raised again with their
+original class. The app runs on a :class:`~warmonitor.clock.ScaledClock`
+starting at the recording's start, with a seeded scheduler and no cache, so
+replaying a recording produces the same feed and DEFCON every time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+
+_FORMAT = 1
+_META = "recording.json"
+_EXCHANGES = "exchanges.jsonl"
+_BODIES = "bodies"
+_CHUNK = 64 * 1024  # bytes per paced write of a replayed body
+_HOP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding", "content-length"})
+_URL_HEADER = "x-warmonitor-replay-url"  # the upstream URL a replayed request was for
+_ERROR_HEADER = "x-warmonitor-replay-error"  # class of the error that ended the exchange
+_FAILED = 599  # status sent for exchanges that got no response
+
+
+class Exchange(NamedTuple):
+    """One recorded request and what came back."""
+
+    at: float  # seconds after the recording started
+    method: str
+    url: str
+    status: int  # 0 when no response arrived
+    headers: list[tuple[str, str]]
+    body: str | None  # sha256 of the body under bodies/
+    ttfb: float  # seconds until the response headers, or until the error
+    download: float  # seconds reading the body
+    error: str = ""  # class of the error that ended the exchange
+    complete: bool = True  # False if the client stopped reading the body early
+
+
+def _error_name(exc: BaseException) -> str:
+    # The fetcher's total_timeout cancels the request; it sees a TimeoutError.
+    if isinstance(exc, asyncio.CancelledError):
+        return "TimeoutError"
+    return type(exc).__name__
+
+
+def _replayed_error(name: str, request: httpx.Request) -> Exception:
+    cls = getattr(httpx, name, None)
+    if isinstance(cls, type) and issubclass(cls, httpx.RequestError):
+        return cls(f"replayed {name}", request=request)
+    if name == "TimeoutError":
+        return TimeoutError(f"replayed {name}")
+    return httpx.TransportError(f"replayed {name}")
+
+
+# --- Recording ---
+
+
+class Recorder:
+    """Writes the exchanges of a client built with :meth:`wrap` into *path*."""
+
+    def __init__(self, path: Path) -> None:
+        if (path / _EXCHANGES).exists():
+            raise FileExistsError(f"{path} already holds a recording")
+        self.path = path
+        (path / _BODIES).mkdir(parents=True, exist_ok=True)
+        meta = {"format": _FORMAT, "started": time.time()}
+        (path / _META).write_text(json.dumps(meta), encoding="utf-8")
+        self._origin = time.monotonic()
+        self._log = open(path / _EXCHANGES, "a", encoding="utf-8")  # noqa: SIM115 - see close()
+
+    def wrap(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        return _RecordingTransport(self, transport)
+
+    def write(self, exchange: Exchange, body: bytes | None) -> None:
+        if self._log.closed:
+            return  # a request cancelled while shutting down
+        if body is not None:
+            target = self.path / _BODIES / exchange.body
+            if not target.exists():
+                target.write_bytes(body)
+        self._log.write(json.dumps(exchange._asdict(), separators=(",", ":")) + "\n")
+        self._log.flush()
+
+    def elapsed(self, since: float) -> float:
+        return since - self._origin
+
+    def close(self) -> None:
+        self._log.close()
+
+
+class _RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, recorder: Recorder, inner: httpx.AsyncBaseTransport) -> None:
+        self._recorder = recorder
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.monotonic()
+        exchange = Exchange(
+            self._recorder.elapsed(sent), request.method, str(request.url), 0, [], None, 0.0, 0.0
+        )
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException as exc:
+            error = _error_name(exc)
+            self._recorder.write(
+                exchange._replace(ttfb=time.monotonic() - sent, error=error), None
+            )
+            raise
+        exchange = exchange._replace(
+            status=response.status_code,
+            headers=response.headers.multi_items(),
+            ttfb=time.monotonic() - sent,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(self._recorder, exchange, response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            self._recorder.close()
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    def __init__(
+        self, recorder: Recorder, exchange: Exchange, stream: httpx.AsyncByteStream
+    ) -> None:
+        self._recorder = recorder
+        self._exchange = exchange
+        self._stream = stream
+        self._chunks: list[bytes] = []
+        self._started = time.monotonic()
+        self._ended: float | None = None
+        self._error = ""
+        self._complete = False
+        self._written = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                self._chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            raise
+        except BaseException as exc:
+            self._error = _error_name(exc)
+            raise
+        else:
+            self._complete = True
+        finally:
+            self._ended = time.monotonic()
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._written:
+                self._written = True
+                body = b"".join(self._chunks)
+                ended = self._ended or time.monotonic()
+                exchange = self._exchange._replace(
+                    body=hashlib.sha256(body).hexdigest(),
+                    download=ended - self._started,
+                    error=self._error,
+                    complete=self._complete,
+                )
+                self._recorder.write(exchange, body)
+
+
+# --- Replay ---
+
+
+class Recording:
+    """A recording directory, read back."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        meta = json.loads((path / _META).read_text(encoding="utf-8"))
+        if meta.get("format") != _FORMAT:
+            raise ValueError(f"{path}: unsupported recording format {meta.get('format')!r}")
+        self.started: float = meta["started"]
+        self.exchanges: list[Exchange] = []
+        with open(path / _EXCHANGES, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue  # a torn last line from an interrupted recording
+                item["headers"] = [tuple(h) for h in item["headers"]]
+                self.exchanges.append(Exchange(**item))
+
+    def body(self, exchange: Exchange) -> bytes:
+        if exchange.body is None:
+            return b""
+        return (self.path / _BODIES / exchange.body).read_bytes()
+
+
+def _head(status: int, headers: list[tuple[str, str]]) -> bytes:
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = "Replayed"
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class ReplayServer:
+    """Serves a :class:`Recording` on ``127.0.0.1``, *speed* times faster than recorded."""
+
+    def __init__(self, recording: Recording, speed: float = 1.0) -> None:
+        self.recording = recording
+        self.speed = speed
+        self.port = 0
+        self._queues: dict[tuple[str, str], list[Exchange]] = {}
+        for exchange in recording.exchanges:
+            self._queues.setdefault((exchange.method, exchange.url), []).append(exchange)
+        self._served: dict[tuple[str, str], int] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def wrap(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        """*transport* redirected to this server; call :meth:`start` first."""
+        return _ReplayTransport(transport, self.port)
+
+    def next_exchange(self, method: str, url: str) -> Exchange | None:
+        """The recorded exchange for the next request to *url*."""
+        queue = self._queues.get((method, url))
+        if not queue:
+            return None
+        n = self._served.get((method, url), 0)
+        self._served[(method, url)] = n + 1
+        return queue[min(n, len(queue) - 1)]
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while request := await self._read_request(reader):
+                method, url = request
+                if not await self._respond(writer, self.next_exchange(method, url)):
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str] | None:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length", "0")
+        if length.isdigit() and int(length):
+            await reader.readexactly(int(length))
+        return method, headers.get(_URL_HEADER, target)
+
+    async def _respond(self, writer: asyncio.StreamWriter, exchange: Exchange | None) -> bool:
+        """Send one response; ``False`` if the connection must close after it."""
+        if exchange is None:
+            writer.write(_head(404, [("content-length", "0")]))
+            await writer.drain()
+            return True
+        await asyncio.sleep(exchange.ttfb / self.speed)
+        if not exchange.status:
+            writer.write(_head(_FAILED, [(_ERROR_HEADER, exchange.error), ("content-length", "0")]))
+            await writer.drain()
+            return True
+        body = self.recording.body(exchange)
+        headers = [(k, v) for k, v in exchange.headers if k.lower() not in _HOP_HEADERS]
+        length = len(body)
+        if exchange.error:
+            headers.append((_ERROR_HEADER, exchange.error))
+        elif not exchange.complete:
+            # The client gave up on the body (it was over the size cap): declare
+            # what upstream declared and hang up after the part that was read.
+            declared = {k.lower(): v for k, v in exchange.headers}.get("content-length", "")
+            if declared.isdigit():
+                length = max(length, int(declared))
+        headers.append(("content-length", str(length)))
+        writer.write(_head(exchange.status, headers))
+        await writer.drain()
+        chunks = max(1, -(-len(body) // _CHUNK))
+        for start in range(0, len(body), _CHUNK):
+            await asyncio.sleep(exchange.download / self.speed / chunks)
+            writer.write(body[start : start + _CHUNK])
+            await writer.drain()
+        return length == len(body)
+
+
+class _ReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, port: int) -> None:
+        self._inner = inner
+        self._port = port
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        headers = [(k, v) for k, v in request.headers.multi_items() if k != "host"]
+        headers += [("host", f"127.0.0.1:{self._port}"), (_URL_HEADER, str(request.url))]
+        local = httpx.Request(
+            request.method,
+            request.url.copy_with(scheme="http", host="127.0.0.1", port=self._port),
+            headers=headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+        response = await self._inner.handle_async_request(local)
+        error = response.headers.get(_ERROR_HEADER)
+        if error is None:
+            return response
+        if response.status_code == _FAILED:
+            await response.aclose()
+            raise _replayed_error(error, request)
+        return httpx.Response(
+            response.status_code,
+            headers=[h for h in response.headers.multi_items() if h[0] != _ERROR_HEADER],
+            stream=_FailingStream(response.stream, _replayed_error(error, request)),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _FailingStream(httpx.AsyncByteStream):
+    """A replayed body that ends with the error that cut the recorded one short."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, error: Exception) -> None:
+        self._stream = stream
+        self._error = error
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+        raise self._error
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+def load_recording(path: Path) -> Recording:
+    """Read the recording in *path*, raising ``ValueError`` with a readable message."""
+    try:
+        return Recording(path)
+    except FileNotFoundError:
+        raise ValueError(f"{path} does not hold a recording") from None
+    except (OSError, KeyError, TypeError) as exc:
+        raise ValueError(f"{path}: cannot read recording: {exc}") from None
+
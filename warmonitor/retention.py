@@ -0,0 +1,141 @@
+"""Bounded, incrementally ordered event retention for warmonitor.
+
+:class:`RetainedEvents` holds the newest ``max_events`` events and keeps two
+orderings of them up to date as batches arrive: newest first (the feed) and
+most severe first (the ``S`` sort). A merge costs ``O(new · log K)``
+comparisons for ``K`` retained events: each new or changed event is placed
+with a binary search, and the oldest events fall off the end once the limit
+is passed. Nothing is re-sorted, and switching the feed between the two
+orders swaps one prepared list for the other. Shared by the TUI, the
+collector and the web backend.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+from warmonitor.records import MAX_EVENTS, EventRecord
+
+
+class RetainedEvents:
+    """The newest *limit* events, kept in publication and in severity order.
+
+    Events published in the same second keep the order a stable sort of
+    "new or changed events in batch order, then what was retained" would
+    give them.
+    """
+
+    def __init__(self, limit: int = MAX_EVENTS, events: Iterable[EventRecord] = ()) -> None:
+        self.limit = max(1, limit)
+        self._events: dict[str, EventRecord] = {}
+        self._seqs: dict[str, int] = {}  # id → arrival rank, higher = later batch
+        self._next_seq = 0
+        self._by_time: list[tuple[int, int, str]] = []  # (-ts, -seq, id): newest first
+        self._by_severity: list[tuple[int, int, int, str]] = []  # (-severity, -ts, -seq, id)
+        self._views: dict[str, list[EventRecord]] = {}  # materialised orders, until changed
+        self.merge(events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, event_id: object) -> bool:
+        return event_id in self._events
+
+    def get(self, event_id: str) -> EventRecord | None:
+        return self._events.get(event_id)
+
+    def _keys(self, event: EventRecord, seq: int) -> tuple[tuple, tuple]:
+        return (-event.ts, -seq, event.id), (-event.severity, -event.ts, -seq, event.id)
+
+    def _insert(self, event: EventRecord, seq: int) -> None:
+        by_time, by_severity = self._keys(event, seq)
+        self._events[event.id] = event
+        self._seqs[event.id] = seq
+        insort(self._by_time, by_time)
+        insort(self._by_severity, by_severity)
+
+    def _discard(self, event_id: str) -> None:
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return
+        by_time, by_severity = self._keys(event, self._seqs.pop(event_id))
+        del self._by_time[bisect_left(self._by_time, by_time)]
+        del self._by_severity[bisect_left(self._by_severity, by_severity)]
+
+    def _ranked(self, batch: Iterable[EventRecord]) -> list[tuple[int, EventRecord]]:
+        """*batch* without repeated ids, each with a rank above every earlier batch."""
+        ids: set[str] = set()
+        events: list[EventRecord] = []
+        for event in batch:
+            if event.id in ids:
+                continue
+            ids.add(event.id)
+            events.append(event)
+        top = self._next_seq + len(events)
+        self._next_seq = top + 1
+        return [(top - i, e) for i, e in enumerate(events)]
+
+    def merge(self, new: Iterable[EventRecord]) -> tuple[list[EventRecord], list[str]]:
+        """Merge freshly fetched *new* events, keeping the newest :attr:`limit`.
+
+        Returns ``(added, removed)``: the retained events that are new or
+        changed (newest first), and the ids of previously retained events
+        that dropped out.
+        """
+        replaced: list[tuple[int, EventRecord]] = []
+        fresh: list[tuple[int, EventRecord]] = []
+        for seq, event in self._ranked(new):
+            old = self._events.get(event.id)
+            if old != event:
+                (fresh if old is None else replaced).append((seq, event))
+        added: dict[str, EventRecord] = {}
+        removed: list[str] = []
+        # Replacements first: they keep the size, so the window only moves
+        # forward while fresh events are added and eviction stays final.
+        for seq, event in replaced:
+            self._discard(event.id)
+            self._insert(event, seq)
+            added[event.id] = event
+        fresh_ids = {event.id for _, event in fresh}
+        for seq, event in fresh:
+            full = len(self._events) >= self.limit
+            if full and self._keys(event, seq)[0] > self._by_time[-1]:
+                continue  # older than everything retained
+            self._insert(event, seq)
+            added[event.id] = event
+            if len(self._events) > self.limit:
+                evicted = self._by_time[-1][2]
+                self._discard(evicted)
+                added.pop(evicted, None)
+                if evicted not in fresh_ids:
+                    removed.append(evicted)
+        if not added and not removed:
+            return [], []
+        self._views.clear()
+        order = self._seqs
+        ordered = sorted(added.values(), key=lambda e: (-e.ts, -order[e.id]))
+        return ordered, removed
+
+    def apply(self, added: Iterable[EventRecord], removed: Iterable[str]) -> None:
+        """Apply a delta computed elsewhere (a collector's), without the limit."""
+        for event_id in removed:
+            self._discard(event_id)
+        for seq, event in self._ranked(added):
+            self._discard(event.id)
+            self._insert(event, seq)
+        self._views.clear()
+
+    def newest(self) -> list[EventRecord]:
+        """Retained events, newest first. Do not modify the returned list."""
+        view = self._views.get("time")
+        if view is None:
+            view = self._views["time"] = [self._events[k[2]] for k in self._by_time]
+        return view
+
+    def by_severity(self) -> list[EventRecord]:
+        """Retained events, most severe first, then newest first. Do not modify."""
+        view = self._views.get("severity")
+        if view is None:
+            view = self._views["severity"] = [self._events[k[3]] for k in self._by_severity]
+        return view
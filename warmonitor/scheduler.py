@@ -0,0 +1,158 @@
+"""Per-source adaptive polling for warmonitor.
+
+Each source gets its own interval instead of one global refresh:
+
+- the base interval is ``Source.interval`` or the ``refresh_interval`` setting;
+- a feed's ``<ttl>`` and ``Cache-Control: max-age`` act as floors, so a feed
+  that says it changes hourly is not polled every minute;
+- errors back off exponentially, and ``Retry-After`` is always honoured;
+- sources producing HIGH/CRITICAL events are polled faster;
+- every delay gets random jitter so sources do not fire in lockstep.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import re
+from collections.abc import Callable, Iterable, Mapping
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+
+from warmonitor import clock as _clock
+from warmonitor.models import Source
+
+_MAX_AGE_RE = re.compile(r"(?:^|[,\s])max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def _max_age(headers: Mapping[str, str] | None) -> float | None:
+    if not headers:
+        return None
+    match = _MAX_AGE_RE.search(headers.get("cache-control", ""))
+    return float(match.group(1)) if match else None
+
+
+def _retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP date."""
+    if not headers or not (value := headers.get("retry-after", "").strip()):
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - _clock.now()).total_seconds())
+
+
+class _SourceSchedule:
+    __slots__ = ("base", "errors", "interval", "next_due")
+
+    def __init__(self, base: float, next_due: float) -> None:
+        self.base = base
+        self.interval = base
+        self.next_due = next_due
+        self.errors = 0
+
+
+class PollScheduler:
+    """Tracks when each source is next due for a fetch."""
+
+    def __init__(
+        self,
+        sources: Iterable[Source] = (),
+        default_interval: float = 60,
+        min_interval: float = 15,
+        max_interval: float = 3600,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = _clock.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._schedules: dict[str, _SourceSchedule] = {}
+        for source in sources:
+            self.add(source)
+
+    def add(self, source: Source) -> None:
+        """Start scheduling *source*; a new source is due immediately."""
+        base = float(source.interval or self.default_interval)
+        self._schedules[source.id] = _SourceSchedule(base, self._clock())
+
+    def remove(self, source_id: str) -> None:
+        self._schedules.pop(source_id, None)
+
+    def interval(self, source_id: str) -> float:
+        return self._schedules[source_id].interval
+
+    def next_due(self, source_id: str) -> float:
+        return self._schedules[source_id].next_due
+
+    def due(self) -> list[str]:
+        """Return the ids of sources due now and mark them in flight.
+
+        In-flight sources are not returned again until their result is
+        recorded with :meth:`record_success` or :meth:`record_error`.
+        """
+        now = self._clock()
+        ready = [sid for sid, sched in self._schedules.items() if sched.next_due <= now]
+        for sid in ready:
+            self._schedules[sid].next_due = math.inf
+        return ready
+
+    def record_success(
+        self,
+        source_id: str,
+        headers: Mapping[str, str] | None = None,
+        ttl: int | None = None,
+        max_severity: int = 0,
+    ) -> None:
+        """Reschedule after a successful (or ``304``) fetch.
+
+        *ttl* is the feed's ``<ttl>`` in minutes; *max_severity* is the highest
+        severity among the events this fetch produced.
+        """
+        sched = self._schedules.get(source_id)
+        if sched is None:
+            return
+        sched.errors = 0
+        interval = sched.base
+        if max_severity >= 5:
+            interval /= 4
+        elif max_severity >= 4:
+            interval /= 2
+        for floor in (ttl * 60 if ttl else None, _max_age(headers)):
+            if floor:
+                interval = max(interval, min(floor, self.max_interval))
+        self._reschedule(sched, interval)
+
+    def record_error(self, source_id: str, headers: Mapping[str, str] | None = None) -> None:
+        """Back off exponentially after a failed fetch."""
+        sched = self._schedules.get(source_id)
+        if sched is None:
+            return
+        sched.errors += 1
+        interval = sched.base * 2 ** min(sched.errors, 16)
+        self._reschedule(sched, interval, floor=_retry_after(headers))
+
+    def defer(self, source_id: str, delay: float) -> None:
+        """Make *source_id* due again in *delay* seconds, e.g. while its circuit is open."""
+        sched = self._schedules.get(source_id)
+        if sched is not None:
+            sched.next_due = self._clock() + delay
+
+    def _reschedule(
+        self, sched: _SourceSchedule, interval: float, floor: float | None = None
+    ) -> None:
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        sched.interval = interval
+        delay = interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+        if floor is not None:
+            delay = max(delay, floor)
+        sched.next_due = self._clock() + delay
@@ -0,0 +1,316 @@
+"""Full-text search and facet counts over retained events.
+
+:class:`SearchIndex` is an in-memory inverted index over each event's title,
+summary and matched keywords, kept in step with the feed through
+:meth:`SearchIndex.apply` like :class:`~warmonitor.analytics.EventStats`:
+
+- every event gets a document number, and each word maps to an ``array`` of
+  document numbers, so postings for 100k events cost a few bytes per word;
+- removing an event only unlinks its document; postings pointing at removed
+  documents are dropped in one pass once they outnumber live ones;
+- facet values (source, severity, matched keyword) map to sets of document
+  numbers, so facet counts for a result are set intersections rather than a
+  pass over every matching event;
+- documents are also kept in publication order, so the newest matches of a
+  broad query are found without sorting every match.
+
+Query syntax, as parsed by :func:`parse_query`::
+
+    strike tehran     events containing both words
+    nucl*             words starting with "nucl"
+    -drill            events without "drill"
+    source:bbc        from source id "bbc" (repeat for any of several)
+    severity:4        severity 4 or higher
+    keyword:iran      matched the "Iran" keyword (quote multi-word ones)
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from warmonitor.records import EventRecord
+
+_WORD_RE = re.compile(r"\w+")
+_PART_RE = re.compile(r'(-?)(?:(\w+):)?("[^"]*"?|\S+)')
+_FIELDS = ("source", "severity", "keyword")
+_MIN_PREFIX = 2  # shortest prefix a ``word*`` term may expand
+_MAX_EXPANSIONS = 256  # vocabulary words one prefix term may expand to
+_COMPACT_MIN = 1024  # removed documents tolerated before compacting postings
+_BULK = 64  # added events above which the publication order is re-sorted
+
+
+class QueryError(ValueError):
+    pass
+
+
+def words(text: str) -> set[str]:
+    """The searchable words in *text*: casefolded, at least two characters."""
+    return {word for word in _WORD_RE.findall(text.casefold()) if len(word) > 1}
+
+
+class Query(NamedTuple):
+    terms: tuple[str, ...] = ()  # words every match contains
+    prefixes: tuple[str, ...] = ()  # every match contains a word starting with each
+    excluded: tuple[str, ...] = ()  # words no match contains
+    sources: frozenset[str] = frozenset()  # source ids, any of
+    keywords: frozenset[str] = frozenset()  # casefolded matched keywords, all of
+    min_severity: int = 1
+    since: int = 0  # only events published after this epoch second
+
+
+def parse_query(text: str, prefix: bool = False) -> Query:
+    """Parse a search string (syntax in the module docstring).
+
+    With *prefix*, the last word also matches longer words, for searching
+    as the user types.
+    """
+    terms: list[str] = []
+    prefixes: list[str] = []
+    excluded: list[str] = []
+    sources: set[str] = set()
+    keywords: set[str] = set()
+    min_severity = 1
+    parts = _PART_RE.findall(text)
+    for i, (negate, field, value) in enumerate(parts):
+        value = value.strip('"')
+        if field and field.lower() not in _FIELDS:
+            value = f"{field}:{value}"
+            field = ""
+        field = field.lower()
+        if field and negate:
+            raise QueryError(f"{field}: filters cannot be negated")
+        if field == "source":
+            sources.update(v for v in value.split(",") if v)
+        elif field == "keyword":
+            keywords.add(value.casefold())
+        elif field == "severity":
+            try:
+                min_severity = max(min_severity, min(int(value.rstrip("+")), 5))
+            except ValueError:
+                raise QueryError(f"invalid severity: {value!r}") from None
+        elif negate:
+            excluded.extend(words(value))
+        else:
+            found = _WORD_RE.findall(value.casefold())
+            expand = value.endswith("*") or (prefix and i == len(parts) - 1)
+            if expand and found and len(found[-1]) >= _MIN_PREFIX:
+                prefixes.append(found.pop())
+            terms.extend(word for word in found if len(word) > 1)
+    return Query(
+        tuple(terms),
+        tuple(prefixes),
+        tuple(excluded),
+        frozenset(sources),
+        frozenset(keywords),
+        min_severity,
+    )
+
+
+class Facets(NamedTuple):
+    """Matching event counts per facet value, most common first."""
+
+    source: dict[str, int]
+    severity: dict[int, int]
+    keyword: dict[str, int]
+
+
+class SearchResult(NamedTuple):
+    events: list[EventRecord]  # matches, newest first, up to the requested limit
+    total: int  # number of matches
+    facets: Facets
+
+
+def _counts(facet: dict, docs: set[int], everything: bool) -> dict:
+    counts = {}
+    for value, members in facet.items():
+        n = len(members) if everything else len(docs.intersection(members))
+        if n:
+            counts[value] = n
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+class SearchIndex:
+    """Incremental inverted index with source, severity and keyword facets."""
+
+    def __init__(self, events: Iterable[EventRecord] = ()) -> None:
+        self._docs: list[EventRecord | None] = []  # document number → event
+        self._ts = array("q")  # document number → published epoch seconds
+        self._order: list[int] = []  # document numbers by (published, number)
+        self._doc_of: dict[str, int] = {}  # event id → document number
+        self._live: set[int] = set()
+        self._postings: dict[str, array] = {}  # word → ascending document numbers
+        self._vocab: list[str] = []  # sorted words, for prefix terms
+        self._sources: dict[str, set[int]] = {}
+        self._severities: dict[int, set[int]] = {}
+        self._keywords: dict[str, set[int]] = {}
+        self.apply(events, ())
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def add(self, event: EventRecord) -> None:
+        """Index *event*, replacing any earlier version."""
+        insort(self._order, self._add(event), key=self._ts.__getitem__)
+        self._maybe_compact()
+
+    def _add(self, event: EventRecord) -> int:
+        self._unlink(event.id)
+        doc = len(self._docs)
+        self._docs.append(event)
+        self._ts.append(event.ts)
+        self._doc_of[event.id] = doc
+        self._link(doc, event)
+        for word in words(f"{event.title} {event.summary} {' '.join(event.keywords)}"):
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = array("I")
+                insort(self._vocab, word)
+            posting.append(doc)
+        return doc
+
+    def discard(self, event_id: str) -> None:
+        """Forget the event with *event_id*, if present."""
+        self._unlink(event_id)
+        self._maybe_compact()
+
+    def _unlink(self, event_id: str) -> None:
+        doc = self._doc_of.pop(event_id, None)
+        if doc is None:
+            return
+        event = self._docs[doc]
+        self._docs[doc] = None
+        self._live.discard(doc)
+        self._sources[event.source.id].discard(doc)
+        self._severities[event.severity].discard(doc)
+        for keyword in event.keywords:
+            self._keywords[keyword].discard(doc)
+
+    def apply(self, added: Iterable[EventRecord], removed: Iterable[str]) -> None:
+        """Apply one merge: index *added* events and drop *removed* ids."""
+        for event_id in removed:
+            self._unlink(event_id)
+        added = list(added)
+        if len(added) <= _BULK:
+            for event in added:
+                insort(self._order, self._add(event), key=self._ts.__getitem__)
+        else:
+            self._order.extend([self._add(event) for event in added])
+            self._order.sort(key=self._ts.__getitem__)
+        self._maybe_compact()
+
+    def search(
+        self, query: Query | str, prefix: bool = False, limit: int | None = None
+    ) -> SearchResult:
+        """The newest *limit* (default all) events matching *query*.
+
+        A string is parsed with :func:`parse_query` (which may raise
+        :class:`QueryError`); an empty query matches everything. Facet counts
+        cover every match, not just those returned.
+        """
+        if isinstance(query, str):
+            query = parse_query(query, prefix)
+        docs = self._match(query)
+        limit = len(docs) if limit is None else limit
+        if len(docs) * 8 < len(self._live):
+            # Few matches: sorting them beats scanning the publication order.
+            ordered = sorted(sorted(docs, reverse=True), key=self._ts.__getitem__, reverse=True)
+            events = [self._docs[doc] for doc in ordered[:limit]]
+        else:
+            events = []
+            for doc in reversed(self._order):
+                if len(events) >= limit:
+                    break
+                if doc in docs:
+                    events.append(self._docs[doc])
+        return SearchResult(events, len(docs), self._facets(docs))
+
+    def facets(self, event_ids: Iterable[str]) -> Facets:
+        """Facet counts over the indexed events among *event_ids*."""
+        return self._facets({self._doc_of[i] for i in event_ids if i in self._doc_of})
+
+    def _link(self, doc: int, event: EventRecord) -> None:
+        self._live.add(doc)
+        self._sources.setdefault(event.source.id, set()).add(doc)
+        self._severities.setdefault(event.severity, set()).add(doc)
+        for keyword in event.keywords:
+            self._keywords.setdefault(keyword, set()).add(doc)
+
+    def _maybe_compact(self) -> None:
+        if len(self._docs) - len(self._live) > max(len(self._live), _COMPACT_MIN):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live documents and drop postings for removed ones."""
+        renumber = array("i", [-1]) * len(self._docs)
+        live = [event for event in self._docs if event is not None]
+        n = 0
+        for doc, event in enumerate(self._docs):
+            if event is not None:
+                renumber[doc] = n
+                n += 1
+        self._order = [renumber[d] for d in self._order if renumber[d] >= 0]
+        self._ts = array("q", [event.ts for event in live])
+        postings = {}
+        for word, posting in self._postings.items():
+            kept = array("I", [renumber[d] for d in posting if renumber[d] >= 0])
+            if kept:
+                postings[word] = kept
+        self._postings = postings
+        self._vocab = sorted(postings)
+        self._docs = live
+        self._doc_of = {event.id: doc for doc, event in enumerate(live)}
+        self._live = set()
+        self._sources, self._severities, self._keywords = {}, {}, {}
+        for doc, event in enumerate(live):
+            self._link(doc, event)
+
+    def _expand(self, prefix: str) -> set[int]:
+        docs: set[int] = set()
+        start = bisect_left(self._vocab, prefix)
+        for word in self._vocab[start : start + _MAX_EXPANSIONS]:
+            if not word.startswith(prefix):
+                break
+            docs.update(self._postings[word])
+        return docs
+
+    def _match(self, query: Query) -> set[int]:
+        groups: list[Iterable[int]] = []
+        for term in query.terms:
+            groups.append(self._postings.get(term, ()))
+        for prefix in query.prefixes:
+            groups.append(self._expand(prefix))
+        if query.sources:
+            groups.append(set().union(*(self._sources.get(s, ()) for s in query.sources)))
+        for keyword in query.keywords:
+            matched = [docs for kw, docs in self._keywords.items() if kw.casefold() == keyword]
+            groups.append(set().union(*matched))
+        if query.since:
+            start = bisect_right(self._order, query.since, key=self._ts.__getitem__)
+            groups.append(self._order[start:])
+        if query.min_severity > 1:
+            severe = [d for level, d in self._severities.items() if level >= query.min_severity]
+            groups.append(set().union(*severe))
+        if not groups:
+            result = set(self._live)
+        else:
+            groups.sort(key=len)
+            result = self._live.intersection(groups[0])
+            for group in groups[1:]:
+                if not result:
+                    break
+                result.intersection_update(group)
+        for term in query.excluded:
+            result.difference_update(self._postings.get(term, ()))
+        return result
+
+    def _facets(self, docs: set[int]) -> Facets:
+        everything = len(docs) == len(self._live)
+        return Facets(
+            _counts(self._sources, docs, everything),
+            _counts(self._severities, docs, everything),
+            _counts(self._keywords, docs, everything),
+        )
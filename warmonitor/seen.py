@@ -0,0 +1,178 @@
+"""Per-source index of feed entries that have already been ingested.
+
+Feeds repeat most of their entries every poll. Looking each entry's
+canonical URL up here lets :func:`warmonitor.fetcher._parse_feed` drop known
+entries before keyword matching, severity scoring and ``Event`` validation.
+A digest of the last parsed body also lets byte-identical feeds from servers
+without ``ETag`` support skip parsing altogether.
+
+Each source keeps an exact set of its most recent keys plus a Bloom filter
+covering a longer history in a fixed amount of memory. The filter is reset
+once it has absorbed its capacity so its false-positive rate stays bounded;
+the exact set still covers everything a live feed is likely to repeat.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+_TRACKING_PARAMS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ocid", "cmpid"}
+)
+_HOST_PREFIXES = ("www.", "m.", "amp.")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Normalise *url* so trivially different links to one article compare equal.
+
+    Tracking parameters (``utm_*``, ``fbclid``, ...) and the fragment are
+    dropped, the host is lowercased without ``www.``/``m.``/``amp.``, http and
+    https are treated alike, and the remaining query is sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+            break
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    if scheme in _DEFAULT_PORTS:
+        scheme = "https"
+    canonical = f"{scheme}://{host}{path}"
+    return f"{canonical}?{urlencode(query)}" if query else canonical
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, rare false positives."""
+
+    __slots__ = ("_size", "bits", "count", "hashes")
+
+    def __init__(
+        self, size_bits: int = 1 << 17, hashes: int = 7, bits: bytes | None = None
+    ) -> None:
+        self.bits = bytearray(bits) if bits is not None else bytearray(size_bits // 8)
+        self._size = len(self.bits) * 8
+        self.hashes = hashes
+        self.count = 0  # keys added since the filter was (re)created
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def body_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class SourceSeen:
+    """Seen keys for one source. Picklable, so it can go to a parse process."""
+
+    __slots__ = ("bloom", "digest", "recent", "ttl")
+
+    def __init__(self, recent: Iterable[str] = (), bloom: BloomFilter | None = None) -> None:
+        self.recent: dict[str, None] = dict.fromkeys(recent)  # insertion-ordered
+        self.bloom = bloom or BloomFilter()
+        self.digest: str | None = None  # body_digest() of the last parsed feed
+        self.ttl: int | None = None  # that feed's <ttl>, reused while it is unchanged
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.recent or key in self.bloom
+
+
+class SeenIndex:
+    """Seen entry keys for every source, with change tracking for persistence."""
+
+    def __init__(self, recent_limit: int = 2000, bloom_capacity: int = 10_000) -> None:
+        self.recent_limit = recent_limit
+        self.bloom_capacity = bloom_capacity
+        self._sources: dict[str, SourceSeen] = {}
+        self.dirty: set[str] = set()  # source ids changed since the last save
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def view(self, source_id: str) -> SourceSeen:
+        """The seen keys for *source_id* (empty if the source is new)."""
+        seen = self._sources.get(source_id)
+        if seen is None:
+            seen = self._sources[source_id] = SourceSeen()
+        return seen
+
+    def load(
+        self,
+        source_id: str,
+        recent: Iterable[str],
+        bloom: bytes,
+        count: int,
+        digest: str | None = None,
+        ttl: int | None = None,
+    ) -> None:
+        """Restore one source's state, as stored from :meth:`items`."""
+        filt = BloomFilter(bits=bloom)
+        filt.count = count
+        seen = self._sources[source_id] = SourceSeen(recent, filt)
+        seen.digest, seen.ttl = digest, ttl
+
+    def items(self) -> Iterable[tuple[str, SourceSeen]]:
+        return self._sources.items()
+
+    def add(
+        self,
+        source_id: str,
+        keys: Iterable[str],
+        digest: str | None = None,
+        ttl: int | None = None,
+    ) -> None:
+        """Record *keys* as ingested for *source_id*.
+
+        *digest* and *ttl* describe the feed body the keys came from.
+        """
+        seen = self.view(source_id)
+        changed = digest is not None and (digest, ttl) != (seen.digest, seen.ttl)
+        if digest is not None:
+            seen.digest, seen.ttl = digest, ttl
+        for key in keys:
+            if key in seen.recent:
+                continue
+            if seen.bloom.count >= self.bloom_capacity:
+                seen.bloom = BloomFilter()
+            seen.recent[key] = None
+            seen.bloom.add(key)
+            changed = True
+        if not changed:
+            return
+        excess = len(seen.recent) - self.recent_limit
+        if excess > 0:
+            for key in list(seen.recent)[:excess]:
+                del seen.recent[key]
+        self.dirty.add(source_id)
+
+    def forget(self, source_id: str) -> None:
+        """Drop everything recorded for *source_id*."""
+        if self._sources.pop(source_id, None) is not None:
+            self.dirty.add(source_id)